@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: HTTP/1.1 Pool vs HTTP/2 Multiplexing
+
+Starts a local stand-in server that speaks both HTTP/1.1 and cleartext HTTP/2
+(prior knowledge) and compares EpilotClient in both transport modes at
+1, 10 and 100 concurrent requests. The server adds a fixed latency per
+response to mimic the round trip to *.sls.epilot.io.
+
+Requires the optional `h2` package (pip install h2).
+
+Usage:
+    python benchmarks/http2_transport.py
+    python benchmarks/http2_transport.py --requests 500 --latency 0.05
+    python benchmarks/http2_transport.py --output data/output/bench_http2.json
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib.api_client import EpilotClient
+from standin import StandInServer, StandInRequest, StandInResponse, json_response
+
+CONCURRENCY_LEVELS = [1, 10, 100]
+
+def make_handler(latency: float):
+    """Answer every request with a small JSON body after `latency` seconds."""
+    async def handler(request: StandInRequest) -> StandInResponse:
+        await asyncio.sleep(latency)
+        return json_response(200, {"_id": request.path.rsplit("/", 1)[-1], "_schema": "contact"})
+    return handler
+
+async def run_level(base_url: str, server: StandInServer, http2: bool, concurrency: int, total: int) -> Dict[str, Any]:
+    """Run `total` GETs with at most `concurrency` in flight on a fresh client."""
+    client = EpilotClient(http2=http2, http1=not http2, rate_limiter=False)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            started = time.perf_counter()
+            await client.get(f"{base_url}/v1/entity/contact/{i}")
+            latencies.append(time.perf_counter() - started)
+
+    connections_before = server.connections
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(one(i) for i in range(total)))
+    finally:
+        await client.aclose()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "transport": "HTTP/2" if http2 else "HTTP/1.1",
+        "concurrency": concurrency,
+        "requests": total,
+        "seconds": round(elapsed, 4),
+        "requests_per_second": round(total / elapsed, 1),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1] * 1000, 2),
+        "connections_opened": server.connections - connections_before,
+    }
+
+async def main(total: int, latency: float, output: str = None):
+    """
+    Run the benchmark matrix and print a comparison table.
+    """
+    os.environ.setdefault("EPILOT_API_TOKEN", "benchmark")
+
+    server = StandInServer(make_handler(latency))
+    base_url = await server.start()
+
+    print(f"🏁 HTTP/1.1 vs HTTP/2 — {total} requests per run, {latency * 1000:.0f} ms server latency\n")
+    print(f"   {'Transport':<10} {'Conc.':>6} {'Seconds':>9} {'Req/s':>9} {'p95 ms':>9} {'Sockets':>8}")
+
+    results = []
+    try:
+        for concurrency in CONCURRENCY_LEVELS:
+            for http2 in (False, True):
+                result = await run_level(base_url, server, http2, concurrency, total)
+                results.append(result)
+                print(
+                    f"   {result['transport']:<10} {concurrency:>6} {result['seconds']:>9.3f} "
+                    f"{result['requests_per_second']:>9.1f} {result['p95_ms']:>9.2f} "
+                    f"{result['connections_opened']:>8}"
+                )
+    finally:
+        await server.stop()
+
+    if output:
+        output_file = Path(output)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump({"requests": total, "latency": latency, "results": results}, f, indent=2)
+        print(f"\n💾 Results saved to {output_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark HTTP/1.1 pool vs HTTP/2 in EpilotClient")
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=200,
+        help="Requests per concurrency level"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.02,
+        help="Simulated server latency in seconds"
+    )
+    parser.add_argument(
+        "--output",
+        help="Optional JSON file for the results"
+    )
+
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.latency, args.output))
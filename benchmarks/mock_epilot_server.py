@@ -0,0 +1,680 @@
+#!/usr/bin/env python3
+"""
+Mock Epilot Server
+
+Local stand-in for the *.sls.epilot.io APIs used by the scripts, for
+offline benchmarking and load tests. All services are served from one
+origin and routed by path:
+
+    Entity API      POST /v1/entity:search, GET /v1/entities, GET /v1/entity/schemas,
+                    POST /v1/entities, POST /v1/entity/{schema},
+                    GET|PUT|PATCH|DELETE /v1/entity/{schema}/{id}
+    Workflows       GET /v1/workflows/definitions[/{id}], PUT /v1/workflows/definitions/{id}
+    Automations     GET /v1/automation/flows[/{id}]
+    Journeys        POST /v1/journey/configuration/search, GET /v1/journey/configuration/{id}
+    Blueprints      GET /v2/blueprint-manifest/blueprints[/{id}]
+    Designs         GET /v1/designs[/{id}]
+    Mock stats      GET /__mock/stats
+
+Entities are derived from their index on the fly, so even millions of
+them cost no memory; creates, updates and deletes are kept in an overlay.
+Definition documents carry ETags and answer If-None-Match with 304.
+
+Point the scripts at it with:
+    export EPILOT_BASE_URL_OVERRIDE=http://127.0.0.1:8080
+    export EPILOT_API_TOKEN=mock
+
+Usage:
+    python benchmarks/mock_epilot_server.py
+    python benchmarks/mock_epilot_server.py --contacts 100000 --latency 0.02
+    python benchmarks/mock_epilot_server.py --rate-limit 50 --error-rate 0.01 --timeout-rate 0.001
+"""
+
+import re
+import sys
+import math
+import time
+import uuid
+import random
+import asyncio
+import hashlib
+import argparse
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib import codec
+from standin import StandInServer, StandInRequest, StandInResponse, json_response
+
+BASE_TIME = datetime(2024, 1, 1, tzinfo=timezone.utc)
+CREATED_STEP = 30          # seconds between generated entities
+UPDATED_OFFSET = 3600      # generated entities were last updated one hour after creation
+SCHEMA_PREFIX = {"contact": 1, "opportunity": 2, "order": 3, "product": 4}
+DEFINITION_TYPES = ["workflow", "automation", "journey", "blueprint", "design"]
+
+FIRST_NAMES = ["Anna", "Ben", "Clara", "David", "Emma", "Felix", "Greta", "Hannes", "Ida", "Jonas"]
+LAST_NAMES = ["Müller", "Schmidt", "Schneider", "Fischer", "Weber", "Meyer", "Wagner", "Becker"]
+CITIES = [("Wülfrath", "42489"), ("Velbert", "42551"), ("Mettmann", "40822"), ("Ratingen", "40878")]
+
+@dataclass
+class MockConfig:
+    """Dataset size and fault injection settings."""
+    sizes: Dict[str, int] = field(default_factory=lambda: {"contact": 1000, "opportunity": 200, "order": 200, "product": 50})
+    definitions: int = 20
+    definition_steps: int = 20
+    latency: float = 0.0
+    jitter: float = 0.0
+    rate_limit: Optional[float] = None
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_delay: float = 60.0
+    discard_writes: bool = False
+    result_window: int = 10_000  # from + size limit of offset paging, as in Elasticsearch
+    seed: int = 42
+
+def iso(moment: datetime) -> str:
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+def parse_iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+def entity_id(schema: str, index: int) -> str:
+    return str(uuid.UUID(int=(SCHEMA_PREFIX.get(schema, 9) << 96) | index))
+
+def entity_index(schema: str, value: str) -> Optional[int]:
+    try:
+        number = uuid.UUID(value).int
+    except ValueError:
+        return None
+    if number >> 96 != SCHEMA_PREFIX.get(schema, 9):
+        return None
+    return number & ((1 << 96) - 1)
+
+def created_at(index: int) -> datetime:
+    return BASE_TIME + timedelta(seconds=index * CREATED_STEP)
+
+class Dataset:
+    """
+    Deterministic entities and definition documents.
+
+    Generated entities are ordered by index, which is also their _id,
+    _created_at and _updated_at order, so range filters and search_after
+    resolve to index ranges without scanning.
+    """
+
+    def __init__(self, config: MockConfig):
+        self.config = config
+        self.sizes = dict(config.sizes)
+        self.overlay: Dict[str, Dict[int, Optional[Dict[str, Any]]]] = {schema: {} for schema in SCHEMA_PREFIX}
+        self._definitions: Dict[Tuple[str, str], Tuple[Dict[str, Any], str]] = {}
+
+    # Entities
+    def generate(self, schema: str, index: int) -> Dict[str, Any]:
+        created = created_at(index)
+        entity = {
+            "_id": entity_id(schema, index),
+            "_schema": schema,
+            "_org": "mock-org",
+            "_tags": ["mock"],
+            "_created_at": iso(created),
+            "_updated_at": iso(created + timedelta(seconds=UPDATED_OFFSET)),
+        }
+        rng = random.Random(index * 31 + SCHEMA_PREFIX.get(schema, 9))
+        if schema == "contact":
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            city, postal_code = rng.choice(CITIES)
+            entity.update({
+                "_title": f"{first} {last}",
+                "salutation": rng.choice(["Herr", "Frau"]),
+                "first_name": first,
+                "last_name": last,
+                "email": [{"email": f"{first}.{last}.{index}@example.com".lower(), "_tags": ["Privat"]}],
+                "phone": [{"phone": f"+49 2058 {index:07d}", "_tags": ["Mobil"]}],
+                "company": rng.choice(["", "Stadtwerke Wülfrath", "Bäckerei Becker"]),
+                "street": f"Goethestraße {index % 200 + 1}",
+                "city": city,
+                "postal_code": postal_code,
+                "country": "DE",
+                "status": rng.choice(["active", "inactive"]),
+                "birthdate": f"19{50 + index % 50}-0{1 + index % 9}-1{index % 9}",
+                "consent_email_marketing": rng.choice([True, False]),
+                "address": [{"street": f"Goethestraße {index % 200 + 1}", "city": city, "postal_code": postal_code, "country": "DE"}],
+            })
+        elif schema == "product":
+            entity.update({
+                "_title": f"Tarif {index}",
+                "name": f"Tarif {index}",
+                "code": f"T-{index:05d}",
+                "type": rng.choice(["product", "service"]),
+                "active": True,
+                "price": round(rng.uniform(10, 200), 2),
+            })
+        else:
+            contact = entity_id("contact", index % max(1, self.sizes.get("contact", 1)))
+            entity.update({
+                "_title": f"{schema.title()} {index}",
+                "status": rng.choice(["open", "in_progress", "won", "lost"]),
+                "value": round(rng.uniform(100, 10000), 2),
+                "customer": {"$relation": [{"entity_id": contact, "_tags": []}]},
+            })
+        return entity
+
+    def count(self, schema: str) -> int:
+        return self.sizes.get(schema, 0)
+
+    def get(self, schema: str, index: int) -> Optional[Dict[str, Any]]:
+        if index < 0 or index >= self.count(schema):
+            return None
+        overlay = self.overlay.get(schema, {})
+        if index in overlay:
+            return overlay[index]
+        return self.generate(schema, index)
+
+    def create(self, schema: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        index = self.sizes.get(schema, 0)
+        self.sizes[schema] = index + 1
+        now = datetime.now(timezone.utc)
+        entity = {
+            **payload,
+            "_id": entity_id(schema, index),
+            "_schema": schema,
+            "_org": "mock-org",
+            "_created_at": iso(created_at(index)),
+            "_updated_at": iso(now),
+        }
+        # Without the overlay entry, reads of the new ID fall back to a generated entity
+        if not self.config.discard_writes:
+            self.overlay.setdefault(schema, {})[index] = entity
+        return entity
+
+    def update(self, schema: str, index: int, payload: Dict[str, Any], replace: bool = False) -> Optional[Dict[str, Any]]:
+        current = self.get(schema, index)
+        if current is None:
+            return None
+        base = {key: value for key, value in current.items() if key.startswith("_")} if replace else current
+        entity = {**base, **payload, "_id": current["_id"], "_schema": schema, "_updated_at": iso(datetime.now(timezone.utc))}
+        self.overlay[schema][index] = entity
+        return entity
+
+    def delete(self, schema: str, index: int) -> bool:
+        if self.get(schema, index) is None:
+            return False
+        self.overlay[schema][index] = None
+        return True
+
+    # Search
+    def _index_bounds(self, schema: str, filters: Dict[str, Tuple[Any, Any, bool, bool]]) -> Tuple[int, int]:
+        """Translate range filters on _created_at/_updated_at/_id into an index range [lo, hi)."""
+        lo, hi = 0, self.count(schema)
+        for name, (low, high, low_inclusive, high_inclusive) in filters.items():
+            if name == "_id":
+                # Index i has _id position i
+                to_position, step = (lambda value: entity_index(schema, value)), 1
+            elif name in ("_created_at", "_updated_at"):
+                # Index i has timestamp offset i * CREATED_STEP
+                shift = UPDATED_OFFSET if name == "_updated_at" else 0
+                to_position = lambda value, shift=shift: (parse_iso(value) - BASE_TIME).total_seconds() - shift
+                step = CREATED_STEP
+            else:
+                continue
+            if low not in (None, "*"):
+                position = to_position(low)
+                if position is not None:
+                    lo = max(lo, math.floor(position / step) + 1 if not low_inclusive else math.ceil(position / step))
+            if high not in (None, "*"):
+                position = to_position(high)
+                if position is not None:
+                    hi = min(hi, (math.floor(position / step) if high_inclusive else math.ceil(position / step) - 1) + 1)
+        return lo, max(lo, hi)
+
+    @staticmethod
+    def _matches(entity: Dict[str, Any], filters: Dict[str, Tuple[Any, Any, bool, bool]]) -> bool:
+        for name, (low, high, low_inclusive, high_inclusive) in filters.items():
+            value = entity.get(name)
+            if value is None:
+                return False
+            if low not in (None, "*") and (value < low or (value == low and not low_inclusive)):
+                return False
+            if high not in (None, "*") and (value > high or (value == high and not high_inclusive)):
+                return False
+        return True
+
+    def search(self, schema: str, filters: Dict[str, Tuple[Any, Any, bool, bool]], offset: int, size: int) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return (total, page) of matching entities in index order."""
+        lo, hi = self._index_bounds(schema, filters)
+        overlay = self.overlay.get(schema, {})
+        changed = sorted(overlay)
+        # Overlay entries are re-evaluated individually; the rest follow the index range
+        included = sorted(
+            index for index in changed
+            if overlay[index] is not None and self._matches(overlay[index], filters)
+        )
+        changed_in_range = bisect_left(changed, hi) - bisect_left(changed, lo)
+        total = (hi - lo) - changed_in_range + len(included)
+
+        def matches(index: int) -> bool:
+            if index in overlay:
+                position = bisect_left(included, index)
+                return position < len(included) and included[position] == index
+            return lo <= index < hi
+
+        def count_upto(index: int) -> int:
+            """Number of matching indices <= index."""
+            top = min(hi - 1, index)
+            in_range = max(0, top + 1 - lo)
+            if in_range:
+                in_range -= bisect_right(changed, top) - bisect_left(changed, lo)
+            return in_range + bisect_right(included, index)
+
+        if offset >= total or size <= 0:
+            return total, []
+
+        # First matching index with `offset` matches before it
+        low_index, high_index = 0, max(hi, included[-1] + 1 if included else 0)
+        while low_index < high_index:
+            middle = (low_index + high_index) // 2
+            if count_upto(middle) >= offset + 1:
+                high_index = middle
+            else:
+                low_index = middle + 1
+
+        page = []
+        index = low_index
+        limit = max(hi, included[-1] + 1 if included else 0)
+        while len(page) < size and index < limit:
+            if matches(index):
+                page.append(self.get(schema, index))
+            index += 1
+        return total, page
+
+    def hydrate(self, entity: Dict[str, Any]) -> Dict[str, Any]:
+        """Replace relation attributes with the related entities."""
+        hydrated = dict(entity)
+        for key, value in entity.items():
+            if isinstance(value, dict) and "$relation" in value:
+                related = []
+                for relation in value["$relation"]:
+                    index = entity_index("contact", relation.get("entity_id", ""))
+                    target = self.get("contact", index) if index is not None else None
+                    if target is not None:
+                        related.append(target)
+                hydrated[key] = related
+        return hydrated
+
+    # Definitions
+    def definition_id(self, kind: str, index: int) -> str:
+        return str(uuid.UUID(int=(0xD0 + DEFINITION_TYPES.index(kind)) << 96 | index))
+
+    def definition(self, kind: str, def_id: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Return (document, etag) for a definition, generating it on first use."""
+        key = (kind, def_id)
+        if key in self._definitions:
+            return self._definitions[key]
+        try:
+            index = uuid.UUID(def_id).int & ((1 << 96) - 1)
+        except ValueError:
+            return None
+        if index >= self.config.definitions or self.definition_id(kind, index) != def_id:
+            return None
+
+        steps = [
+            {"id": f"step-{n}", "name": f"Schritt {n}", "type": "STEP", "order": n,
+             "description": f"Automatisch generierter Schritt {n} für {kind} {index}", "assignees": [], "ecp": {"enabled": n % 2 == 0}}
+            for n in range(self.config.definition_steps)
+        ]
+        document = {
+            "id": def_id,
+            "_id": def_id,
+            "name": f"{kind.title()} {index}",
+            "status": "active",
+            "description": f"Mock {kind} definition {index}",
+            "created_at": iso(created_at(index)),
+            "updated_at": iso(created_at(index) + timedelta(days=1)),
+        }
+        if kind == "workflow":
+            document["flow"] = [{"id": "section-1", "type": "SECTION", "name": "Abschnitt 1", "steps": steps}]
+        elif kind == "automation":
+            document.update({"flow_name": document["name"], "triggers": [{"type": "entity_operation"}], "actions": steps})
+        elif kind == "journey":
+            document.update({"journey_id": def_id, "journeyName": document["name"], "steps": steps})
+        elif kind == "blueprint":
+            document.update({"title": document["name"], "resources": [
+                {"id": step["id"], "type": "workflow_definition" if n % 3 == 0 else "journey", "name": step["name"]}
+                for n, step in enumerate(steps)
+            ]})
+        elif kind == "design":
+            document.update({"application": "journey", "theme": {"palette": {"primary": "#005eb4"}}, "components": steps})
+
+        etag = '"' + hashlib.sha1(codec.dumps(document, compact=True)).hexdigest() + '"'
+        self._definitions[key] = (document, etag)
+        return self._definitions[key]
+
+    def definition_list(self, kind: str) -> List[Dict[str, Any]]:
+        summaries = []
+        for index in range(self.config.definitions):
+            document, _ = self.definition(kind, self.definition_id(kind, index))
+            summaries.append({key: document[key] for key in ("id", "_id", "name", "status") if key in document}
+                             | ({"journey_id": document["journey_id"]} if "journey_id" in document else {}))
+        return summaries
+
+    def replace_definition(self, kind: str, def_id: str, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if self.definition(kind, def_id) is None:
+            return None
+        document = {**payload, "id": def_id, "_id": def_id}
+        etag = '"' + hashlib.sha1(codec.dumps(document, compact=True)).hexdigest() + '"'
+        self._definitions[(kind, def_id)] = (document, etag)
+        return document
+
+QUERY_TERM = re.compile(r'(\w+):(?:([\[{])\s*"?([^"\s]+)"?\s+TO\s+"?([^"\s\]}]+)"?\s*([\]}])|"?([^"\s()]+)"?)')
+
+def parse_query(q: str) -> Tuple[Optional[str], Dict[str, Tuple[Any, Any, bool, bool]]]:
+    """Parse the subset of the Lucene syntax the scripts use: `_schema:x AND field:[a TO b]`."""
+    schema = None
+    filters = {}
+    for match in QUERY_TERM.finditer(q or ""):
+        name, open_bracket, low, high, close_bracket, value = match.groups()
+        if name == "_schema":
+            schema = value
+        elif open_bracket:
+            filters[name] = (low, high, open_bracket == "[", close_bracket == "]")
+        elif value is not None:
+            filters[name] = (value, value, True, True)
+    return schema, filters
+
+class MockEpilot:
+    """Request handler implementing the mocked endpoints and fault injection."""
+
+    def __init__(self, config: Optional[MockConfig] = None):
+        self.config = config or MockConfig()
+        self.data = Dataset(self.config)
+        self.random = random.Random(self.config.seed)
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "timeouts": 0, "not_modified": 0}
+        self._tokens = float(self.config.rate_limit or 0)
+        self._updated = time.monotonic()
+
+    def _throttled(self) -> bool:
+        if not self.config.rate_limit:
+            return False
+        now = time.monotonic()
+        self._tokens = min(self.config.rate_limit, self._tokens + (now - self._updated) * self.config.rate_limit)
+        self._updated = now
+        if self._tokens < 1:
+            return True
+        self._tokens -= 1
+        return False
+
+    async def __call__(self, request: StandInRequest) -> StandInResponse:
+        self.stats["requests"] += 1
+        if request.path == "/__mock/stats":
+            return json_response(200, {**self.stats, "sizes": self.data.sizes})
+        if not request.headers.get("authorization"):
+            return json_response(401, {"message": "Unauthorized"})
+
+        if self._throttled() or self.random.random() < self.config.throttle_rate:
+            self.stats["throttled"] += 1
+            retry_after = 1 if not self.config.rate_limit else max(1, round(1 / self.config.rate_limit))
+            return json_response(429, {"message": "Too Many Requests"}, {"retry-after": str(retry_after)})
+        if self.random.random() < self.config.error_rate:
+            self.stats["errors"] += 1
+            return json_response(self.random.choice([500, 502, 503]), {"message": "Injected failure"})
+        if self.random.random() < self.config.timeout_rate:
+            self.stats["timeouts"] += 1
+            await asyncio.sleep(self.config.timeout_delay)
+
+        delay = self.config.latency + self.random.uniform(0, self.config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        try:
+            return self.route(request)
+        except (ValueError, KeyError, TypeError) as e:
+            return json_response(400, {"message": f"Bad request: {e}"})
+
+    def route(self, request: StandInRequest) -> StandInResponse:
+        method, path = request.method, request.path.rstrip("/")
+        parts = path.strip("/").split("/")
+
+        # Entity API
+        if path == "/v1/entity:search" and method == "POST":
+            return self.search(request.json() or {})
+        if path == "/v1/entity/schemas" and method == "GET":
+            return json_response(200, {"schemas": SCHEMAS})
+        if path == "/v1/entities" and method == "GET":
+            schema = request.query.get("schema", "contact")
+            total, page = self.data.search(schema, {}, 0, int(request.query.get("limit", 20)))
+            return json_response(200, {"total": total, "results": page})
+        if path == "/v1/entities" and method == "POST":
+            payload = request.json() or {}
+            return json_response(201, self.data.create(payload.get("_schema", "contact"), payload))
+        if parts[:2] == ["v1", "entity"] and len(parts) == 3 and method == "POST":
+            return json_response(201, self.data.create(parts[2], request.json() or {}))
+        if parts[:2] == ["v1", "entity"] and len(parts) == 4:
+            return self.entity(method, parts[2], parts[3], request)
+
+        # Definition APIs
+        if path == "/v1/workflows/definitions" and method == "GET":
+            return json_response(200, self.data.definition_list("workflow"))
+        if path.startswith("/v1/workflows/definitions/"):
+            return self.definition("workflow", parts[-1], request)
+        if path == "/v1/automation/flows" and method == "GET":
+            return json_response(200, {"results": self.data.definition_list("automation")})
+        if path.startswith("/v1/automation/flows/"):
+            return self.definition("automation", parts[-1], request)
+        if path == "/v1/journey/configuration/search" and method == "POST":
+            return json_response(200, {"results": self.data.definition_list("journey")})
+        if path.startswith("/v1/journey/configuration/"):
+            return self.definition("journey", parts[-1], request)
+        if path == "/v2/blueprint-manifest/blueprints" and method == "GET":
+            return json_response(200, {"results": self.data.definition_list("blueprint")})
+        if path.startswith("/v2/blueprint-manifest/blueprints/"):
+            return self.definition("blueprint", parts[-1], request)
+        if path == "/v1/designs" and method == "GET":
+            return json_response(200, {"designs": self.data.definition_list("design")})
+        if path.startswith("/v1/designs/"):
+            return self.definition("design", parts[-1], request)
+
+        return json_response(404, {"message": f"No mock for {method} {path}"})
+
+    def search(self, body: Dict[str, Any]) -> StandInResponse:
+        schema, filters = parse_query(body.get("q", ""))
+        schema = schema or "contact"
+        size = int(body.get("size", 10))
+        offset = int(body.get("from", 0))
+        if offset + size > self.config.result_window:
+            return json_response(400, {
+                "message": f"Result window is too large, from + size must be less than or equal to "
+                           f"{self.config.result_window}; use search_after for deep pagination"
+            })
+
+        # search_after continues after the last sort value of the previous page
+        search_after = body.get("search_after")
+        if search_after:
+            sort_field = str(body.get("sort", "_created_at")).split(":")[0].split(" ")[0] or "_created_at"
+            if sort_field not in ("_created_at", "_updated_at", "_id"):
+                sort_field = "_created_at"
+            low, high, _, high_inclusive = filters.get(sort_field, (None, None, True, True))
+            filters[sort_field] = (search_after[0], high, False, high_inclusive)
+            offset = 0
+
+        if str(body.get("sort", "")).split(",")[0].strip().endswith(":desc") and not search_after:
+            # Generated entities are in ascending order, so a descending page is an ascending one from the end
+            total, _ = self.data.search(schema, filters, 0, 0)
+            start = max(0, total - offset - size)
+            total, page = self.data.search(schema, filters, start, max(0, total - offset - start))
+            page.reverse()
+        else:
+            total, page = self.data.search(schema, filters, offset, size)
+        if body.get("hydrate"):
+            page = [self.data.hydrate(entity) for entity in page]
+        fields = body.get("fields")
+        if fields:
+            keep = set(fields) | {"_id", "_schema"}
+            page = [{key: value for key, value in entity.items() if key in keep} for entity in page]
+        return json_response(200, {"hits": total, "total": total, "results": page})
+
+    def entity(self, method: str, schema: str, raw_id: str, request: StandInRequest) -> StandInResponse:
+        index = entity_index(schema, raw_id)
+        if index is None:
+            return json_response(404, {"message": "Entity not found"})
+        if method == "GET":
+            entity = self.data.get(schema, index)
+        elif method in ("PATCH", "PUT"):
+            entity = self.data.update(schema, index, request.json() or {}, replace=method == "PUT")
+        elif method == "DELETE":
+            return json_response(200, {"deleted": True}) if self.data.delete(schema, index) else json_response(404, {"message": "Entity not found"})
+        else:
+            return json_response(405, {"message": "Method not allowed"})
+        if entity is None:
+            return json_response(404, {"message": "Entity not found"})
+        return json_response(200, entity)
+
+    def definition(self, kind: str, def_id: str, request: StandInRequest) -> StandInResponse:
+        if request.method == "PUT":
+            document = self.data.replace_definition(kind, def_id, request.json() or {})
+            return json_response(200, document) if document else json_response(404, {"message": "Not found"})
+        found = self.data.definition(kind, def_id)
+        if found is None:
+            return json_response(404, {"message": f"{kind.title()} not found"})
+        document, etag = found
+        if request.headers.get("if-none-match") == etag:
+            self.stats["not_modified"] += 1
+            return 304, {"etag": etag}, b""
+        return json_response(200, document, {"etag": etag})
+
+def _attribute(name: str, type_: str, label: str, **extra) -> Dict[str, Any]:
+    return {"name": name, "type": type_, "label": label, **extra}
+
+SCHEMAS = [
+    {
+        "slug": "contact",
+        "name": "Contact",
+        "capabilities": [{"name": "workflow"}],
+        "attributes": [
+            _attribute("salutation", "select", "Anrede", options=["Herr", "Frau"]),
+            _attribute("first_name", "string", "Vorname"),
+            _attribute("last_name", "string", "Nachname"),
+            _attribute("email", "email", "E-Mail", multiple=True),
+            _attribute("phone", "phone", "Telefon", multiple=True),
+            _attribute("company", "string", "Firma"),
+            _attribute("street", "string", "Straße"),
+            _attribute("city", "string", "Ort"),
+            _attribute("postal_code", "string", "PLZ"),
+            _attribute("country", "string", "Land"),
+            _attribute("status", "select", "Status", options=["active", "inactive"]),
+            _attribute("birthdate", "date", "Geburtsdatum"),
+            _attribute("consent_email_marketing", "boolean", "Einwilligung E-Mail"),
+            _attribute("address", "address", "Adresse", multiple=True),
+        ],
+    },
+    {
+        "slug": "opportunity",
+        "name": "Opportunity",
+        "capabilities": [{"name": "workflow"}],
+        "attributes": [
+            _attribute("status", "select", "Status", options=["open", "in_progress", "won", "lost"]),
+            _attribute("value", "number", "Wert"),
+            _attribute("customer", "relation", "Kunde", allowedSchemas=["contact"]),
+        ],
+    },
+    {
+        "slug": "order",
+        "name": "Order",
+        "capabilities": [{"name": "workflow"}],
+        "attributes": [
+            _attribute("status", "select", "Status", options=["open", "in_progress", "won", "lost"]),
+            _attribute("value", "currency", "Betrag"),
+            _attribute("customer", "relation", "Kunde", allowedSchemas=["contact"]),
+        ],
+    },
+    {
+        "slug": "product",
+        "name": "Product",
+        "capabilities": [],
+        "attributes": [
+            _attribute("name", "string", "Name"),
+            _attribute("code", "string", "Code"),
+            _attribute("type", "select", "Typ", options=["product", "service"]),
+            _attribute("active", "boolean", "Aktiv"),
+            _attribute("price", "number", "Preis"),
+        ],
+    },
+]
+
+async def start_mock_server(config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0) -> Tuple[StandInServer, MockEpilot, str]:
+    """Start a mock server in the running event loop and return (server, handler, base_url)."""
+    handler = MockEpilot(config)
+    server = StandInServer(handler, host=host, port=port)
+    base_url = await server.start()
+    return server, handler, base_url
+
+async def main(args):
+    """
+    Run the mock server until interrupted.
+    """
+    config = MockConfig(
+        sizes={"contact": args.contacts, "opportunity": args.opportunities, "order": args.orders, "product": args.products},
+        definitions=args.definitions,
+        definition_steps=args.definition_steps,
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_limit=args.rate_limit,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_delay=args.timeout_delay,
+        discard_writes=args.discard_writes,
+        result_window=args.result_window,
+    )
+    server, _, base_url = await start_mock_server(config, args.host, args.port)
+
+    print("=" * 70)
+    print("🧪 MOCK EPILOT SERVER")
+    print("=" * 70)
+    print(f"🌐 Listening on {base_url}")
+    print(f"📦 Entities: {config.sizes}")
+    print(f"📋 Definitions per type: {config.definitions} ({config.definition_steps} steps each)")
+    print(f"⏱️  Latency: {config.latency * 1000:.0f} ms (+{config.jitter * 1000:.0f} ms jitter)")
+    if config.rate_limit:
+        print(f"🚦 Rate limit: {config.rate_limit} req/s")
+    if config.error_rate or config.throttle_rate or config.timeout_rate:
+        print(f"💥 Faults: 5xx {config.error_rate:.1%}, 429 {config.throttle_rate:.1%}, timeouts {config.timeout_rate:.1%}")
+    print()
+    print("💡 Point the scripts at it with:")
+    print(f"   export EPILOT_BASE_URL_OVERRIDE={base_url}")
+    print("   export EPILOT_API_TOKEN=mock")
+    print("=" * 70)
+
+    await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local mock of the Epilot APIs")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address")
+    parser.add_argument("--port", type=int, default=8080, help="Port (0 = random)")
+    parser.add_argument("--contacts", type=int, default=1000, help="Number of contacts")
+    parser.add_argument("--opportunities", type=int, default=200, help="Number of opportunities")
+    parser.add_argument("--orders", type=int, default=200, help="Number of orders")
+    parser.add_argument("--products", type=int, default=50, help="Number of products")
+    parser.add_argument("--definitions", type=int, default=20, help="Definitions per type (workflows, journeys, ...)")
+    parser.add_argument("--definition-steps", type=int, default=20, help="Steps per definition document")
+    parser.add_argument("--latency", type=float, default=0.0, help="Added latency per request in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Random extra latency in seconds")
+    parser.add_argument("--rate-limit", type=float, help="Requests per second before answering 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with 5xx")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Fraction of requests that hang")
+    parser.add_argument("--timeout-delay", type=float, default=60.0, help="How long hanging requests hang")
+    parser.add_argument("--result-window", type=int, default=10_000, help="Maximum from + size for offset paging")
+    parser.add_argument("--discard-writes", action="store_true", help="Answer creates without keeping them (constant memory for large imports)")
+
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        print("\n👋 Mock server stopped")
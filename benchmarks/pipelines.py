@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Export and Import Pipelines
+
+Runs the real scripts end to end against benchmarks/mock_epilot_server.py at
+dataset sizes of 100, 10k and 1M entities:
+
+    export_contacts_csv      scripts/customers/export_contacts_csv.py
+    import_customers_csv     scripts/customers/import_customers_csv.py
+    export_workflows         scripts/workflows/export_workflows.py
+    export_automations       scripts/automations/export_automations.py
+    export_journeys          scripts/journeys/export_journeys.py
+    export_blueprints        scripts/blueprints/export_blueprints.py
+    export_designs           scripts/designs/export_designs.py
+    export_processes         scripts/processes/export_processes.py
+    demo_environment         scripts/demo/erstelle_demo_umgebung.py
+
+Definition exporters get one definition per 100 entities (at least 10); the
+demo builder gets generated input files scaled to the dataset size. Every
+script runs in a throw-away copy of lib/, config/ and scripts/, so nothing
+in the working tree is touched.
+
+For each run it reports throughput (items/s and requests/s), client-side p95
+latency (from the EPILOT_METRICS_REPORT of the script), peak RSS and CPU
+time of the script process, and stores everything as JSON. Pass an earlier
+result file to --compare to flag regressions (exit code 1).
+
+The scripts run with the client-side rate limiter off (EPILOT_RATE_LIMIT=off),
+so items/s measures the pipeline rather than the pacing. Use --rate-limit
+adaptive (the default client behaviour) or a number of req/s to include it;
+the setting is stored with the results.
+
+Usage:
+    python benchmarks/pipelines.py
+    python benchmarks/pipelines.py --sizes 100,10000 --scenarios export_contacts_csv,export_workflows
+    python benchmarks/pipelines.py --latency 0.02 --timeout 1800
+    python benchmarks/pipelines.py --sizes 10000 --rate-limit adaptive
+    python benchmarks/pipelines.py --compare benchmarks/results/pipelines_20240101_120000_abc1234.json
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import shutil
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).parent.parent
+MOCK_SERVER = Path(__file__).parent / "mock_epilot_server.py"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+DEFAULT_SIZES = [100, 10_000, 1_000_000]
+
+# --rate-limit value -> EPILOT_RATE_LIMIT for the scripts (None = leave unset)
+RATE_LIMIT_MODES = {"off": "off", "adaptive": None}
+
+# Metric -> True if higher is better
+COMPARED_METRICS = {
+    "items_per_second": True,
+    "p95_ms": False,
+    "peak_rss_mb": False,
+    "cpu_seconds": False,
+}
+
+def definitions_for(size: int) -> int:
+    return max(10, size // 100)
+
+def demo_counts(size: int) -> Dict[str, int]:
+    return {
+        "produkte": min(size, 100),
+        "kunden": size,
+        "chancen": max(1, size // 2),
+        "auftraege": max(1, size // 4),
+    }
+
+def write_customers_csv(work_dir: Path, size: int) -> None:
+    """Input file for import_customers_csv.py."""
+    with open(work_dir / "customers.csv", 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["first_name", "last_name", "email", "phone"])
+        for i in range(size):
+            writer.writerow([f"Vorname{i}", f"Nachname{i}", f"kunde{i}@example.com", f"+49 2058 {i:07d}"])
+
+def write_demo_data(work_dir: Path, size: int) -> None:
+    """Input files for the demo builder in the sandbox's data/input/demo."""
+    counts = demo_counts(size)
+    input_dir = work_dir / "data" / "input" / "demo"
+    input_dir.mkdir(parents=True, exist_ok=True)
+
+    produkte = [
+        {"_schema": "product", "_title": f"Tarif {i}", "kategorie": "Tarif", "sparte": "Strom", "preis": 29.9}
+        for i in range(counts["produkte"])
+    ]
+    kunden = [
+        {
+            "_schema": "contact",
+            "_title": f"Kunde {i}",
+            "first_name": "Kunde",
+            "last_name": str(i),
+            "kundentyp": "Gewerbekunde" if i % 4 == 0 else "Privatkunde",
+            "address_line1": f"Goethestraße {i % 200 + 1}",
+            "sparte": ["Strom", "Glasfaser"],
+        }
+        for i in range(counts["kunden"])
+    ]
+    chancen = [
+        {"titel": f"Chance {i}", "kunde_name": f"Kunde {i % counts['kunden']}", "status": "ausstehend", "typ": "Neuanschluss", "sparten": ["Glasfaser"]}
+        for i in range(counts["chancen"])
+    ]
+    auftraege = [
+        {
+            "titel": f"Auftrag {i}",
+            "kunde_name": f"Kunde {i % counts['kunden']}",
+            "chancen_titel": f"Chance {i % counts['chancen']}",
+            "status": "offen",
+            "gesamtbetrag": 99.0,
+            "auftragsdatum": "2024-01-01",
+            "produkte": [{"produkt_name": f"Tarif {i % counts['produkte']}", "menge": 1}],
+        }
+        for i in range(counts["auftraege"])
+    ]
+    for name, key, items in (
+        ("wuelfrath_produkte.json", "produkte", produkte),
+        ("wuelfrath_kunden.json", "kunden", kunden),
+        ("wuelfrath_chancen.json", "chancen", chancen),
+        ("wuelfrath_auftraege.json", "auftraege", auftraege),
+    ):
+        with open(input_dir / name, 'w', encoding='utf-8') as f:
+            json.dump({key: items}, f, ensure_ascii=False)
+
+@dataclass
+class Scenario:
+    """One script run: how to call it and how many items it processes at a given size."""
+    name: str
+    script: str
+    args: Callable[[Path, int], List[str]]
+    items: Callable[[int], int]
+    prepare: Optional[Callable[[Path, int], None]] = None
+    writes: bool = False
+
+def _output_dir(name: str) -> Callable[[Path, int], List[str]]:
+    return lambda work_dir, size: ["--output", str(work_dir / "output" / name)]
+
+SCENARIOS = [
+    Scenario("export_contacts_csv", "scripts/customers/export_contacts_csv.py",
+             lambda work_dir, size: ["--output", str(work_dir / "output" / "contacts.csv")], items=lambda size: size),
+    Scenario("import_customers_csv", "scripts/customers/import_customers_csv.py",
+             lambda work_dir, size: [str(work_dir / "customers.csv")], items=lambda size: size,
+             prepare=write_customers_csv, writes=True),
+    Scenario("export_workflows", "scripts/workflows/export_workflows.py", _output_dir("workflows"), items=definitions_for),
+    Scenario("export_automations", "scripts/automations/export_automations.py", _output_dir("automations"), items=definitions_for),
+    Scenario("export_journeys", "scripts/journeys/export_journeys.py", _output_dir("journeys"), items=definitions_for),
+    Scenario("export_blueprints", "scripts/blueprints/export_blueprints.py", _output_dir("blueprints"), items=definitions_for),
+    Scenario("export_designs", "scripts/designs/export_designs.py", _output_dir("designs"), items=definitions_for),
+    Scenario("export_processes", "scripts/processes/export_processes.py", _output_dir("processes"),
+             items=lambda size: 2 * definitions_for(size)),
+    Scenario("demo_environment", "scripts/demo/erstelle_demo_umgebung.py", lambda work_dir, size: [],
+             items=lambda size: sum(demo_counts(size).values()), prepare=write_demo_data, writes=True),
+]
+
+def make_sandbox(root: Path) -> Path:
+    """Copy the code the scripts need into `root`, so their outputs stay out of the working tree."""
+    ignore = shutil.ignore_patterns("__pycache__", "output", "docs", "*.md")
+    for name in ("lib", "config", "scripts"):
+        shutil.copytree(REPO_ROOT / name, root / name, ignore=ignore)
+    return root
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_mock(size: int, latency: float, discard_writes: bool) -> Tuple[subprocess.Popen, str]:
+    """Start the mock server in its own process, so its CPU time is not attributed to the script."""
+    port = free_port()
+    command = [
+        sys.executable, str(MOCK_SERVER),
+        "--port", str(port),
+        "--contacts", str(size),
+        "--opportunities", str(max(1, size // 4)),
+        "--definitions", str(definitions_for(size)),
+        "--latency", str(latency),
+    ]
+    if discard_writes:
+        command.append("--discard-writes")
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("Mock server did not start")
+
+def run_script(sandbox: Path, argv: List[str], env: Dict[str, str], log_file: Path, timeout: Optional[float]) -> Dict[str, Any]:
+    """Run a script and collect wall time plus the rusage of its process tree."""
+    with open(log_file, 'w', encoding='utf-8') as log:
+        started = time.perf_counter()
+        process = subprocess.Popen([sys.executable, *argv], cwd=sandbox, env=env, stdout=log, stderr=subprocess.STDOUT)
+        timed_out = threading.Event()
+
+        def kill() -> None:
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(timeout, kill) if timeout else None
+        if timer:
+            timer.start()
+        # wait4 reports the child's own usage including the children it waited for (the demo builder)
+        _, status, usage = os.wait4(process.pid, 0)
+        elapsed = time.perf_counter() - started
+        if timer:
+            timer.cancel()
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    # ru_maxrss is in KiB on Linux and in bytes on macOS
+    rss_bytes = usage.ru_maxrss if sys.platform == "darwin" else usage.ru_maxrss * 1024
+    return {
+        "exit_code": process.returncode,
+        "timed_out": timed_out.is_set(),
+        "wall_seconds": round(elapsed, 3),
+        "cpu_user_seconds": round(usage.ru_utime, 3),
+        "cpu_system_seconds": round(usage.ru_stime, 3),
+        "cpu_seconds": round(usage.ru_utime + usage.ru_stime, 3),
+        "peak_rss_mb": round(rss_bytes / 1024 / 1024, 1),
+    }
+
+def collect_metrics(work_dir: Path) -> Dict[str, Any]:
+    """Combine the metrics reports written by the script (one per process)."""
+    requests = errors = retries = 0
+    p50 = p95 = 0.0
+    for report_file in work_dir.glob("metrics_*.json"):
+        with open(report_file, 'r', encoding='utf-8') as f:
+            totals = json.load(f)["totals"]
+        requests += totals["requests"]
+        errors += totals["errors"]
+        retries += totals["retries"]
+        # Percentiles cannot be merged exactly; the slowest process is the conservative figure
+        p50 = max(p50, totals["latency_ms"]["p50"])
+        p95 = max(p95, totals["latency_ms"]["p95"])
+    return {"requests": requests, "errors": errors, "retries": retries, "p50_ms": p50, "p95_ms": p95}
+
+def rate_limit_env(rate_limit: str) -> Optional[str]:
+    """EPILOT_RATE_LIMIT for a --rate-limit value ("off", "adaptive" or req/s)."""
+    if rate_limit in RATE_LIMIT_MODES:
+        return RATE_LIMIT_MODES[rate_limit]
+    return str(float(rate_limit))
+
+def run_scenario(scenario: Scenario, size: int, latency: float, timeout: Optional[float], tmp_root: Path,
+                 rate_limit: str = "off") -> Dict[str, Any]:
+    work_dir = Path(tempfile.mkdtemp(prefix=f"{scenario.name}_{size}_", dir=tmp_root))
+    sandbox = make_sandbox(work_dir)
+    if scenario.prepare:
+        scenario.prepare(work_dir, size)
+
+    mock, base_url = start_mock(size, latency, discard_writes=scenario.writes)
+    env = {
+        **os.environ,
+        "EPILOT_API_TOKEN": "benchmark",
+        "EPILOT_BASE_URL_OVERRIDE": base_url,
+        "EPILOT_METRICS_REPORT": str(work_dir / "metrics_{pid}.json"),
+        "PYTHONUNBUFFERED": "1",
+    }
+    env.pop("EPILOT_RATE_LIMIT", None)
+    env.pop("EPILOT_RATE_LIMIT_MAX", None)
+    if rate_limit_env(rate_limit) is not None:
+        env["EPILOT_RATE_LIMIT"] = rate_limit_env(rate_limit)
+    log_file = work_dir / "script.log"
+    try:
+        usage = run_script(sandbox, [scenario.script, *scenario.args(work_dir, size)], env, log_file, timeout)
+    finally:
+        mock.terminate()
+        mock.wait()
+
+    metrics = collect_metrics(work_dir)
+    items = scenario.items(size)
+    if usage["timed_out"]:
+        status = "timeout"
+    elif usage["exit_code"] != 0:
+        status = "failed"
+    else:
+        status = "ok"
+
+    result = {
+        "scenario": scenario.name,
+        "size": size,
+        "items": items,
+        "status": status,
+        **usage,
+        **metrics,
+        "items_per_second": round(items / usage["wall_seconds"], 1) if status == "ok" else None,
+        "requests_per_second": round(metrics["requests"] / usage["wall_seconds"], 1) if usage["wall_seconds"] else None,
+    }
+    if status != "ok":
+        with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
+            result["log_tail"] = f.read()[-2000:]
+    shutil.rmtree(work_dir, ignore_errors=True)
+    return result
+
+def git_revision() -> Dict[str, Any]:
+    def git(*args) -> str:
+        try:
+            return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return ""
+    return {"commit": git("rev-parse", "--short", "HEAD"), "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+def compare(results: List[Dict[str, Any]], baseline_file: Path, threshold: float, rate_limit: str = "off") -> List[str]:
+    """Return one line per metric that got worse than the baseline by more than `threshold`."""
+    with open(baseline_file, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    baseline = {(r["scenario"], r["size"]): r for r in report["results"]}
+
+    regressions = []
+    print(f"\n📊 Compared with {baseline_file}:")
+    # Results from before the setting was recorded ran with the client's default limiter
+    baseline_rate_limit = report.get("rate_limit", "adaptive")
+    if baseline_rate_limit != rate_limit:
+        print(f"   ⚠️  Rate limiter differs: {baseline_rate_limit} (baseline) vs {rate_limit} (this run)")
+    for result in results:
+        before = baseline.get((result["scenario"], result["size"]))
+        if not before or before["status"] != "ok" or result["status"] != "ok":
+            continue
+        changes = []
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            old, new = before.get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            marker = "❌" if worse > threshold else ("✅" if worse < -threshold else "  ")
+            changes.append(f"{marker}{metric} {change:+.1%}")
+            if worse > threshold:
+                regressions.append(f"{result['scenario']} @ {result['size']}: {metric} {old} → {new} ({change:+.1%})")
+        print(f"   {result['scenario']:<22} {result['size']:>9}  " + "  ".join(changes))
+    return regressions
+
+def main(sizes: List[int], scenario_names: List[str], latency: float, timeout: Optional[float],
+         output: Optional[str], baseline: Optional[str], threshold: float, rate_limit: str = "off"):
+    """
+    Run the selected scenarios at every size and store the results.
+    """
+    scenarios = [s for s in SCENARIOS if not scenario_names or s.name in scenario_names]
+    unknown = set(scenario_names) - {s.name for s in SCENARIOS}
+    if unknown:
+        print(f"❌ Unknown scenario(s): {', '.join(sorted(unknown))}")
+        print(f"   Available: {', '.join(s.name for s in SCENARIOS)}")
+        sys.exit(1)
+
+    revision = git_revision()
+    print(f"🏁 Pipeline benchmark @ {revision['commit'] or 'unknown'}{' (dirty)' if revision['dirty'] else ''}")
+    print(f"   Sizes: {', '.join(f'{s:,}' for s in sizes)} | mock latency {latency * 1000:.0f} ms | "
+          f"rate limiter {rate_limit}\n")
+    print(f"   {'Scenario':<22} {'Size':>9} {'Items':>9} {'Status':>8} {'Seconds':>9} {'Items/s':>9} "
+          f"{'Req/s':>8} {'p95 ms':>8} {'RSS MB':>8} {'CPU s':>8}")
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="epilot_bench_") as tmp:
+        for size in sizes:
+            for scenario in scenarios:
+                result = run_scenario(scenario, size, latency, timeout, Path(tmp), rate_limit)
+                results.append(result)
+                print(
+                    f"   {scenario.name:<22} {size:>9} {result['items']:>9} {result['status']:>8} "
+                    f"{result['wall_seconds']:>9.2f} {result['items_per_second'] or 0:>9.1f} "
+                    f"{result['requests_per_second'] or 0:>8.1f} {result['p95_ms']:>8.2f} "
+                    f"{result['peak_rss_mb']:>8.1f} {result['cpu_seconds']:>8.2f}",
+                    flush=True
+                )
+
+    report = {
+        "benchmark": "pipelines",
+        "generated_at": datetime.now().isoformat(),
+        **revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "mock_latency": latency,
+        "rate_limit": rate_limit,
+        "results": results,
+    }
+
+    if not output:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output = RESULTS_DIR / f"pipelines_{timestamp}_{revision['commit'] or 'unknown'}.json"
+    output_file = Path(output)
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results saved to {output_file}")
+
+    failed = [r for r in results if r["status"] != "ok"]
+    for result in failed:
+        print(f"\n⚠️  {result['scenario']} @ {result['size']} {result['status']} (exit code {result['exit_code']}):")
+        print("   " + result.get("log_tail", "").strip().replace("\n", "\n   ")[-800:])
+
+    if baseline:
+        regressions = compare(results, Path(baseline), threshold, rate_limit)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) above {threshold:.0%}:")
+            for line in regressions:
+                print(f"   - {line}")
+            sys.exit(1)
+        print(f"\n✅ No regressions above {threshold:.0%}")
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the export/import scripts against a local mock server")
+    parser.add_argument(
+        "--sizes",
+        default=",".join(str(s) for s in DEFAULT_SIZES),
+        help="Comma-separated dataset sizes (default: 100,10000,1000000)"
+    )
+    parser.add_argument(
+        "--scenarios",
+        default="",
+        help=f"Comma-separated scenarios (default: all of {', '.join(s.name for s in SCENARIOS)})"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Simulated server latency in seconds"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="Abort a single run after this many seconds"
+    )
+    parser.add_argument(
+        "--output",
+        help="JSON file for the results (default: benchmarks/results/pipelines_<time>_<commit>.json)"
+    )
+    parser.add_argument(
+        "--compare",
+        help="Earlier result file to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="Relative change counted as a regression (default: 0.10)"
+    )
+
+    parser.add_argument(
+        "--rate-limit",
+        default="off",
+        help="Client-side rate limiter for the scripts: off (default), adaptive "
+             "(unpaced until a 429) or an initial rate in req/s"
+    )
+
+    args = parser.parse_args()
+
+    if args.rate_limit not in RATE_LIMIT_MODES:
+        try:
+            float(args.rate_limit)
+        except ValueError:
+            parser.error("--rate-limit must be off, adaptive or a number")
+
+    main(
+        [int(s) for s in args.sizes.split(",") if s],
+        [s for s in args.scenarios.split(",") if s],
+        args.latency,
+        args.timeout,
+        args.output,
+        args.compare,
+        args.threshold,
+        args.rate_limit
+    )
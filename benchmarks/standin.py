@@ -0,0 +1,180 @@
+"""
+Local Stand-in HTTP Server
+
+Minimal asyncio server used by the benchmarks. Speaks HTTP/1.1 (via h11)
+and cleartext HTTP/2 with prior knowledge (via the optional h2 package) and
+hands every request to an async handler.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+import h11
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib import codec
+
+H2_PREFACE = b"PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n"
+
+@dataclass
+class StandInRequest:
+    """A fully received request."""
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes
+
+    def json(self) -> Any:
+        return codec.loads(self.body) if self.body else None
+
+# (status, headers, body)
+StandInResponse = Tuple[int, Dict[str, str], bytes]
+Handler = Callable[[StandInRequest], Awaitable[StandInResponse]]
+
+def json_response(status: int, payload: Any, headers: Optional[Dict[str, str]] = None) -> StandInResponse:
+    """Build a JSON response tuple."""
+    return status, {"content-type": "application/json", **(headers or {})}, codec.dumps(payload, compact=True)
+
+def _build_request(method: bytes, target: bytes, headers) -> StandInRequest:
+    parts = urlsplit(target.decode())
+    return StandInRequest(
+        method=method.decode().upper(),
+        path=parts.path,
+        query=dict(parse_qsl(parts.query)),
+        headers={name.decode().lower(): value.decode() for name, value in headers},
+        body=b""
+    )
+
+class StandInServer:
+    """
+    Asyncio HTTP/1.1 + h2c server delegating to `handler`.
+
+    Counts accepted connections so benchmarks can report socket usage.
+
+    Usage:
+        server = StandInServer(handler)
+        base_url = await server.start()
+        ...
+        await server.stop()
+    """
+
+    def __init__(self, handler: Handler, host: str = "127.0.0.1", port: int = 0):
+        self.handler = handler
+        self.host = host
+        self.port = port
+        self.connections = 0
+        self._server = None
+
+    async def start(self) -> str:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return f"http://{self.host}:{self.port}"
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            initial = await reader.read(len(H2_PREFACE))
+            if initial == H2_PREFACE:
+                await self._serve_h2(reader, writer, initial)
+            else:
+                await self._serve_h11(reader, writer, initial)
+        except (ConnectionError, h11.ProtocolError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_h11(self, reader, writer, initial: bytes) -> None:
+        conn = h11.Connection(h11.SERVER)
+        conn.receive_data(initial)
+        request = None
+
+        while True:
+            event = conn.next_event()
+            if event is h11.NEED_DATA:
+                conn.receive_data(await reader.read(65536))
+            elif isinstance(event, h11.Request):
+                request = _build_request(event.method, event.target, event.headers)
+            elif isinstance(event, h11.Data):
+                request.body += event.data
+            elif isinstance(event, h11.EndOfMessage):
+                status, headers, body = await self.handler(request)
+                header_list = [(name, value) for name, value in headers.items()]
+                header_list.append(("content-length", str(len(body))))
+                writer.write(conn.send(h11.Response(status_code=status, headers=header_list)))
+                writer.write(conn.send(h11.Data(data=body)))
+                writer.write(conn.send(h11.EndOfMessage()))
+                await writer.drain()
+                if conn.our_state is h11.MUST_CLOSE:
+                    return
+                conn.start_next_cycle()
+            elif isinstance(event, h11.ConnectionClosed):
+                return
+
+    async def _serve_h2(self, reader, writer, initial: bytes) -> None:
+        import h2.config
+        import h2.connection
+        import h2.events
+        import h2.settings
+
+        conn = h2.connection.H2Connection(config=h2.config.H2Configuration(client_side=False))
+        conn.initiate_connection()
+        conn.update_settings({h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: 1000})
+        writer.write(conn.data_to_send())
+        requests: Dict[int, StandInRequest] = {}
+        pending = set()
+
+        async def respond(stream_id: int) -> None:
+            status, headers, body = await self.handler(requests.pop(stream_id))
+            header_list = [(":status", str(status))] + [(name, value) for name, value in headers.items()]
+            header_list.append(("content-length", str(len(body))))
+            conn.send_headers(stream_id, header_list)
+            # Respect the peer's flow-control window for large bodies
+            while body:
+                window = min(conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size)
+                if window <= 0:
+                    writer.write(conn.data_to_send())
+                    await writer.drain()
+                    await asyncio.sleep(0.001)
+                    continue
+                conn.send_data(stream_id, body[:window])
+                body = body[window:]
+                writer.write(conn.data_to_send())
+            conn.end_stream(stream_id)
+            writer.write(conn.data_to_send())
+            await writer.drain()
+
+        data = initial
+        while data:
+            for event in conn.receive_data(data):
+                if isinstance(event, h2.events.RequestReceived):
+                    headers = dict(event.headers)
+                    requests[event.stream_id] = _build_request(
+                        headers.get(b":method", b"GET"), headers.get(b":path", b"/"),
+                        [(k, v) for k, v in event.headers if not k.startswith(b":")]
+                    )
+                elif isinstance(event, h2.events.DataReceived):
+                    requests[event.stream_id].body += event.data
+                    conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                elif isinstance(event, h2.events.StreamEnded):
+                    task = asyncio.ensure_future(respond(event.stream_id))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+                elif isinstance(event, h2.events.ConnectionTerminated):
+                    return
+            writer.write(conn.data_to_send())
+            await writer.drain()
+            data = await reader.read(65536)
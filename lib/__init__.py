@@ -6,5 +6,26 @@ Core utilities for interacting with Epilot APIs.
 
 from .api_client import EpilotClient
 from .auth import load_env, get_auth_headers
+from .batch import BatchResult, RequestSpec
+from .cassette import Cassette
+from .http_cache import ValidatorCache
+from .metrics import ClientMetrics
+from .progress import Progress
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
+from .watermark import WatermarkStore
 
-__all__ = ["EpilotClient", "load_env", "get_auth_headers"]
+__all__ = [
+    "EpilotClient",
+    "RequestSpec",
+    "BatchResult",
+    "RateLimiter",
+    "RetryPolicy",
+    "ValidatorCache",
+    "Cassette",
+    "ClientMetrics",
+    "Progress",
+    "WatermarkStore",
+    "load_env",
+    "get_auth_headers",
+]
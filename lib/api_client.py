@@ -4,52 +4,455 @@ Epilot API Client
 A simple, reusable HTTP client for making requests to Epilot APIs.
 """
 
+import os
+import json
+import time
 import httpx
 import asyncio
-from typing import Any, Dict, Optional, List
+import threading
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, List, Tuple, Union
+from urllib.parse import urlsplit
+from . import codec, tracing
 from .auth import get_auth_headers
+from .batch import BatchResult, RequestSpec
+from .cassette import Cassette
+from .http_cache import ValidatorCache
+from .json_stream import iter_json_array
+from .metrics import ClientMetrics, path_template
+from .rate_limit import RateLimiter, parse_retry_after
+from .retry import RetryPolicy
+from config.epilot_config import EPILOT_API_URLS
+
+ENTITY_SEARCH_URL = f"{EPILOT_API_URLS['entity']}/v1/entity:search"
+ENTITY_SCHEMAS_URL = f"{EPILOT_API_URLS['entity']}/v1/entity/schemas"
+SEARCH_RESULT_WINDOW = 10_000  # from + size limit of offset paging in entity search
+
+def search_timestamp(moment: datetime) -> str:
+    """Format a datetime the way entity search stores _created_at / _updated_at."""
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+def time_shards(start: datetime, end: datetime, count: int) -> List[Tuple[str, Optional[str]]]:
+    """
+    Split [start, end) into `count` equal time ranges as (low, high) search timestamps.
+
+    The last range is open-ended (high is None) so entities created while
+    the export runs are not lost.
+    """
+    count = max(1, count)
+    step = (end - start) / count
+    bounds = [search_timestamp(start + step * index) for index in range(count)]
+    return [(low, bounds[index + 1] if index + 1 < count else None) for index, low in enumerate(bounds)]
+
+def range_query(q: str, field: str, low: str, high: Optional[str]) -> str:
+    """Restrict a search query to low <= field < high (high None = unbounded)."""
+    upper = f'"{high}"}}' if high else "*]"
+    return f'({q}) AND {field}:["{low}" TO {upper}'
 
 class EpilotClient:
     """
     Simple HTTP client for Epilot API interactions.
-    
+
+    The client keeps one pooled httpx.AsyncClient for its whole lifetime, so
+    consecutive requests reuse warm TCP/TLS connections. Close it with
+    `await client.aclose()` or use it as an async context manager.
+
+    With `http2=True` concurrent requests to the same host are multiplexed
+    over a single connection (requires the `h2` package).
+
+    An adaptive per-host RateLimiter starts pacing a host once it answers
+    429, backs off and retries those requests after Retry-After, so callers
+    do not need manual sleeps between requests. Until then requests go out
+    unpaced (see lib/rate_limit.py for EPILOT_RATE_LIMIT).
+
+    Transient failures (timeouts, connection errors, 5xx) are retried with
+    exponential backoff by a RetryPolicy. A POST/PATCH is only retried with
+    `idempotent=True`, or when the connection failed before it was sent.
+
+    With `cache=True` GET responses carrying ETag / Last-Modified are kept
+    on disk and revalidated with conditional requests; a 304 is served from
+    the local copy.
+
+    Concurrent identical GETs are coalesced into one network call; every
+    caller receives the same (shared) result object.
+
+    `search_iter()` pages through entity search results with the following
+    pages prefetched (optionally several in parallel) and bounded memory.
+    Offset paging stops at SEARCH_RESULT_WINDOW results; beyond that use
+    `search_after_iter()` (keyset cursor) or `search_sharded_iter()`
+    (time-range shards walked in parallel).
+
+    Every attempt is recorded in `client.metrics` (a ClientMetrics). Set
+    EPILOT_METRICS_REPORT=<file> to get a JSON report when the script exits.
+    With EPILOT_TRACE set, every attempt is also a client span nested under
+    the script phase that sent it (see lib/tracing.py).
+
+    Set EPILOT_BASE_URL_OVERRIDE=http://127.0.0.1:8080 to send every request
+    to a local stand-in such as benchmarks/mock_epilot_server.py.
+
+    With a Cassette (or EPILOT_CASSETTE=<file>) responses are recorded to
+    disk, or replayed from it without any network access. The validator
+    cache is bypassed while a cassette is active, so every body is on it.
+
+    The *_sync methods run on a background event loop owned by the client,
+    so synchronous callers share the same pool. Use one client either from
+    async code or through the *_sync methods, not both.
+
     Usage:
-        client = EpilotClient()
-        result = await client.get("https://entity.sls.epilot.io/v1/entities")
+        async with EpilotClient() as client:
+            result = await client.get("https://entity.sls.epilot.io/v1/entities")
+
+        with EpilotClient() as client:
+            result = client.get_sync("https://entity.sls.epilot.io/v1/entities")
     """
-    
-    def __init__(self, timeout: int = 30):
+
+    def __init__(
+        self,
+        timeout: int = 30,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        max_connections_per_host: Optional[int] = None,
+        http2: bool = False,
+        http1: bool = True,
+        rate_limiter: Union[RateLimiter, bool] = True,
+        max_throttle_retries: int = 5,
+        retry_policy: Optional[RetryPolicy] = None,
+        cache: Union[ValidatorCache, bool] = False,
+        single_flight: bool = True,
+        metrics: Optional[ClientMetrics] = None,
+        base_url_overrides: Optional[Dict[str, str]] = None,
+        cassette: Optional[Cassette] = None
+    ):
+        """
+        Args:
+            timeout: Request timeout in seconds
+            max_connections: Maximum number of open connections across all hosts
+            max_keepalive_connections: Maximum number of idle connections kept alive
+            keepalive_expiry: Seconds an idle connection stays in the pool
+            max_connections_per_host: Optional cap on concurrent requests per host
+            http2: Negotiate HTTP/2 where the server supports it
+            http1: Allow HTTP/1.1; set to False together with http2=True to
+                speak HTTP/2 with prior knowledge (e.g. to a local cleartext server)
+            rate_limiter: RateLimiter instance, True for RateLimiter.from_env()
+                (unpaced until a 429; EPILOT_RATE_LIMIT=off disables it) or
+                False to disable rate limiting
+            max_throttle_retries: How often a 429 response is retried
+            retry_policy: Retry settings; defaults to RetryPolicy() which
+                honors MAX_RETRIES from config/epilot_config.py
+            cache: ValidatorCache instance, True for the default cache
+                directory (data/cache/http) or False to disable
+            single_flight: Share one in-flight request between concurrent
+                identical GETs
+            metrics: Metrics collector; defaults to ClientMetrics.from_env()
+            base_url_overrides: Send requests for an origin (e.g.
+                "https://entity.sls.epilot.io") to another base URL; the key
+                "*" matches every *.epilot.io host. Defaults to
+                EPILOT_BASE_URL_OVERRIDE (a URL or a JSON object of overrides)
+            cassette: Record responses to / replay them from this cassette;
+                defaults to Cassette.from_env() (EPILOT_CASSETTE)
+        """
         self.timeout = timeout
         self.headers = get_auth_headers()
-    
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.max_connections_per_host = max_connections_per_host
+        self.http2 = http2
+        self.http1 = http1
+        if rate_limiter is True:
+            rate_limiter = RateLimiter.from_env()
+        self.rate_limiter: Optional[RateLimiter] = rate_limiter or None
+        self.max_throttle_retries = max_throttle_retries
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cassette = cassette or Cassette.from_env()
+        if cache is True:
+            cache = ValidatorCache()
+        # 304s would leave bodies off the cassette
+        self.cache: Optional[ValidatorCache] = (cache or None) if self.cassette is None else None
+        self.single_flight = single_flight
+        self.coalesced_gets = 0
+        self._inflight: Dict[str, "asyncio.Task"] = {}
+        self.metrics = metrics or ClientMetrics.from_env()
+        self.metrics.add_source("client", self._metrics_extra)
+        if base_url_overrides is None:
+            base_url_overrides = self._overrides_from_env()
+        self.base_url_overrides = {origin.rstrip("/"): base.rstrip("/") for origin, base in base_url_overrides.items()}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._host_slots: Dict[str, asyncio.Semaphore] = {}
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sync_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sync_thread: Optional[threading.Thread] = None
+        self._sync_lock = threading.Lock()
+
+    @staticmethod
+    def _overrides_from_env() -> Dict[str, str]:
+        """Read EPILOT_BASE_URL_OVERRIDE: a single base URL for all hosts or a JSON mapping."""
+        value = os.getenv("EPILOT_BASE_URL_OVERRIDE", "").strip()
+        if not value:
+            return {}
+        if value.startswith("{"):
+            return json.loads(value)
+        return {"*": value}
+
+    def _resolve_url(self, url: str) -> str:
+        """Apply base_url_overrides to a request URL."""
+        if not self.base_url_overrides:
+            return url
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        base = self.base_url_overrides.get(origin) or self.base_url_overrides.get(parts.netloc)
+        if base is None and (parts.hostname or "").endswith("epilot.io"):
+            base = self.base_url_overrides.get("*")
+        if base is None:
+            return url
+        return base + url[len(origin):]
+
+    async def __aenter__(self) -> "EpilotClient":
+        self._get_http_client()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the pooled client, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        if self._client is not None and not self._client.is_closed and self._client_loop is not loop:
+            raise RuntimeError(
+                "EpilotClient is already bound to another event loop; "
+                "use a separate client for async and *_sync calls"
+            )
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http1=self.http1,
+                http2=self.http2
+            )
+            self._client_loop = loop
+            self._host_slots = {}
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        # The client is usually gone by the time the metrics report is written at exit
+        self.metrics.sample_sources()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+            self._host_slots = {}
+
+    def _host_slot(self, url: str) -> Optional[asyncio.Semaphore]:
+        """Return the per-host concurrency slot for a URL, if limited."""
+        if not self.max_connections_per_host:
+            return None
+        host = urlsplit(url).netloc
+        if host not in self._host_slots:
+            self._host_slots[host] = asyncio.Semaphore(self.max_connections_per_host)
+        return self._host_slots[host]
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        stream: bool = False
+    ) -> httpx.Response:
+        """Send a single request, respecting the per-host limits."""
+        client = self._get_http_client()
+        slot = self._host_slot(url)
+        # Overrides only change where the request goes; limits and metrics stay keyed by the real host
+        request = client.build_request(method, self._resolve_url(url), headers=headers, params=params, json=data)
+
+        attributes = {"http.request.method": method, "server.address": urlsplit(url).hostname, "url.full": url}
+        with tracing.span(f"{method} {path_template(url)}", kind="client", **attributes) as span:
+            replaying = self.cassette is not None and self.cassette.replaying
+
+            if self.rate_limiter is not None and not replaying:
+                waited = time.perf_counter()
+                await self.rate_limiter.acquire(url)
+                span.set_attribute("epilot.rate_limit_wait_ms", round((time.perf_counter() - waited) * 1000, 3))
+
+            started = time.perf_counter()
+            try:
+                if replaying:
+                    response = await self.cassette.play(url, request)
+                elif slot is None:
+                    response = await client.send(request, stream=stream)
+                else:
+                    async with slot:
+                        response = await client.send(request, stream=stream)
+                if self.cassette is not None and self.cassette.recording:
+                    if stream:
+                        await response.aread()
+                    self.cassette.record(url, request, response, time.perf_counter() - started)
+            except httpx.TransportError as e:
+                span.set_attribute("error.type", type(e).__name__)
+                self.metrics.record(method, url, type(e).__name__, time.perf_counter() - started, len(request.content))
+                raise
+
+            self.metrics.record(
+                method, url, response.status_code, time.perf_counter() - started,
+                bytes_sent=len(request.content),
+                # Replayed bodies are in memory and never count as downloaded
+                bytes_received=0 if stream and not replaying else len(response.content)
+            )
+            span.set_attribute("http.response.status_code", response.status_code)
+            if response.status_code >= 400:
+                span.set_attribute("error.type", str(response.status_code))
+            if self.rate_limiter is not None:
+                self.rate_limiter.record(url, response)
+            return response
+
+    def _metrics_extra(self) -> Dict[str, Any]:
+        """Client-level counters included in the metrics report."""
+        extra: Dict[str, Any] = {"coalesced_gets": self.coalesced_gets}
+        if self.cache is not None:
+            extra["cache_hits"] = self.cache.hits
+            extra["cache_misses"] = self.cache.misses
+        if self.retry_policy is not None:
+            extra["retry_budget_remaining"] = self.retry_policy.budget_remaining
+        if self.rate_limiter is not None:
+            extra["rate_limits"] = self.rate_limiter.current_rates()
+        if self.cassette is not None:
+            extra["cassette"] = self.cassette.stats()
+        return extra
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        custom_headers: Optional[Dict[str, str]] = None,
+        idempotent: bool = False,
+        idempotency_key: Optional[str] = None,
+        stream: bool = False
+    ) -> httpx.Response:
+        """
+        Send a request over the pooled client, retrying transient failures, and raise on HTTP errors.
+
+        With `stream=True` the body is not read; the caller must close the response.
+        """
+        headers = {**self.headers, **(custom_headers or {})}
+        if idempotency_key:
+            # Only a header: whether the server deduplicates on it is up to the API
+            headers["Idempotency-Key"] = idempotency_key
+
+        attempt = 0
+        throttled = 0
+        while True:
+            try:
+                response = await self._send(method, url, headers, params=params, data=data, stream=stream)
+            except httpx.TransportError as e:
+                if not self.retry_policy.should_retry(method, attempt, idempotent, error=e):
+                    raise
+                self.metrics.record_retry(method, url)
+                await asyncio.sleep(self.retry_policy.backoff(attempt))
+                attempt += 1
+                continue
+
+            # 429s are retried once the limiter lets us through again
+            if response.status_code == 429 and self.rate_limiter is not None:
+                self.metrics.record_throttle(method, url)
+                if throttled < self.max_throttle_retries:
+                    throttled += 1
+                    await response.aclose()
+                    continue
+                break
+
+            if self.retry_policy.should_retry(method, attempt, idempotent, response=response):
+                self.metrics.record_retry(method, url)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                await response.aclose()
+                await asyncio.sleep(self.retry_policy.backoff(attempt, retry_after))
+                attempt += 1
+                continue
+            break
+
+        if response.status_code != 304 and response.is_error and stream:
+            await response.aclose()
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+
     async def get(
-        self, 
-        url: str, 
+        self,
+        url: str,
         params: Optional[Dict[str, Any]] = None,
         custom_headers: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
-        """Make a GET request."""
-        headers = {**self.headers, **(custom_headers or {})}
-        
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            return response.json()
-    
+        """Make a GET request, sharing identical in-flight GETs."""
+        if not self.single_flight:
+            return await self._get(url, params, custom_headers)
+
+        key = json.dumps([url, params, custom_headers], sort_keys=True, default=str)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._get(url, params, custom_headers))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.coalesced_gets += 1
+        # Shielded so one cancelled caller does not cancel the shared request
+        return await asyncio.shield(task)
+
+    async def _get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        custom_headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Perform a GET, revalidating against the cache if enabled."""
+        if self.cache is None:
+            response = await self._request("GET", url, params=params, custom_headers=custom_headers)
+            return codec.loads(response.content)
+
+        key = self.cache.key(url, params, self.headers.get("Authorization", ""))
+        entry = self.cache.load(key)
+        headers = {**self.cache.conditional_headers(entry), **(custom_headers or {})}
+        response = await self._request("GET", url, params=params, custom_headers=headers)
+
+        if response.status_code == 304:
+            if entry is None:
+                response.raise_for_status()
+            self.cache.hits += 1
+            return entry["body"]
+
+        self.cache.misses += 1
+        body = codec.loads(response.content)
+        self.cache.store(key, url, response, body)
+        return body
+
     async def post(
         self,
         url: str,
         data: Optional[Dict[str, Any]] = None,
-        custom_headers: Optional[Dict[str, str]] = None
+        custom_headers: Optional[Dict[str, str]] = None,
+        idempotent: bool = False,
+        idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Make a POST request."""
-        headers = {**self.headers, **(custom_headers or {})}
-        
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json()
-    
+        """
+        Make a POST request.
+
+        POSTs are only retried when `idempotent=True` (e.g. read-only search
+        endpoints) or when the connection failed before the request was sent.
+        An `idempotency_key` is sent as Idempotency-Key header; pass
+        `idempotent=True` as well only if the endpoint is documented to
+        deduplicate on it.
+        """
+        response = await self._request(
+            "POST", url, data=data, custom_headers=custom_headers,
+            idempotent=idempotent, idempotency_key=idempotency_key
+        )
+        return codec.loads(response.content)
+
     async def put(
         self,
         url: str,
@@ -57,55 +460,520 @@ class EpilotClient:
         custom_headers: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """Make a PUT request."""
-        headers = {**self.headers, **(custom_headers or {})}
-        
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.put(url, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json()
-    
+        response = await self._request("PUT", url, data=data, custom_headers=custom_headers)
+        return codec.loads(response.content)
+
     async def delete(
         self,
         url: str,
         custom_headers: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """Make a DELETE request."""
-        headers = {**self.headers, **(custom_headers or {})}
-        
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.delete(url, headers=headers)
-            response.raise_for_status()
-            if response.content:
-                return response.json()
-            return {"status": "success"}
-    
+        response = await self._request("DELETE", url, custom_headers=custom_headers)
+        if response.content:
+            return codec.loads(response.content)
+        return {"status": "success"}
+
     async def patch(
         self,
         url: str,
         data: Optional[Dict[str, Any]] = None,
-        custom_headers: Optional[Dict[str, str]] = None
+        custom_headers: Optional[Dict[str, str]] = None,
+        idempotent: bool = False,
+        idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """Make a PATCH request."""
-        headers = {**self.headers, **(custom_headers or {})}
-        
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
-            response = await client.patch(url, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json()
-    
+        response = await self._request(
+            "PATCH", url, data=data, custom_headers=custom_headers,
+            idempotent=idempotent, idempotency_key=idempotency_key
+        )
+        return codec.loads(response.content)
+
+    async def stream_items(
+        self,
+        method: str,
+        url: str,
+        item_path: Optional[str] = "results",
+        params: Optional[Dict[str, Any]] = None,
+        data: Optional[Dict[str, Any]] = None,
+        custom_headers: Optional[Dict[str, str]] = None,
+        idempotent: bool = False,
+        meta: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[Any]:
+        """
+        Stream a large response and yield the elements of one array as they arrive.
+
+        Args:
+            item_path: Dotted path of the array to stream ("results", "steps",
+                "manifest.resources"), or None if the body itself is an array
+            meta: Optional dict that receives top-level members seen before
+                the array (e.g. `total`)
+
+        Usage:
+            async for entity in client.stream_items("POST", search_url, data=query, idempotent=True):
+                ...
+        """
+        response = await self._request(
+            method, url, params=params, data=data, custom_headers=custom_headers,
+            idempotent=idempotent, stream=True
+        )
+        try:
+            async for item in iter_json_array(response.aiter_bytes(), item_path, meta):
+                yield item
+        finally:
+            await response.aclose()
+            self.metrics.add_received(method, url, response.num_bytes_downloaded)
+
+    # Entity schemas
+    async def get_entity_schema(self, slug: str, url: str = ENTITY_SCHEMAS_URL) -> Optional[Dict[str, Any]]:
+        """The schema definition (attributes, capabilities, ...) of an entity type, or None if unknown."""
+        result = await self.get(url)
+        return next((schema for schema in result.get("schemas", []) if schema.get("slug") == slug), None)
+
+    # Entity search
+    async def search_iter(
+        self,
+        q: str,
+        page_size: int = 100,
+        fields: Optional[List[str]] = None,
+        hydrate: bool = False,
+        sort: Optional[str] = None,
+        limit: Optional[int] = None,
+        meta: Optional[Dict[str, Any]] = None,
+        concurrency: int = 1,
+        ordered: bool = True,
+        url: str = ENTITY_SEARCH_URL
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield every entity matching an entity search query, page by page.
+
+        The first response tells how many results there are; the remaining
+        pages are then fetched with up to `concurrency` requests in flight
+        while the caller works through the pages already received. At most
+        `concurrency + 1` pages are held at a time, so memory stays bounded
+        for any number of results.
+
+        Args:
+            q: Search query, e.g. "_schema:contact"
+            page_size: Entities per request
+            fields: Only return these attributes (plus _id and _schema)
+            hydrate: Resolve relations in the results
+            sort: Sort expression, e.g. "_created_at:asc"
+            limit: Stop after this many entities
+            meta: Optional dict that receives `total` after the first page
+            concurrency: Pages requested in parallel after the first one
+                (1 = sequential with the next page prefetched)
+            ordered: Yield pages in offset order; False yields each page as
+                soon as it arrives
+
+        Offset pages are only consistent while the result set does not
+        change; sort by a stable field when exporting a busy tenant. The
+        search engine rejects offsets past SEARCH_RESULT_WINDOW, and deep
+        offsets get slower with every page: use search_after_iter() or
+        search_sharded_iter() for large result sets.
+
+        Usage:
+            async for contact in client.search_iter("_schema:contact", fields=["first_name", "email"]):
+                ...
+
+            async for contact in client.search_iter("_schema:contact", concurrency=8, ordered=False):
+                ...
+        """
+        def page_request(offset: int, size: int) -> "asyncio.Future":
+            query: Dict[str, Any] = {"q": q, "from": offset, "size": size, "hydrate": hydrate}
+            if fields:
+                query["fields"] = fields
+            if sort:
+                query["sort"] = sort
+            # Search is read-only, so transient failures may be retried
+            return asyncio.ensure_future(self.post(url, data=query, idempotent=True))
+
+        first = await page_request(0, min(page_size, limit) if limit is not None else page_size)
+        total = first.get("total", 0)
+        if meta is not None:
+            meta["total"] = total
+        entities = first.get("results", [])
+        del first
+
+        end = min(total, limit) if limit is not None else total
+        offsets = iter(range(len(entities), end, page_size)) if entities else iter(())
+        in_flight: List[asyncio.Future] = []
+
+        def fill() -> None:
+            while len(in_flight) < max(1, concurrency):
+                offset = next(offsets, None)
+                if offset is None:
+                    return
+                in_flight.append(page_request(offset, min(page_size, end - offset)))
+
+        try:
+            fill()
+            for entity in entities:
+                yield entity
+            del entities
+
+            while in_flight:
+                if ordered:
+                    future = in_flight.pop(0)
+                    result = await future
+                else:
+                    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    future = done.pop()
+                    in_flight.remove(future)
+                    result = future.result()
+                # Keep the window full while the caller consumes this page
+                fill()
+                for entity in result.get("results", []):
+                    yield entity
+                # Drop the page before waiting for the next one
+                del result
+        finally:
+            for future in in_flight:
+                future.cancel()
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def search_count(self, q: str, url: str = ENTITY_SEARCH_URL) -> int:
+        """Number of entities matching a search query (fetches no results)."""
+        result = await self.post(url, data={"q": q, "from": 0, "size": 0}, idempotent=True)
+        return result.get("total", 0)
+
+    async def _edge_timestamp(self, q: str, field: str, direction: str, url: str) -> Optional[datetime]:
+        """Oldest ("asc") or newest ("desc") value of a timestamp field among the matches."""
+        result = await self.post(url, data={"q": q, "size": 1, "sort": f"{field}:{direction}", "fields": [field]}, idempotent=True)
+        results = result.get("results", [])
+        if not results or not results[0].get(field):
+            return None
+        return datetime.fromisoformat(results[0][field].replace("Z", "+00:00"))
+
+    async def _search_after_pages(
+        self,
+        q: str,
+        page_size: int,
+        fields: Optional[List[str]],
+        hydrate: bool,
+        sort_field: str,
+        url: str,
+        after: Optional[List[Any]] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Pages of a keyset walk ordered by (sort_field, _id), starting after `after`."""
+        sort = "_id:asc" if sort_field == "_id" else f"{sort_field}:asc,_id:asc"
+        if fields and sort_field not in fields:
+            fields = [*fields, sort_field]
+        cursor = after
+        while True:
+            query: Dict[str, Any] = {"q": q, "size": page_size, "hydrate": hydrate, "sort": sort}
+            if fields:
+                query["fields"] = fields
+            if cursor:
+                query["search_after"] = cursor
+            result = await self.post(url, data=query, idempotent=True)
+            page = result.get("results", [])
+            if not page:
+                return
+            last = page[-1]
+            cursor = [last.get("_id")] if sort_field == "_id" else [last.get(sort_field), last.get("_id")]
+            yield page
+            if len(page) < page_size:
+                return
+
+    async def search_after_iter(
+        self,
+        q: str,
+        page_size: int = 100,
+        fields: Optional[List[str]] = None,
+        hydrate: bool = False,
+        sort_field: str = "_created_at",
+        limit: Optional[int] = None,
+        after: Optional[List[Any]] = None,
+        url: str = ENTITY_SEARCH_URL
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield every entity matching a search query using a keyset cursor.
+
+        Each page continues after the (sort_field, _id) of the previous
+        one via `search_after`, so the cost per page stays constant however
+        deep the walk goes and there is no result window limit. Pages are
+        fetched one after the other; see search_sharded_iter() to walk
+        several ranges in parallel.
+
+        Args:
+            q: Search query, e.g. "_schema:contact"
+            page_size: Entities per request
+            fields: Only return these attributes (sort_field is added)
+            hydrate: Resolve relations in the results
+            sort_field: Attribute to walk by: "_created_at", "_updated_at" or "_id"
+            limit: Stop after this many entities
+            after: Start after this (sort_field value, _id) cursor, e.g. the
+                last entity of a previous run for an incremental export
+
+        Usage:
+            async for contact in client.search_after_iter("_schema:contact"):
+                ...
+
+            async for contact in client.search_after_iter(
+                "_schema:contact", sort_field="_updated_at", after=[last_updated_at, last_id]
+            ):
+                ...
+        """
+        yielded = 0
+        async for page in self._search_after_pages(q, page_size, fields, hydrate, sort_field, url, after):
+            for entity in page:
+                if limit is not None and yielded >= limit:
+                    return
+                yield entity
+                yielded += 1
+
+    async def search_sharded_iter(
+        self,
+        q: str,
+        shards: int = 16,
+        concurrency: int = 4,
+        page_size: int = 100,
+        fields: Optional[List[str]] = None,
+        hydrate: bool = False,
+        field: str = "_created_at",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        limit: Optional[int] = None,
+        meta: Optional[Dict[str, Any]] = None,
+        url: str = ENTITY_SEARCH_URL
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield every entity matching a search query, walking time-range shards in parallel.
+
+        [start, end) on `field` is split into `shards` equal ranges, each
+        walked with a search_after cursor; `concurrency` shards are walked
+        at a time. Using more shards than workers evens out ranges that hold
+        more entities than others. Entities are yielded as pages arrive, in
+        no particular order across shards.
+
+        Args:
+            q: Search query, e.g. "_schema:contact"
+            shards: Number of time ranges
+            concurrency: Shards walked in parallel
+            page_size: Entities per request
+            fields: Only return these attributes (field is added)
+            hydrate: Resolve relations in the results
+            field: Timestamp attribute to shard by ("_created_at" or "_updated_at")
+            start: Lower bound (default: the oldest matching entity)
+            end: Upper bound of the even split (default: the newest
+                matching entity); the last shard is open-ended
+            limit: Stop after this many entities
+            meta: Optional dict that receives `total` and `shards`
+
+        Usage:
+            async for contact in client.search_sharded_iter("_schema:contact", shards=32, concurrency=8):
+                ...
+        """
+        total = await self.search_count(q, url)
+        if meta is not None:
+            meta["total"] = total
+        if not total:
+            return
+
+        start = start or await self._edge_timestamp(q, field, "asc", url)
+        end = end or await self._edge_timestamp(q, field, "desc", url)
+        if start is None or end is None:
+            return
+        ranges = time_shards(start, max(end, start), shards)
+        if meta is not None:
+            meta["shards"] = len(ranges)
+
+        pending = iter(ranges)
+        pages: asyncio.Queue = asyncio.Queue(maxsize=max(1, concurrency))
+        done = object()
+
+        async def worker() -> None:
+            try:
+                for low, high in pending:
+                    shard_q = range_query(q, field, low, high)
+                    async for page in self._search_after_pages(shard_q, page_size, fields, hydrate, field, url):
+                        await pages.put(page)
+            except Exception as e:
+                # Raised by the consumer, which then cancels the other workers
+                await pages.put(e)
+                return
+            await pages.put(done)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(max(1, min(concurrency, len(ranges))))]
+        running = len(workers)
+        yielded = 0
+        try:
+            while running:
+                item = await pages.get()
+                if item is done:
+                    running -= 1
+                    continue
+                if isinstance(item, Exception):
+                    raise item
+                for entity in item:
+                    if limit is not None and yielded >= limit:
+                        return
+                    yield entity
+                    yielded += 1
+                del item
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    # Batch requests
+    async def execute(self, spec: RequestSpec) -> Dict[str, Any]:
+        """Run a single RequestSpec through the matching verb method."""
+        method = spec.method.upper()
+        if method == "GET":
+            return await self.get(spec.url, params=spec.params, custom_headers=spec.custom_headers)
+        if method == "DELETE":
+            return await self.delete(spec.url, custom_headers=spec.custom_headers)
+        if method == "PUT":
+            return await self.put(spec.url, data=spec.data, custom_headers=spec.custom_headers)
+        if method in ("POST", "PATCH"):
+            verb = self.post if method == "POST" else self.patch
+            return await verb(
+                spec.url, data=spec.data, custom_headers=spec.custom_headers,
+                idempotent=spec.idempotent, idempotency_key=spec.idempotency_key
+            )
+        raise ValueError(f"Unsupported method in batch: {spec.method}")
+
+    async def batch_iter(
+        self,
+        specs: Iterable[Union[RequestSpec, Dict[str, Any]]],
+        concurrency: int = 10
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Run requests with at most `concurrency` in flight and yield each
+        BatchResult as soon as it completes.
+
+        `specs` is consumed lazily, so generators of any size are fine.
+        Failures of an item, including a malformed spec, are reported via
+        BatchResult.error, never raised. An exception raised by `specs`
+        itself is not tied to any item: it ends the batch and is re-raised
+        here once the requests already started have been cancelled.
+        """
+        pending = iter(enumerate(specs))
+        results: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def worker():
+            try:
+                while True:
+                    try:
+                        index, spec = next(pending)
+                    except StopIteration:
+                        return
+                    except Exception as e:
+                        await results.put(e)
+                        return
+                    try:
+                        spec = RequestSpec.coerce(spec)
+                        result = await self.execute(spec)
+                    except Exception as e:
+                        await results.put(BatchResult(index, spec, error=e))
+                    else:
+                        await results.put(BatchResult(index, spec, result=result))
+            finally:
+                await results.put(done)
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(max(1, concurrency))]
+        try:
+            running = len(workers)
+            while running:
+                item = await results.get()
+                if item is done:
+                    running -= 1
+                elif isinstance(item, Exception):
+                    raise item
+                else:
+                    yield item
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def batch(
+        self,
+        specs: Iterable[Union[RequestSpec, Dict[str, Any]]],
+        concurrency: int = 10
+    ) -> List[BatchResult]:
+        """
+        Run requests with bounded concurrency and return results in input order.
+
+        Every item of `specs` gets a BatchResult; see batch_iter() for errors.
+
+        Usage:
+            specs = [RequestSpec("GET", f"{base}/v1/entity/contact/{id}") for id in ids]
+            for item in await client.batch(specs, concurrency=20):
+                if item.ok:
+                    print(item.result["_title"])
+        """
+        results = [item async for item in self.batch_iter(specs, concurrency)]
+        results.sort(key=lambda item: item.index)
+        return results
+
     # Synchronous wrappers for convenience
+    def __enter__(self) -> "EpilotClient":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _ensure_sync_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop thread on first use."""
+        with self._sync_lock:
+            if self._sync_loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(target=loop.run_forever, name="EpilotClient-sync", daemon=True)
+                thread.start()
+                self._sync_loop = loop
+                self._sync_thread = thread
+            return self._sync_loop
+
+    def _run_sync(self, coro) -> Any:
+        """Run a coroutine on the background loop and wait for its result."""
+        loop = self._ensure_sync_loop()
+        if threading.current_thread() is self._sync_thread:
+            coro.close()
+            raise RuntimeError("*_sync methods cannot be called from the client's own event loop")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def close(self) -> None:
+        """Close the pool and stop the background loop used by the *_sync methods."""
+        with self._sync_lock:
+            loop, thread = self._sync_loop, self._sync_thread
+            self._sync_loop = None
+            self._sync_thread = None
+        if loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self.aclose(), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
     def get_sync(self, url: str, **kwargs) -> Dict[str, Any]:
         """Synchronous GET request."""
-        return asyncio.run(self.get(url, **kwargs))
-    
+        return self._run_sync(self.get(url, **kwargs))
+
     def post_sync(self, url: str, **kwargs) -> Dict[str, Any]:
         """Synchronous POST request."""
-        return asyncio.run(self.post(url, **kwargs))
-    
+        return self._run_sync(self.post(url, **kwargs))
+
     def put_sync(self, url: str, **kwargs) -> Dict[str, Any]:
         """Synchronous PUT request."""
-        return asyncio.run(self.put(url, **kwargs))
-    
+        return self._run_sync(self.put(url, **kwargs))
+
     def delete_sync(self, url: str, **kwargs) -> Dict[str, Any]:
         """Synchronous DELETE request."""
-        return asyncio.run(self.delete(url, **kwargs))
+        return self._run_sync(self.delete(url, **kwargs))
+
+    def patch_sync(self, url: str, **kwargs) -> Dict[str, Any]:
+        """Synchronous PATCH request."""
+        return self._run_sync(self.patch(url, **kwargs))
+
+    def batch_sync(
+        self,
+        specs: Iterable[Union[RequestSpec, Dict[str, Any]]],
+        concurrency: int = 10
+    ) -> List[BatchResult]:
+        """Synchronous batch request, results in input order."""
+        return self._run_sync(self.batch(specs, concurrency))
@@ -0,0 +1,40 @@
+"""
+Batch request types for EpilotClient
+
+Describe many requests up front and let EpilotClient.batch() /
+EpilotClient.batch_iter() run them with bounded concurrency.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Union
+
+@dataclass
+class RequestSpec:
+    """A single request in a batch."""
+    method: str
+    url: str
+    params: Optional[Dict[str, Any]] = None
+    data: Optional[Dict[str, Any]] = None
+    custom_headers: Optional[Dict[str, str]] = None
+    idempotent: bool = False
+    idempotency_key: Optional[str] = None
+    tag: Any = None  # Free-form caller context, returned with the result
+
+    @classmethod
+    def coerce(cls, spec: Union["RequestSpec", Dict[str, Any]]) -> "RequestSpec":
+        """Accept either a RequestSpec or a dict with the same keys."""
+        if isinstance(spec, cls):
+            return spec
+        return cls(**spec)
+
+@dataclass
+class BatchResult:
+    """Outcome of one batch item: either `result` or `error` is set."""
+    index: int
+    spec: Union[RequestSpec, Any]  # The input as given if it was not a valid spec
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
@@ -0,0 +1,254 @@
+"""
+Record/replay cassettes for EpilotClient
+
+A cassette is a gzip-compressed JSON-lines file of real API interactions.
+In record mode EpilotClient appends every response to it; in replay mode
+requests never touch the network and are answered from the cassette,
+delayed by the recorded latency (scaled by `timing`, 0 for none).
+
+Cassettes never contain credentials: request headers are not stored, the
+API token and the value of every auth header a request carried
+(Authorization, Cookie, X-Api-Key, ...) are removed from URLs and response
+bodies, and only a few response headers are kept.
+
+Set EPILOT_CASSETTE=<file> (plus EPILOT_CASSETTE_MODE=record|replay and
+optionally EPILOT_CASSETTE_TIMING=<factor>) to use one from any script.
+
+All clients of one process that record to the same file append to one
+recording. Separate processes must not share a file, or the last one to
+start overwrites the others: put "{pid}" in the name for scripts that start
+other scripts (e.g. data/cassettes/demo_{pid}.jsonl.gz). On replay "{pid}"
+matches every recorded process and all of their interactions are served.
+"""
+
+import os
+import gzip
+import atexit
+import asyncio
+import hashlib
+import threading
+from collections import deque
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Sequence, Set, Union
+from urllib.parse import urlsplit
+
+import httpx
+
+from . import codec
+
+CASSETTE_VERSION = 1
+MODES = ("record", "replay")
+KEPT_HEADERS = ("content-type", "etag", "last-modified", "retry-after")
+# Request headers whose values are removed wherever they show up in a recording
+AUTH_HEADERS = ("authorization", "proxy-authorization", "cookie", "x-api-key")
+REDACTED = "<redacted>"
+PID_PLACEHOLDER = "{pid}"
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request that is not on the cassette."""
+
+def header_secrets(headers: httpx.Headers) -> List[str]:
+    """Credential values carried by request headers ("Bearer <token>" yields the token too)."""
+    found = []
+    for name in AUTH_HEADERS:
+        for value in headers.get_list(name):
+            found.append(value)
+            scheme, _, credentials = value.partition(" ")
+            if credentials and scheme.lower() in ("bearer", "basic", "token"):
+                found.append(credentials.strip())
+    return [value for value in found if len(value) >= 8]
+
+class _Recording:
+    """An open cassette file, shared by every Cassette of this process that records to it."""
+
+    def __init__(self, path: Path, append: bool):
+        self.path = path
+        self.users = 0
+        self.lock = threading.Lock()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Appending adds a gzip member, which gzip.open reads as one stream
+        self.file = gzip.open(path, 'ab' if append else 'wb')
+        if not append:
+            self.file.write(codec.dumps({"version": CASSETTE_VERSION, "recorded_at": datetime.now().isoformat()}, compact=True) + b"\n")
+
+    def write(self, line: bytes) -> None:
+        with self.lock:
+            self.file.write(line)
+
+_recordings: Dict[Path, _Recording] = {}
+_recorded_paths: Set[Path] = set()
+_recordings_lock = threading.Lock()
+
+def _open_recording(path: Path) -> _Recording:
+    key = path.resolve()
+    with _recordings_lock:
+        recording = _recordings.get(key)
+        if recording is None:
+            # A file this process already finished is continued, not overwritten
+            recording = _recordings[key] = _Recording(path, append=key in _recorded_paths)
+            _recorded_paths.add(key)
+        recording.users += 1
+        return recording
+
+def _release_recording(recording: _Recording) -> None:
+    with _recordings_lock:
+        recording.users -= 1
+        if recording.users > 0:
+            return
+        _recordings.pop(recording.path.resolve(), None)
+    with recording.lock:
+        recording.file.close()
+
+def interaction_key(method: str, url: str, query: bytes, body: bytes) -> str:
+    """Match requests by verb, URL without query, encoded query and body."""
+    parts = urlsplit(url)
+    raw = b"\0".join([
+        method.upper().encode(),
+        f"{parts.scheme}://{parts.netloc}{parts.path}".encode(),
+        query or parts.query.encode(),
+        body,
+    ])
+    return hashlib.sha256(raw).hexdigest()[:32]
+
+class Cassette:
+    """
+    Recorded API interactions for one EpilotClient.
+
+    Identical requests are replayed in the order they were recorded; once
+    only the last recording is left it is repeated, so re-running a script
+    with a few extra calls still works.
+
+    Usage:
+        client = EpilotClient(cassette=Cassette("data/cassettes/journeys.jsonl.gz", mode="record"))
+        client = EpilotClient(cassette=Cassette("data/cassettes/journeys.jsonl.gz", timing=0))
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        mode: str = "replay",
+        timing: float = 1.0,
+        secrets: Optional[List[str]] = None
+    ):
+        """
+        Args:
+            path: Cassette file (gzip-compressed JSON lines); "{pid}" is
+                replaced by the process id when recording and matches any
+                process id on replay
+            mode: "record" to capture responses, "replay" to serve them
+            timing: Factor applied to the recorded latency on replay
+                (1.0 = as recorded, 0 = no delay, e.g. for CPU profiling)
+            secrets: Extra strings to remove from recordings; the API token
+                from EPILOT_API_TOKEN is always removed
+        """
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode: {mode!r} (expected one of {', '.join(MODES)})")
+        path = str(path)
+        self.path = Path(path.replace(PID_PLACEHOLDER, str(os.getpid())) if mode == "record" else path)
+        self.mode = mode
+        self.timing = timing
+        self.secrets = [s for s in [os.getenv("EPILOT_API_TOKEN", ""), *(secrets or [])] if s]
+        self.recorded = 0
+        self.replayed = 0
+        self._interactions: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._recording: Optional[_Recording] = None
+
+        if self.replaying:
+            self._load()
+        else:
+            atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls) -> Optional["Cassette"]:
+        """Build a cassette from EPILOT_CASSETTE / _MODE / _TIMING, or None if unset."""
+        path = os.getenv("EPILOT_CASSETTE")
+        if not path:
+            return None
+        timing = os.getenv("EPILOT_CASSETTE_TIMING")
+        return cls(
+            path,
+            mode=os.getenv("EPILOT_CASSETTE_MODE", "replay").lower(),
+            timing=float(timing) if timing else 1.0
+        )
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _scrub(self, text: str, secrets: Sequence[str] = ()) -> str:
+        # Longest first, so a token inside a full header value does not leave the rest behind
+        for secret in sorted({*self.secrets, *secrets}, key=len, reverse=True):
+            text = text.replace(secret, REDACTED)
+        return text
+
+    def _files(self) -> List[Path]:
+        """The cassette file, or every recorded process of a "{pid}" cassette."""
+        if PID_PLACEHOLDER not in self.path.name:
+            return [self.path] if self.path.exists() else []
+        return sorted(self.path.parent.glob(self.path.name.replace(PID_PLACEHOLDER, "*")))
+
+    def _load(self) -> None:
+        files = self._files()
+        if not files:
+            raise FileNotFoundError(f"Cassette not found: {self.path} (record it first with mode='record')")
+        for path in files:
+            with gzip.open(path, 'rb') as f:
+                header = codec.loads(f.readline())
+                if header.get("version") != CASSETTE_VERSION:
+                    raise ValueError(f"Unsupported cassette version in {path}: {header.get('version')}")
+                for line in f:
+                    interaction = codec.loads(line)
+                    self._interactions.setdefault(interaction["key"], deque()).append(interaction)
+
+    def record(self, url: str, request: httpx.Request, response: httpx.Response, seconds: float) -> None:
+        """Append one interaction; the response body must already be read."""
+        if self._recording is None:
+            self._recording = _open_recording(self.path)
+
+        secrets = header_secrets(request.headers)
+        interaction = {
+            "key": interaction_key(request.method, url, request.url.query, request.content),
+            "method": request.method,
+            "url": self._scrub(url, secrets),
+            "status": response.status_code,
+            "headers": {
+                name: self._scrub(response.headers[name], secrets)
+                for name in KEPT_HEADERS if name in response.headers
+            },
+            "seconds": round(seconds, 4),
+            "body": self._scrub(response.content.decode("utf-8", errors="replace"), secrets),
+        }
+        self._recording.write(codec.dumps(interaction, compact=True) + b"\n")
+        self.recorded += 1
+
+    async def play(self, url: str, request: httpx.Request) -> httpx.Response:
+        """Answer a request from the cassette, after the recorded delay."""
+        key = interaction_key(request.method, url, request.url.query, request.content)
+        recordings = self._interactions.get(key)
+        if not recordings:
+            raise CassetteMiss(f"No recorded response for {request.method} {url} in {self.path}")
+        interaction = recordings.popleft() if len(recordings) > 1 else recordings[0]
+
+        if self.timing > 0 and interaction["seconds"] > 0:
+            await asyncio.sleep(interaction["seconds"] * self.timing)
+        self.replayed += 1
+        return httpx.Response(
+            interaction["status"],
+            headers=interaction["headers"],
+            content=interaction["body"].encode("utf-8"),
+            request=request
+        )
+
+    def close(self) -> None:
+        """Finish writing a recording (the file is closed once its last client is done)."""
+        if self._recording is not None:
+            _release_recording(self._recording)
+            self._recording = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": str(self.path), "mode": self.mode, "recorded": self.recorded, "replayed": self.replayed}
@@ -0,0 +1,61 @@
+"""
+JSON codec used by EpilotClient and the exporters
+
+Uses orjson when it is installed and falls back to the stdlib json module
+otherwise. Set EPILOT_JSON_BACKEND=json to force the stdlib backend.
+
+Both backends write UTF-8 with non-ASCII kept as is and two-space
+indentation (no whitespace at all in compact mode), so files keep the
+exporters' layout. The orjson output is not byte-identical to json.dump,
+though: floats in exponent form are written as 1e16 / 1e-7 instead of
+1e+16 / 1e-07, and NaN / Infinity become null instead of the non-standard
+NaN / Infinity. Force the stdlib backend where exact output matters.
+"""
+
+import os
+import json
+from pathlib import Path
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if os.getenv("EPILOT_JSON_BACKEND", "").lower() == "json":
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse a JSON document."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps(obj: Any, compact: bool = False) -> bytes:
+    """
+    Serialize to UTF-8 encoded JSON.
+
+    Args:
+        compact: Drop all optional whitespace (for machine-consumed files)
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=0 if compact else orjson.OPT_INDENT_2)
+        except TypeError:
+            # e.g. integers beyond 64 bit or non-string keys: let json handle it
+            pass
+    if compact:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+def read_json(path: Union[str, Path]) -> Any:
+    """Read and parse a JSON file."""
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+def write_json(path: Union[str, Path], obj: Any, compact: bool = False) -> None:
+    """Serialize `obj` and write it to `path`."""
+    with open(path, 'wb') as f:
+        f.write(dumps(obj, compact=compact))
@@ -0,0 +1,184 @@
+"""
+Parquet output for entity exports
+
+Writes exported rows to a Parquet file in row groups while pages stream
+in, with column types derived from the entity schema (/v1/entity/schemas):
+numbers stay numbers, booleans booleans and timestamps timestamps, so
+analysts do not re-parse a CSV on every load.
+
+Needs pyarrow (optional dependency, see requirements.txt).
+"""
+
+from pathlib import Path
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+ROW_GROUP_SIZE = 50_000
+COMPRESSION = "zstd"
+
+# Epilot attribute type -> column type; everything else is exported as string
+NUMBER_TYPES = {"number", "currency"}
+BOOLEAN_TYPES = {"boolean"}
+DATE_TYPES = {"date"}
+DATETIME_TYPES = {"datetime"}
+
+def require_pyarrow() -> None:
+    if pa is None:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow")
+
+def column_kind(attribute: Optional[Dict[str, Any]]) -> str:
+    """
+    Column type for an entity schema attribute: "number", "boolean",
+    "date", "datetime" or "string".
+
+    Attributes with several values (multiple: true, relations, addresses)
+    are flattened to text by the exporters, so they are strings.
+    """
+    if not attribute or attribute.get("multiple"):
+        return "string"
+    attribute_type = attribute.get("type", "")
+    if attribute_type in NUMBER_TYPES:
+        return "number"
+    if attribute_type in BOOLEAN_TYPES:
+        return "boolean"
+    if attribute_type in DATE_TYPES:
+        return "date"
+    if attribute_type in DATETIME_TYPES:
+        return "datetime"
+    return "string"
+
+def schema_column_kinds(schema: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    """Column kind per attribute name of an entity schema (plus the _created_at/_updated_at timestamps)."""
+    kinds = {"_created_at": "datetime", "_updated_at": "datetime"}
+    for attribute in (schema or {}).get("attributes", []):
+        if attribute.get("name"):
+            kinds[attribute["name"]] = column_kind(attribute)
+    return kinds
+
+def _empty(value: Any) -> bool:
+    return value is None or value == ""
+
+def _to_number(value: Any) -> Optional[float]:
+    if isinstance(value, dict):
+        # Currency attributes may carry {"amount": ..., "currency": ...}
+        value = value.get("amount", value.get("value"))
+    return None if _empty(value) else float(value)
+
+def _to_boolean(value: Any) -> Optional[bool]:
+    if _empty(value):
+        return None
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ("true", "1", "yes", "ja"):
+        return True
+    if text in ("false", "0", "no", "nein"):
+        return False
+    raise ValueError(f"not a boolean: {value!r}")
+
+def _to_date(value: Any) -> Optional[date]:
+    return None if _empty(value) else date.fromisoformat(str(value)[:10])
+
+def _to_datetime(value: Any) -> Optional[datetime]:
+    return None if _empty(value) else datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+
+def _to_string(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+CONVERTERS: Dict[str, Callable[[Any], Any]] = {
+    "number": _to_number,
+    "boolean": _to_boolean,
+    "date": _to_date,
+    "datetime": _to_datetime,
+    "string": _to_string,
+}
+
+def arrow_type(kind: str) -> "pa.DataType":
+    require_pyarrow()
+    return {
+        "number": pa.float64(),
+        "boolean": pa.bool_(),
+        "date": pa.date32(),
+        "datetime": pa.timestamp("ms", tz="UTC"),
+    }.get(kind, pa.string())
+
+class ParquetRowWriter:
+    """
+    Writes rows (dicts) to a Parquet file, one row group per `row_group_size` rows.
+
+    Only the current row group is held in memory. Values that do not fit
+    their column type are written as null and counted in `invalid`.
+
+    Usage:
+        writer = ParquetRowWriter("contacts.parquet", {"id": "string", "created_at": "datetime"})
+        for row in rows:
+            writer(row)
+        writer.close()
+    """
+
+    def __init__(
+        self,
+        output_file: Union[str, Path],
+        columns: Dict[str, str],
+        row_group_size: int = ROW_GROUP_SIZE,
+        compression: Optional[str] = COMPRESSION
+    ):
+        """
+        Args:
+            output_file: Parquet file to write
+            columns: Column name -> kind ("string", "number", "boolean", "date", "datetime"), in order
+            row_group_size: Rows per row group
+            compression: Parquet codec ("zstd", "snappy", ...) or None
+        """
+        require_pyarrow()
+        self.output_file = Path(output_file)
+        self.fieldnames = list(columns)
+        self.kinds = dict(columns)
+        self.schema = pa.schema([(name, arrow_type(kind)) for name, kind in columns.items()])
+        self.row_group_size = max(1, row_group_size)
+        self.compression = compression
+        self.rows = 0
+        self.invalid = 0
+        self._converters = [(name, CONVERTERS.get(kind, _to_string)) for name, kind in columns.items()]
+        self._buffer: Dict[str, List[Any]] = {name: [] for name in self.fieldnames}
+        self._buffered = 0
+        self._writer: Optional["pq.ParquetWriter"] = None
+
+    def __call__(self, row: Dict[str, Any]) -> None:
+        for name, convert in self._converters:
+            try:
+                value = convert(row.get(name))
+            except (TypeError, ValueError):
+                value = None
+                self.invalid += 1
+            self._buffer[name].append(value)
+        self._buffered += 1
+        self.rows += 1
+        if self._buffered >= self.row_group_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the buffered rows as one row group."""
+        if not self._buffered:
+            return
+        if self._writer is None:
+            self.output_file.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = pq.ParquetWriter(self.output_file, self.schema, compression=self.compression)
+        table = pa.Table.from_pydict(self._buffer, schema=self.schema)
+        self._writer.write_table(table, row_group_size=self._buffered)
+        self._buffer = {name: [] for name in self.fieldnames}
+        self._buffered = 0
+
+    def close(self) -> None:
+        """Write the last row group and the file footer."""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
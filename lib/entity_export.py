@@ -0,0 +1,323 @@
+"""
+Streaming entity export pipeline
+
+Shared by scripts/entities/export_entities.py (any schema) and
+scripts/customers/export_contacts_csv.py:
+
+- stream_entities() pages through a search with the right pagination
+  (offset, search_after cursor or parallel time shards) and hands every
+  entity to a sink as it arrives, with a progress line.
+- FlattenPlan is compiled once per entity schema from /v1/entity/schemas
+  and turns entities into flat rows: multi-value email/phone/address
+  attributes are joined, relations become titles or IDs, numbers,
+  booleans and dates keep their type.
+- CsvRowWriter, JsonlRowWriter and columnar.ParquetRowWriter write those
+  rows as they arrive.
+"""
+
+import csv
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import httpx
+
+from . import codec
+from .api_client import EpilotClient, SEARCH_RESULT_WINDOW, range_query
+from .cassette import CassetteMiss
+from .columnar import ROW_GROUP_SIZE, ParquetRowWriter, column_kind
+from .progress import Progress
+
+PAGE_SIZE = 100
+PAGE_CONCURRENCY = 4
+SHARDS = 32
+PAGINATION_MODES = ["auto", "offset", "cursor", "sharded"]
+OUTPUT_FORMATS = ["csv", "jsonl", "parquet"]
+
+# CSV column -> entity attribute
+META_FIELDS = {
+    'id': '_id',
+    'title': '_title',
+    'schema': '_schema',
+    'created_at': '_created_at',
+    'updated_at': '_updated_at',
+}
+META_KINDS = {'created_at': 'datetime', 'updated_at': 'datetime'}
+VALUE_SEPARATOR = '; '
+
+async def stream_entities(
+    client: EpilotClient,
+    q: str,
+    sink: Callable[[Dict[str, Any]], None],
+    fields: Optional[List[str]] = None,
+    hydrate: bool = False,
+    limit: Optional[int] = None,
+    concurrency: int = PAGE_CONCURRENCY,
+    pagination: str = "auto",
+    shards: int = SHARDS,
+    after: Optional[List[str]] = None,
+    label: str = "Entities"
+) -> Tuple[int, bool]:
+    """
+    Fetch every entity matching `q` page by page and pass each one to `sink`.
+
+    Nothing is kept here: memory stays at the few pages in flight however
+    many entities there are.
+
+    Args:
+        client: EpilotClient instance
+        q: Search query, e.g. "_schema:contact"
+        sink: Called with every entity as it arrives
+        fields: Only request these attributes
+        hydrate: Resolve relations in the results
+        limit: Optional limit for total entities to fetch
+        concurrency: Pages (offset) or shards (sharded) fetched in parallel
+        pagination: "offset", "cursor" (one search_after walk), "sharded"
+            (time-range shards in parallel) or "auto" (offset while the
+            export fits into the search result window, sharded beyond)
+        shards: Number of time ranges for sharded pagination
+        after: Watermark cursor; only entities changed after it are
+            fetched, in _updated_at order (overrides pagination)
+        label: Shown in the progress line
+
+    Returns:
+        Number of entities passed to `sink`, and whether the export is complete
+        (False when a request failed for good; exceptions raised by `sink`
+        are not caught)
+    """
+    count = 0
+    meta = {}
+
+    progress = Progress(label=label)
+    complete = False
+    try:
+        if after:
+            progress.total = await client.search_count(range_query(q, "_updated_at", after[0], None))
+            pagination = "incremental"
+            print(f"   Changed since {after[0]}: {progress.total}")
+        elif pagination == "auto":
+            total = await client.search_count(q)
+            wanted = min(total, limit) if limit is not None else total
+            pagination = "offset" if wanted <= SEARCH_RESULT_WINDOW else "sharded"
+            progress.total = wanted
+            print(f"   {total} found, using {pagination} pagination")
+
+        if pagination == "incremental":
+            entities = client.search_after_iter(
+                q, page_size=PAGE_SIZE, fields=fields, hydrate=hydrate,
+                sort_field="_updated_at", limit=limit, after=after
+            )
+        elif pagination == "offset":
+            entities = client.search_iter(
+                q, page_size=PAGE_SIZE, fields=fields, hydrate=hydrate,
+                limit=limit, meta=meta, concurrency=concurrency
+            )
+        elif pagination == "cursor":
+            entities = client.search_after_iter(
+                q, page_size=PAGE_SIZE, fields=fields, hydrate=hydrate, limit=limit
+            )
+        else:
+            entities = client.search_sharded_iter(
+                q, shards=shards, concurrency=concurrency, page_size=PAGE_SIZE,
+                fields=fields, hydrate=hydrate, limit=limit, meta=meta
+            )
+
+        try:
+            async for entity in entities:
+                if progress.total is None and "total" in meta:
+                    progress.total = min(meta["total"], limit) if limit is not None else meta["total"]
+                sink(entity)
+                count += 1
+                progress.advance()
+        finally:
+            # Cancels prefetched pages and shard workers, also when the sink failed
+            await entities.aclose()
+    # Only failed requests make the export incomplete; errors of the sink (writer, flattening) propagate
+    except (httpx.HTTPError, CassetteMiss) as e:
+        progress.write(f"❌ Error fetching {label.lower()}: {e}")
+        progress.write(f"⚠️  Export is incomplete: stopped after {count} {label.lower()}")
+    else:
+        complete = True
+    finally:
+        progress.close()
+
+    return count, complete
+
+def flatten_relation(value: Any) -> str:
+    """
+    Titles of hydrated related entities (or their IDs if not hydrated), "; "-separated.
+    """
+    if isinstance(value, dict) and '$relation' in value:
+        return VALUE_SEPARATOR.join(str(item.get('entity_id', '')) for item in value['$relation'])
+    if isinstance(value, list):
+        return VALUE_SEPARATOR.join(
+            str(item.get('_title') or item.get('_id', '')) if isinstance(item, dict) else str(item)
+            for item in value
+        )
+    return '' if value is None else str(value)
+
+def format_address(address: Dict[str, Any]) -> str:
+    street = ' '.join(str(address[key]) for key in ('street', 'street_number') if address.get(key))
+    city = ' '.join(str(address[key]) for key in ('postal_code', 'city') if address.get(key))
+    return ', '.join(part for part in (street, city, address.get('country')) if part)
+
+def _list_of(value: Any) -> List[Any]:
+    if value is None or value == '':
+        return []
+    return value if isinstance(value, list) else [value]
+
+def _join(items: Sequence[Any], format_item: Callable[[Any], Any]) -> str:
+    return VALUE_SEPARATOR.join(str(text) for text in map(format_item, items) if text not in (None, ''))
+
+def _item_text(item: Any) -> Any:
+    if isinstance(item, dict):
+        for key in ('value', 'title', '_title', 'name', 'label'):
+            if item.get(key) not in (None, ''):
+                return item[key]
+        return codec.dumps(item, compact=True).decode()
+    return item
+
+def attribute_extractor(attribute: Dict[str, Any]) -> Callable[[Any], Any]:
+    """Function turning an attribute value into one cell, by attribute type."""
+    attribute_type = attribute.get('type', '')
+    if attribute_type == 'relation':
+        return flatten_relation
+    if attribute_type in ('email', 'phone'):
+        return lambda value: _join(_list_of(value), lambda item: item.get(attribute_type) if isinstance(item, dict) else item)
+    if attribute_type == 'address':
+        return lambda value: _join(_list_of(value), lambda item: format_address(item) if isinstance(item, dict) else item)
+    if attribute_type == 'currency':
+        return lambda value: value.get('amount', value.get('value')) if isinstance(value, dict) else value
+
+    def scalar(value: Any) -> Any:
+        if isinstance(value, list):
+            return _join(value, _item_text)
+        if isinstance(value, dict):
+            return _item_text(value)
+        return value
+    return scalar
+
+class FlattenPlan:
+    """
+    Column layout and per-attribute extractors for one entity schema.
+
+    Compiled once from the schema definition, then applied to every
+    entity; CSV, JSONL and Parquet writers all consume its rows.
+
+    Usage:
+        plan = FlattenPlan(await client.get_entity_schema("opportunity"))
+        for entity in entities:
+            row = plan.flatten(entity)
+    """
+
+    def __init__(
+        self,
+        schema: Dict[str, Any],
+        attributes: Optional[Sequence[str]] = None,
+        hydrate: Sequence[str] = ()
+    ):
+        """
+        Args:
+            schema: Entity schema from /v1/entity/schemas
+            attributes: Only export these attributes (default: all of the schema)
+            hydrate: Relation attributes to hydrate (titles instead of IDs)
+        """
+        self.slug = schema.get('slug', '')
+        definitions = [a for a in schema.get('attributes', []) if a.get('name') and not a['name'].startswith('_')]
+        if attributes:
+            by_name = {a['name']: a for a in definitions}
+            missing = [name for name in attributes if name not in by_name]
+            if missing:
+                raise ValueError(f"Unknown attributes for schema '{self.slug}': {', '.join(missing)}")
+            definitions = [by_name[name] for name in attributes]
+
+        relations = {a['name'] for a in definitions if a.get('type') == 'relation'}
+        unknown = [name for name in hydrate if name not in relations]
+        if unknown:
+            raise ValueError(f"Not a relation of schema '{self.slug}': {', '.join(unknown)}")
+        self.hydrate = list(hydrate)
+
+        self.kinds: Dict[str, str] = {column: META_KINDS.get(column, 'string') for column in META_FIELDS}
+        self._extractors: List[Tuple[str, str, Callable[[Any], Any]]] = []
+        for attribute in definitions:
+            name = attribute['name']
+            column = name if name not in META_FIELDS else f"attribute_{name}"
+            text_only = attribute.get('type') in ('relation', 'email', 'phone', 'address')
+            self.kinds[column] = 'string' if text_only else column_kind(attribute)
+            self._extractors.append((column, name, attribute_extractor(attribute)))
+
+        self.columns = list(self.kinds)
+        # Projection: the attributes the columns are built from
+        self.fields = [*META_FIELDS.values(), *(name for _, name, _ in self._extractors)]
+
+    def flatten(self, entity: Dict[str, Any]) -> Dict[str, Any]:
+        """One row; missing values are None (empty in CSV, null in JSONL and Parquet)."""
+        row = {column: entity.get(attribute) for column, attribute in META_FIELDS.items()}
+        for column, name, extract in self._extractors:
+            value = entity.get(name)
+            row[column] = None if value is None else extract(value)
+        return row
+
+class CsvRowWriter:
+    """
+    Writes rows to a CSV file as they arrive.
+
+    The file is created with the first row, so an export that finds
+    nothing leaves no empty file behind.
+    """
+
+    def __init__(self, output_file: Union[str, Path], fieldnames: List[str]):
+        self.output_file = Path(output_file)
+        self.fieldnames = fieldnames
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def __call__(self, row: Dict[str, Any]) -> None:
+        if self._writer is None:
+            self.output_file.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.output_file, 'w', newline='', encoding='utf-8')
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+            self._writer.writeheader()
+        self._writer.writerow(row)
+        self.rows += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+class JsonlRowWriter:
+    """Writes rows as JSON lines (types kept, one object per line) as they arrive."""
+
+    def __init__(self, output_file: Union[str, Path], fieldnames: List[str]):
+        self.output_file = Path(output_file)
+        self.fieldnames = fieldnames
+        self.rows = 0
+        self._file = None
+
+    def __call__(self, row: Dict[str, Any]) -> None:
+        if self._file is None:
+            self.output_file.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.output_file, 'wb')
+        self._file.write(codec.dumps({name: row.get(name) for name in self.fieldnames}, compact=True) + b"\n")
+        self.rows += 1
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+def open_row_writer(
+    output_file: Union[str, Path],
+    output_format: str,
+    columns: Dict[str, str],
+    row_group_size: int = ROW_GROUP_SIZE
+):
+    """
+    Row writer for a format; `columns` maps column name -> kind (used by Parquet).
+    """
+    if output_format == "parquet":
+        return ParquetRowWriter(output_file, columns, row_group_size)
+    if output_format == "jsonl":
+        return JsonlRowWriter(output_file, list(columns))
+    return CsvRowWriter(output_file, list(columns))
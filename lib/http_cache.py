@@ -0,0 +1,78 @@
+"""
+Conditional-GET cache for Epilot API responses
+
+Stores response bodies together with their ETag / Last-Modified validators
+on disk. EpilotClient sends them back as If-None-Match / If-Modified-Since
+and serves 304 Not Modified answers from the local copy.
+"""
+
+import json
+import hashlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+from . import codec
+
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent / "data" / "cache" / "http"
+
+class ValidatorCache:
+    """
+    Persistent validator cache, one JSON file per URL.
+
+    Entries are keyed by URL, query parameters and a hash of the
+    Authorization header, so different tokens never share entries.
+
+    Usage:
+        client = EpilotClient(cache=True)                      # default location
+        client = EpilotClient(cache=ValidatorCache("/tmp/c"))  # custom location
+    """
+
+    def __init__(self, directory: Optional[Path] = None):
+        self.directory = Path(directory) if directory else DEFAULT_CACHE_DIR
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, url: str, params: Optional[Dict[str, Any]], authorization: str = "") -> str:
+        raw = json.dumps([url, sorted((params or {}).items()), authorization], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a key, if any."""
+        path = self._path(key)
+        if not path.exists():
+            return None
+        try:
+            return codec.read_json(path)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Request headers that revalidate a cached entry."""
+        if not entry:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, key: str, url: str, response: httpx.Response, body: Any) -> None:
+        """Cache a response body if the server sent validators for it."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_suffix(".tmp")
+        entry = {"url": url, "etag": etag, "last_modified": last_modified, "body": body}
+        codec.write_json(tmp_path, entry, compact=True)
+        tmp_path.replace(path)
@@ -0,0 +1,130 @@
+"""
+Incremental JSON array decoding
+
+Yields the elements of one array inside a JSON document (e.g. `results`,
+`steps`, `resources`) while the bytes are still arriving, so only the
+element being decoded has to fit in memory, not the whole payload.
+"""
+
+import codecs
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+
+WHITESPACE = " \t\n\r"
+# Characters that may follow a complete value; anything else (e.g. the "5" of a
+# number "1." + "5" split across chunks) means the value may continue
+VALUE_END = WHITESPACE + ",]}:"
+READ_AHEAD = 64 * 1024
+
+class _Buffer:
+    """Text buffer over an async byte stream with amortized refills."""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    async def fill(self, min_size: int = 1) -> bool:
+        """Read until at least `min_size` characters are available after pos."""
+        if self.pos > READ_AHEAD:
+            self.text = self.text[self.pos:]
+            self.pos = 0
+        while not self.eof and len(self.text) - self.pos < min_size:
+            try:
+                chunk = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                self.text += self._decoder.decode(b"", final=True)
+                self.eof = True
+                break
+            self.text += self._decoder.decode(chunk)
+        return len(self.text) - self.pos >= min_size
+
+    async def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not await self.fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    async def expect(self, char: str) -> None:
+        found = await self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' at stream offset {self.pos}, found '{found}'")
+        self.pos += 1
+
+    async def value(self, decoder: json.JSONDecoder) -> Any:
+        """Decode one complete JSON value starting at the next token."""
+        await self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # raw_decode accepts a prefix of a number ("1." -> 1), so only a
+                # delimiter after it (or the end of the stream) proves it complete
+                if self.eof or (end < len(self.text) and self.text[end] in VALUE_END):
+                    self.pos = end
+                    return value
+            # Grow geometrically so large values are not re-parsed too often
+            await self.fill(2 * (len(self.text) - self.pos) + 1)
+
+async def iter_json_array(
+    chunks: AsyncIterator[bytes],
+    path: Union[str, List[str], None] = "results",
+    meta: Optional[Dict[str, Any]] = None
+) -> AsyncIterator[Any]:
+    """
+    Yield the elements of the array at `path` from a streamed JSON document.
+
+    Args:
+        chunks: Async iterator of raw response bytes
+        path: Dotted key path to the array ("results", "manifest.resources"),
+            or None when the document itself is an array
+        meta: Optional dict that receives the other members seen on the way
+            to the array (e.g. `total` when it precedes `results`)
+
+    Usage:
+        async for item in iter_json_array(response.aiter_bytes(), "results"):
+            ...
+    """
+    if isinstance(path, str):
+        path = path.split(".") if path else []
+    path = list(path or [])
+
+    buffer = _Buffer(chunks)
+    decoder = json.JSONDecoder()
+
+    # Walk down the object members until the target array starts
+    for depth, key in enumerate(path):
+        await buffer.expect("{")
+        while True:
+            if await buffer.peek() == "}":
+                return
+            name = await buffer.value(decoder)
+            await buffer.expect(":")
+            if name == key:
+                break
+            member = await buffer.value(decoder)
+            if meta is not None and depth == 0:
+                meta[name] = member
+            if await buffer.peek() == ",":
+                buffer.pos += 1
+
+    await buffer.expect("[")
+    if await buffer.peek() == "]":
+        return
+    while True:
+        yield await buffer.value(decoder)
+        separator = await buffer.peek()
+        buffer.pos += 1
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' in JSON array, found '{separator}'")
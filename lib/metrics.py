@@ -0,0 +1,307 @@
+"""
+Request metrics for EpilotClient
+
+Records per host and path template: request counts, status codes, latency
+percentiles, bytes sent/received and retry/throttle counts.
+
+Set EPILOT_METRICS_REPORT=<file> to have every script write a JSON report
+when it exits ("{pid}" in the name is replaced by the process id, for
+scripts that start other scripts), and EPILOT_METRICS_LIVE=<seconds> for a
+periodic one-line summary on stderr. All clients of a process that report
+to the same file are merged into one report, written once at exit.
+"""
+
+import os
+import re
+import sys
+import math
+import time
+import atexit
+import weakref
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+from . import codec
+
+# Log-scale latency buckets, ~5% wide: bounded memory for any number of requests
+BUCKET_GROWTH = 1.05
+ID_SEGMENT = re.compile(r"^(?:[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}|[0-9a-fA-F]{16,}|\d+)$")
+
+def path_template(url: str) -> str:
+    """Collapse IDs in a URL path so e.g. /v1/entity/contact/<uuid> becomes /v1/entity/contact/{id}."""
+    path = urlsplit(url).path or "/"
+    return "/".join("{id}" if ID_SEGMENT.match(segment) else segment for segment in path.split("/"))
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with approximate percentiles."""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        ms = max(seconds * 1000, 0.001)
+        index = math.floor(math.log(ms, BUCKET_GROWTH))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += ms
+        self.max = max(self.max, ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound in ms of the bucket holding the given fraction of samples."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(BUCKET_GROWTH ** (index + 1), self.max)
+        return self.max
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "p50": round(self.percentile(0.50), 2),
+            "p95": round(self.percentile(0.95), 2),
+            "p99": round(self.percentile(0.99), 2),
+            "mean": round(self.total / self.count, 2) if self.count else 0.0,
+            "max": round(self.max, 2),
+        }
+
+class EndpointStats:
+    """Counters for one (method, host, path template)."""
+
+    def __init__(self):
+        self.requests = 0
+        self.status: Dict[str, int] = {}
+        self.latency = LatencyHistogram()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.retries = 0
+        self.throttled = 0
+
+    def merge(self, other: "EndpointStats") -> None:
+        self.requests += other.requests
+        for code, count in other.status.items():
+            self.status[code] = self.status.get(code, 0) + count
+        self.latency.merge(other.latency)
+        self.bytes_sent += other.bytes_sent
+        self.bytes_received += other.bytes_received
+        self.retries += other.retries
+        self.throttled += other.throttled
+
+# Collectors per report file; a single atexit hook writes each file once
+_reports: Dict[Path, List["ClientMetrics"]] = {}
+_reports_lock = threading.Lock()
+
+def _register_report(path: Union[str, Path], metrics: "ClientMetrics") -> None:
+    with _reports_lock:
+        if not _reports:
+            atexit.register(_write_reports)
+        _reports.setdefault(Path(path), []).append(metrics)
+
+def _write_reports() -> None:
+    with _reports_lock:
+        reports = list(_reports.items())
+    for path, collectors in reports:
+        ClientMetrics.merged(collectors).write_report(path)
+
+class ClientMetrics:
+    """
+    Metrics collector attached to an EpilotClient.
+
+    Usage:
+        client = EpilotClient()
+        ...
+        client.metrics.write_report("data/output/metrics.json")
+    """
+
+    def __init__(
+        self,
+        report_path: Optional[Union[str, Path]] = None,
+        live_interval: Optional[float] = None
+    ):
+        """
+        Args:
+            report_path: Write a JSON report to this file when the process exits
+            live_interval: Print a one-line summary to stderr at most this often (seconds)
+        """
+        self.endpoints: Dict[Tuple[str, str, str], EndpointStats] = {}
+        self.started = time.monotonic()
+        self.live_interval = live_interval
+        self._last_live = self.started
+        # Bound methods are held weakly, so the collector does not keep its client alive
+        self.sources: Dict[str, Callable[[], Optional[Callable[[], Dict[str, Any]]]]] = {}
+        # Last values sampled from the sources, reported once their object is gone
+        self.sampled: Dict[str, Any] = {}
+        self._merged_from: Optional[List["ClientMetrics"]] = None
+        if report_path:
+            _register_report(report_path, self)
+
+    @classmethod
+    def merged(cls, collectors: List["ClientMetrics"]) -> "ClientMetrics":
+        """
+        One collector with the endpoints of all `collectors`.
+
+        Sources are reported under their name, as a list when several
+        collectors provide the same one.
+        """
+        merged = cls()
+        merged.started = min((c.started for c in collectors), default=merged.started)
+        for collector in collectors:
+            for key, stats in collector.endpoints.items():
+                merged.endpoints.setdefault(key, EndpointStats()).merge(stats)
+        merged._merged_from = list(collectors)
+        return merged
+
+    @classmethod
+    def from_env(cls) -> "ClientMetrics":
+        """Build a collector configured by EPILOT_METRICS_REPORT / EPILOT_METRICS_LIVE."""
+        live = os.getenv("EPILOT_METRICS_LIVE")
+        report_path = os.getenv("EPILOT_METRICS_REPORT", "").replace("{pid}", str(os.getpid()))
+        return cls(
+            report_path=report_path or None,
+            live_interval=float(live) if live else None
+        )
+
+    def _stats(self, method: str, url: str) -> EndpointStats:
+        key = (method.upper(), urlsplit(url).netloc, path_template(url))
+        if key not in self.endpoints:
+            self.endpoints[key] = EndpointStats()
+        return self.endpoints[key]
+
+    def record(
+        self,
+        method: str,
+        url: str,
+        status: Union[int, str],
+        seconds: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0
+    ) -> None:
+        """Record one completed attempt (status may be an error name)."""
+        stats = self._stats(method, url)
+        stats.requests += 1
+        stats.status[str(status)] = stats.status.get(str(status), 0) + 1
+        stats.latency.add(seconds)
+        stats.bytes_sent += bytes_sent
+        stats.bytes_received += bytes_received
+        if self.live_interval:
+            self._maybe_print_live()
+
+    def add_received(self, method: str, url: str, nbytes: int) -> None:
+        """Add body bytes read after the attempt was recorded (streamed responses)."""
+        self._stats(method, url).bytes_received += nbytes
+
+    def add_source(self, name: str, source: Callable[[], Dict[str, Any]]) -> None:
+        """
+        Include `source()` under `name` in every report.
+
+        Once its object is gone, the values last taken by sample_sources()
+        are reported instead.
+        """
+        if hasattr(source, "__self__") and hasattr(source, "__func__"):
+            self.sources[name] = weakref.WeakMethod(source)
+        else:
+            self.sources[name] = lambda: source
+
+    def sample_sources(self) -> None:
+        """Keep the current source values (EpilotClient calls this when it is closed)."""
+        for name, ref in self.sources.items():
+            source = ref()
+            if source is not None:
+                self.sampled[name] = source()
+
+    def _source_values(self) -> Dict[str, Any]:
+        values: Dict[str, List[Any]] = {}
+        for collector in self._merged_from or [self]:
+            for name, ref in collector.sources.items():
+                source = ref()
+                if source is not None:
+                    values.setdefault(name, []).append(source())
+                elif name in collector.sampled:
+                    values.setdefault(name, []).append(collector.sampled[name])
+        return {name: found[0] if len(found) == 1 else found for name, found in values.items()}
+
+    def record_retry(self, method: str, url: str) -> None:
+        self._stats(method, url).retries += 1
+
+    def record_throttle(self, method: str, url: str) -> None:
+        self._stats(method, url).throttled += 1
+
+    def totals(self) -> Dict[str, Any]:
+        overall = LatencyHistogram()
+        totals = {"requests": 0, "errors": 0, "bytes_sent": 0, "bytes_received": 0, "retries": 0, "throttled": 0}
+        for stats in self.endpoints.values():
+            totals["requests"] += stats.requests
+            totals["errors"] += sum(n for code, n in stats.status.items() if not code.isdigit() or int(code) >= 400)
+            totals["bytes_sent"] += stats.bytes_sent
+            totals["bytes_received"] += stats.bytes_received
+            totals["retries"] += stats.retries
+            totals["throttled"] += stats.throttled
+            overall.merge(stats.latency)
+        elapsed = time.monotonic() - self.started
+        totals["elapsed_seconds"] = round(elapsed, 3)
+        totals["requests_per_second"] = round(totals["requests"] / elapsed, 2) if elapsed else 0.0
+        totals["latency_ms"] = overall.summary()
+        return totals
+
+    def report(self) -> Dict[str, Any]:
+        """Full report as a JSON-serializable dict."""
+        endpoints = []
+        for (method, host, path), stats in sorted(self.endpoints.items(), key=lambda item: -item[1].latency.total):
+            endpoints.append({
+                "method": method,
+                "host": host,
+                "path": path,
+                "requests": stats.requests,
+                "status": stats.status,
+                "latency_ms": stats.latency.summary(),
+                "total_time_ms": round(stats.latency.total, 1),
+                "bytes_sent": stats.bytes_sent,
+                "bytes_received": stats.bytes_received,
+                "retries": stats.retries,
+                "throttled": stats.throttled,
+            })
+        return {
+            "generated_at": datetime.now().isoformat(),
+            "script": Path(sys.argv[0]).name if sys.argv and sys.argv[0] else None,
+            "totals": self.totals(),
+            **self._source_values(),
+            "endpoints": endpoints,
+        }
+
+    def write_report(self, path: Union[str, Path]) -> None:
+        """Write the report as JSON (skipped if no request was made)."""
+        if not self.endpoints:
+            return
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        codec.write_json(path, self.report())
+
+    def summary_line(self) -> str:
+        totals = self.totals()
+        return (
+            f"📈 {totals['requests']} req | {totals['requests_per_second']} req/s | "
+            f"p95 {totals['latency_ms']['p95']} ms | errors {totals['errors']} | "
+            f"retries {totals['retries']} | throttled {totals['throttled']} | "
+            f"{totals['bytes_received'] / 1e6:.1f} MB in"
+        )
+
+    def _maybe_print_live(self) -> None:
+        now = time.monotonic()
+        if now - self._last_live >= self.live_interval:
+            self._last_live = now
+            print(self.summary_line(), file=sys.stderr, flush=True)
@@ -0,0 +1,303 @@
+"""
+Profiling harness for the scripts
+
+Scripts opt in with two lines:
+
+    add_profile_arguments(parser)
+    ...
+    run_profiled(args, lambda: asyncio.run(main(...)), output=args.output)
+
+and then accept:
+
+    --profile             cProfile; writes <output>.prof (pstats, for
+                          snakeviz / flameprof / gprof2dot) and prints the top functions
+    --profile sample      Async-aware stack sampler; writes <output>.collapsed
+                          (folded stacks for flamegraph.pl / speedscope / inferno)
+    --trace-malloc        tracemalloc; writes <output>.alloc.txt with the top allocations
+
+Reports are written next to the script's output (data/output/profiles when
+it has none). Any script can also be run under the harness unchanged:
+
+    python -m lib.profiling --profile sample scripts/customers/import_customers_csv.py data/input/customers.csv
+"""
+
+import os
+import sys
+import time
+import runpy
+import asyncio
+import cProfile
+import pstats
+import argparse
+import threading
+import tracemalloc
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Union
+
+REPO_ROOT = Path(__file__).parent.parent
+DEFAULT_PROFILE_DIR = REPO_ROOT / "data" / "output" / "profiles"
+SAMPLE_INTERVAL = 0.005
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 25
+TRACEMALLOC_FRAMES = 8  # deeper stacks make tracemalloc several times slower
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add --profile / --trace-malloc / --profile-interval to a script's parser."""
+    group = parser.add_argument_group("profiling")
+    group.add_argument(
+        "--profile",
+        nargs="?",
+        const="cprofile",
+        choices=["cprofile", "sample"],
+        help="Profile the run with cProfile (default) or the async-aware sampler "
+             "(write --profile=cprofile when a positional argument follows)"
+    )
+    group.add_argument(
+        "--trace-malloc",
+        action="store_true",
+        help="Record allocations with tracemalloc and write a top-N report"
+    )
+    group.add_argument(
+        "--profile-interval",
+        type=float,
+        default=SAMPLE_INTERVAL,
+        help=f"Seconds between samples for --profile sample (default: {SAMPLE_INTERVAL})"
+    )
+
+def report_base(output: Optional[Union[str, Path]]) -> Path:
+    """
+    Path prefix for the reports: data/output/contacts.csv -> data/output/contacts,
+    data/output/workflows_<ts>/ -> data/output/workflows_<ts>.
+    """
+    if output:
+        path = Path(output)
+        return path.with_suffix("") if path.suffix else path
+    script = Path(sys.argv[0]).stem if sys.argv and sys.argv[0] else "script"
+    return DEFAULT_PROFILE_DIR / f"{script}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+def frame_label(code) -> str:
+    filename = Path(code.co_filename)
+    try:
+        filename = filename.relative_to(REPO_ROOT)
+    except ValueError:
+        filename = Path(filename.name)
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+class StackSampler:
+    """
+    Samples the main thread's stack from a background thread.
+
+    While the event loop is waiting for I/O the sample instead records the
+    await chain of every pending task under a "[await]" root, so time spent
+    waiting on the API shows up under the coroutine that awaits it.
+    Everything else is recorded under "[cpu]".
+    """
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts: Dict[str, int] = {}
+        self.samples = 0
+        self._thread_id = threading.main_thread().ident
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="StackSampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _add(self, stack: List[str]) -> None:
+        key = ";".join(stack)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            self.samples += 1
+            stack = []
+            loop = None
+            waiting = False
+            while frame is not None:
+                code = frame.f_code
+                if code.co_name == "select" and code.co_filename.endswith("selectors.py"):
+                    waiting = True
+                elif code.co_name == "_run_once" and loop is None:
+                    loop = frame.f_locals.get("self")
+                stack.append(frame_label(code))
+                frame = frame.f_back
+            stack.reverse()
+
+            if waiting and loop is not None and self._add_awaiting(loop):
+                continue
+            self._add(["[cpu]"] + stack)
+
+    def _add_awaiting(self, loop) -> bool:
+        """Record the await chain of each pending task; False if none could be read."""
+        try:
+            tasks = list(asyncio.all_tasks(loop))
+        except RuntimeError:
+            # The task set changed while we iterated it
+            return False
+        added = False
+        for task in tasks:
+            chain = [f"task {task.get_name()}"]
+            awaitable = task.get_coro()
+            while awaitable is not None:
+                frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "ag_frame", None) or getattr(awaitable, "gi_frame", None)
+                if frame is None:
+                    break
+                chain.append(f"{frame_label(frame.f_code)}:{frame.f_lineno}")
+                awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "ag_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+            self._add(["[await]"] + chain)
+            added = True
+        return added
+
+    def write_collapsed(self, path: Path) -> None:
+        """Folded stacks, one "frame;frame;frame count" line per distinct stack."""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+class PeakSnapshotter:
+    """
+    Keeps a tracemalloc snapshot taken close to the peak of traced memory.
+
+    A snapshot at exit only shows what is still alive; the one worth reading
+    is the one taken while the export held the most memory. A new snapshot
+    is taken whenever traced memory grows 25% beyond the last one.
+    """
+
+    def __init__(self, interval: float = 0.1, growth: float = 1.25):
+        self.interval = interval
+        self.growth = growth
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.snapshot_size = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="PeakSnapshotter", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self._check()
+
+    def _check(self) -> None:
+        current, _ = tracemalloc.get_traced_memory()
+        if current > self.snapshot_size * self.growth:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_size = current
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._check()
+
+def write_allocation_report(path: Path, snapshot: tracemalloc.Snapshot, peak: int, top: int = TOP_ALLOCATIONS) -> None:
+    """Top allocation sites by line and by call stack, at the time of `snapshot`."""
+    snapshot = snapshot.filter_traces([
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ])
+    by_line = snapshot.statistics("lineno")
+    lines = [
+        f"Peak traced memory: {peak / 1024 / 1024:.1f} MB",
+        f"Allocated when the snapshot was taken: {sum(stat.size for stat in by_line) / 1024 / 1024:.1f} MB",
+        "",
+        f"Top {top} allocation sites (by line):",
+    ]
+    for index, stat in enumerate(by_line[:top], 1):
+        frame = stat.traceback[0]
+        lines.append(f"{index:>3}. {stat.size / 1024:>10.1f} KiB {stat.count:>9} blocks  {frame.filename}:{frame.lineno}")
+
+    lines += ["", f"Top {min(top, 10)} allocation stacks:"]
+    for index, stat in enumerate(snapshot.statistics("traceback")[:min(top, 10)], 1):
+        lines.append(f"\n{index:>3}. {stat.size / 1024:.1f} KiB in {stat.count} blocks")
+        lines.extend(f"       {line}" for line in stat.traceback.format(most_recent_first=True))
+
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+def run_profiled(args: argparse.Namespace, target: Callable[[], Any], output: Optional[Union[str, Path]] = None) -> Any:
+    """
+    Run `target()` under the profilers selected on the command line.
+
+    Reports are written even if the script exits via sys.exit() or an exception.
+    """
+    mode = getattr(args, "profile", None)
+    trace_malloc = getattr(args, "trace_malloc", False)
+    if not mode and not trace_malloc:
+        return target()
+
+    base = report_base(output)
+    profiler: Optional[cProfile.Profile] = None
+    sampler: Optional[StackSampler] = None
+    snapshotter: Optional[PeakSnapshotter] = None
+    if trace_malloc:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        snapshotter = PeakSnapshotter()
+        snapshotter.start()
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif mode == "sample":
+        sampler = StackSampler(getattr(args, "profile_interval", SAMPLE_INTERVAL))
+        sampler.start()
+
+    started = time.perf_counter()
+    try:
+        return target()
+    finally:
+        elapsed = time.perf_counter() - started
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None:
+            sampler.stop()
+        if snapshotter is not None:
+            snapshotter.stop()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        base.parent.mkdir(parents=True, exist_ok=True)
+        print(f"\n🔬 Profiled run: {elapsed:.2f}s")
+        if profiler is not None:
+            prof_path = Path(f"{base}.prof")
+            profiler.dump_stats(prof_path)
+            stats = pstats.Stats(profiler, stream=sys.stdout)
+            stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+            print(f"   cProfile stats: {prof_path}")
+        if sampler is not None:
+            collapsed_path = Path(f"{base}.collapsed")
+            sampler.write_collapsed(collapsed_path)
+            print(f"   {sampler.samples} samples (flame graph input): {collapsed_path}")
+        if snapshotter is not None:
+            alloc_path = Path(f"{base}.alloc.txt")
+            write_allocation_report(alloc_path, snapshotter.snapshot, peak)
+            print(f"   Peak traced memory {peak / 1024 / 1024:.1f} MB, allocation report: {alloc_path}")
+
+def main():
+    """Run any script under the harness: python -m lib.profiling [options] script.py [script args]"""
+    parser = argparse.ArgumentParser(description="Run a script under cProfile, the stack sampler and/or tracemalloc")
+    add_profile_arguments(parser)
+    parser.add_argument(
+        "--profile-output",
+        help="Path prefix for the reports (default: data/output/profiles/<script>_<time>)"
+    )
+    parser.add_argument("script", help="Script to run")
+    parser.add_argument("script_args", nargs=argparse.REMAINDER, help="Arguments for the script")
+    args = parser.parse_args()
+
+    script = os.path.abspath(args.script)
+    sys.argv = [script, *args.script_args]
+    sys.path.insert(0, os.path.dirname(script))
+    run_profiled(args, lambda: runpy.run_path(script, run_name="__main__"), args.profile_output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Progress reporting for bulk loops
+
+One status line with count, rate, ETA and error count, redrawn at a fixed
+interval instead of printing per item. When stdout is not a terminal
+(CI, `> log.txt`) it prints a key=value log line every few seconds instead.
+"""
+
+import sys
+import time
+from typing import Optional, TextIO
+
+MAX_MESSAGES = 20  # per kind; later errors/skips are only counted
+
+def format_duration(seconds: float) -> str:
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+class Progress:
+    """
+    Progress reporter for a loop over `total` items.
+
+    `advance()` only increments a counter and compares a timestamp, so it
+    is cheap enough to call for every item of a 1M-entity export.
+
+    Usage:
+        with Progress(len(workflows), "Workflows") as progress:
+            for workflow in workflows:
+                ...
+                progress.advance()
+
+        progress.error(f"Fehler bei {name}: {e}")   # counted, first few printed
+    """
+
+    def __init__(
+        self,
+        total: Optional[int] = None,
+        label: str = "",
+        interval: float = 0.2,
+        log_interval: float = 10.0,
+        stream: Optional[TextIO] = None
+    ):
+        """
+        Args:
+            total: Number of items, if known (enables percentage and ETA)
+            label: Shown in front of the counts
+            interval: Seconds between redraws on a terminal
+            log_interval: Seconds between log lines when not on a terminal
+            stream: Output stream (default: sys.stdout)
+        """
+        self.total = total
+        self.label = label
+        self.stream = stream or sys.stdout
+        self.tty = self.stream.isatty()
+        self.interval = interval if self.tty else log_interval
+        self.done = 0
+        self.errors = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+        self._next_refresh = self.started + self.interval
+        self._line_width = 0
+        self._closed = False
+
+    def __enter__(self) -> "Progress":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def advance(self, n: int = 1) -> None:
+        """Count `n` processed items."""
+        self.done += n
+        if time.monotonic() >= self._next_refresh:
+            self.refresh()
+
+    def error(self, message: Optional[str] = None) -> None:
+        """Count a failed item (also advances) and print the first few messages."""
+        self.errors += 1
+        if message and self.errors <= MAX_MESSAGES:
+            self.write(f"   ❌ {message}")
+        elif message and self.errors == MAX_MESSAGES + 1:
+            self.write("   ❌ ... further errors are only counted")
+        self.advance()
+
+    def skip(self, message: Optional[str] = None) -> None:
+        """Count a skipped item (also advances) and print the first few messages."""
+        self.skipped += 1
+        if message and self.skipped <= MAX_MESSAGES:
+            self.write(f"   ⚠️  {message}")
+        elif message and self.skipped == MAX_MESSAGES + 1:
+            self.write("   ⚠️  ... further skips are only counted")
+        self.advance()
+
+    def write(self, message: str) -> None:
+        """Print a message without garbling the status line."""
+        if self.tty and self._line_width:
+            self.stream.write("\r" + " " * self._line_width + "\r")
+            self._line_width = 0
+        self.stream.write(message + "\n")
+        self.stream.flush()
+
+    def rate(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def eta(self) -> Optional[float]:
+        rate = self.rate()
+        if not self.total or not rate:
+            return None
+        return max(0, self.total - self.done) / rate
+
+    def status_line(self) -> str:
+        parts = [f"{self.label} {self.done:,}" + (f"/{self.total:,}" if self.total else "")]
+        if self.total:
+            parts[0] += f" ({self.done * 100 // self.total}%)"
+        parts.append(f"{self.rate():.1f}/s")
+        eta = self.eta()
+        if eta is not None and self.done < self.total:
+            parts.append(f"ETA {format_duration(eta)}")
+        if self.errors:
+            parts.append(f"❌ {self.errors:,}")
+        if self.skipped:
+            parts.append(f"⚠️  {self.skipped:,}")
+        return "   " + " | ".join(parts)
+
+    def log_line(self) -> str:
+        eta = self.eta()
+        fields = {
+            "label": self.label.replace(" ", "_") or None,
+            "done": self.done,
+            "total": self.total,
+            "rate": f"{self.rate():.1f}",
+            "eta_s": f"{eta:.0f}" if eta is not None else None,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "elapsed_s": f"{time.monotonic() - self.started:.1f}",
+        }
+        return "progress " + " ".join(f"{key}={value}" for key, value in fields.items() if value is not None)
+
+    def refresh(self) -> None:
+        """Redraw the status line (terminal) or print a log line."""
+        self._next_refresh = time.monotonic() + self.interval
+        if self.tty:
+            line = self.status_line()
+            padding = max(0, self._line_width - len(line))
+            self.stream.write("\r" + line + " " * padding)
+            self._line_width = len(line)
+        else:
+            self.stream.write(self.log_line() + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Print the final state and end the status line."""
+        if self._closed:
+            return
+        self._closed = True
+        self.refresh()
+        if self.tty:
+            self.stream.write("\n")
+            self.stream.flush()
+            self._line_width = 0
@@ -0,0 +1,222 @@
+"""
+Adaptive rate limiting for Epilot API requests
+
+A token bucket per host. Requests are not paced until the API answers 429
+Too Many Requests: the bucket then engages below the rate that was just
+observed, backs off on further 429s (honoring Retry-After) and speeds up
+again while requests succeed.
+
+Set EPILOT_RATE_LIMIT=<req/s> to pace every host from the first request
+instead, EPILOT_RATE_LIMIT_MAX=<req/s> to cap the rate it ramps up to, or
+EPILOT_RATE_LIMIT=off to disable the limiter (e.g. for benchmarks).
+"""
+
+import os
+import time
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+RATE_LIMIT_OFF = {"off", "0", "false", "no"}
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header into seconds.
+
+    Accepts both the delta-seconds and the HTTP-date form.
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class TokenBucket:
+    """
+    Token bucket for a single host.
+
+    With `rate=None` the bucket lets every request through and only counts
+    what was sent in the last second. The first 429 engages it at
+    `backoff_factor` times that observed rate. From then on the rate grows
+    additively (about +1 req/s per second of successful traffic), up to
+    `max_rate` if one is set, and is multiplied by `backoff_factor` on each
+    burst of 429s. A Retry-After pauses the bucket until the given time.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float],
+        burst: int,
+        min_rate: float,
+        max_rate: Optional[float] = None,
+        backoff_factor: float = 0.5
+    ):
+        self.rate = rate
+        self.capacity = float(burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.backoff_factor = backoff_factor
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.last_backoff = float("-inf")
+        # Send times within the last second, kept only while unpaced
+        self._recent: Deque[float] = deque()
+
+    def observed_rate(self) -> float:
+        """Requests sent in the last second."""
+        cutoff = time.monotonic() - 1.0
+        while self._recent and self._recent[0] < cutoff:
+            self._recent.popleft()
+        return float(len(self._recent))
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller has to wait for it."""
+        now = time.monotonic()
+        if self.rate is None:
+            self._recent.append(now)
+            self.observed_rate()
+            return max(0.0, self.blocked_until - now)
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+        self.tokens -= 1
+        ready_at = self.updated + max(0.0, -self.tokens / self.rate)
+        return max(0.0, ready_at - now)
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        delay = self.reserve()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            # A 429 may have paused the bucket while we were sleeping
+            delay = self.blocked_until - time.monotonic()
+
+    def on_success(self) -> None:
+        if self.rate is None:
+            return
+        rate = self.rate + 1.0 / self.rate
+        self.rate = rate if self.max_rate is None else min(self.max_rate, rate)
+
+    def on_throttled(self, retry_after: Optional[float] = None) -> None:
+        now = time.monotonic()
+        # Several 429s from one burst count as a single back-off
+        if now - self.last_backoff >= 1.0:
+            current = self.rate if self.rate is not None else self.observed_rate()
+            if self.rate is None:
+                # Start pacing now, with a single token left
+                self.tokens = min(self.capacity, 1.0)
+                self.updated = now
+                self._recent.clear()
+            self.rate = max(self.min_rate, current * self.backoff_factor)
+            self.last_backoff = now
+        if retry_after:
+            resume_at = now + retry_after
+            self.blocked_until = max(self.blocked_until, resume_at)
+            if resume_at > self.updated:
+                self.updated = resume_at
+                self.tokens = min(self.tokens, 1.0)
+
+class RateLimiter:
+    """
+    Per-host adaptive rate limiter used by EpilotClient.
+
+    By default hosts are not paced until they answer 429.
+
+    Usage:
+        limiter = RateLimiter()                       # unpaced until the first 429
+        limiter = RateLimiter(rate=10, host_rates={"entity.sls.epilot.io": 25})
+        client = EpilotClient(rate_limiter=limiter)
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: int = 10,
+        min_rate: float = 0.5,
+        max_rate: Optional[float] = None,
+        host_rates: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            rate: Initial requests per second for each host, or None to send
+                unpaced until the host answers 429
+            burst: Requests allowed back to back before the rate applies
+            min_rate: Lower bound when backing off after 429s
+            max_rate: Optional upper bound when speeding up after successes
+            host_rates: Initial rate overrides keyed by host name
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.host_rates = host_rates or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_env(cls) -> Optional["RateLimiter"]:
+        """
+        Limiter configured by EPILOT_RATE_LIMIT / EPILOT_RATE_LIMIT_MAX (req/s; unset = none).
+
+        Returns None for EPILOT_RATE_LIMIT=off.
+        """
+        rate = os.getenv("EPILOT_RATE_LIMIT", "").strip()
+        max_rate = os.getenv("EPILOT_RATE_LIMIT_MAX", "").strip()
+        if rate.lower() in RATE_LIMIT_OFF:
+            return None
+        return cls(
+            rate=float(rate) if rate else None,
+            max_rate=float(max_rate) if max_rate else None
+        )
+
+    def bucket(self, url: str) -> TokenBucket:
+        """Return the bucket for the host of a URL."""
+        host = urlsplit(url).hostname or ""
+        if host not in self._buckets:
+            rate = self.host_rates.get(host, self.rate)
+            min_rate, max_rate = self.min_rate, self.max_rate
+            if rate is not None:
+                min_rate = min(min_rate, rate)
+                max_rate = None if max_rate is None else max(max_rate, rate)
+            self._buckets[host] = TokenBucket(
+                rate=rate,
+                burst=self.burst,
+                min_rate=min_rate,
+                max_rate=max_rate
+            )
+        return self._buckets[host]
+
+    async def acquire(self, url: str) -> None:
+        """Wait for a free slot on the host of `url`."""
+        await self.bucket(url).acquire()
+
+    def record(self, url: str, response: httpx.Response) -> None:
+        """Adapt the host's rate to the outcome of a request."""
+        bucket = self.bucket(url)
+        if response.status_code == 429:
+            bucket.on_throttled(parse_retry_after(response.headers.get("Retry-After")))
+        elif response.status_code < 500:
+            bucket.on_success()
+
+    def current_rates(self) -> Dict[str, Optional[float]]:
+        """Current requests per second by host (None while a host is unpaced)."""
+        return {
+            host: None if bucket.rate is None else round(bucket.rate, 2)
+            for host, bucket in self._buckets.items()
+        }
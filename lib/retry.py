@@ -0,0 +1,102 @@
+"""
+Retry policy for Epilot API requests
+
+Exponential backoff with full jitter, limited by MAX_RETRIES per request and
+by a retry budget shared across the whole run.
+"""
+
+import random
+from typing import Iterable, Optional
+
+import httpx
+
+from config.epilot_config import MAX_RETRIES
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+# Raised before any byte of the request reached the server: safe to retry for every verb
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+class RetryPolicy:
+    """
+    Decides whether and when a failed request is retried.
+
+    Idempotent verbs are retried after timeouts, network errors and 5xx.
+    POST/PATCH requests are only retried when the caller marks them
+    idempotent, or when the connection failed before the request was sent:
+    after a timeout or a 5xx the server may already have applied it.
+
+    Usage:
+        client = EpilotClient(retry_policy=RetryPolicy(max_retries=5, budget=500))
+    """
+
+    def __init__(
+        self,
+        max_retries: int = MAX_RETRIES,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        budget: int = 100,
+        retry_statuses: Iterable[int] = RETRY_STATUSES,
+        retry_methods: Iterable[str] = IDEMPOTENT_METHODS
+    ):
+        """
+        Args:
+            max_retries: Retries per request after the first attempt
+            backoff_base: Upper bound of the first backoff in seconds
+            backoff_max: Cap for a single backoff in seconds
+            budget: Total retries allowed over the lifetime of the policy
+            retry_statuses: HTTP status codes that count as transient
+            retry_methods: Verbs that are safe to retry without a key
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.budget = budget
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(m.upper() for m in retry_methods)
+        self.retries_used = 0
+
+    @property
+    def budget_remaining(self) -> int:
+        return max(0, self.budget - self.retries_used)
+
+    def is_retryable(
+        self,
+        response: Optional[httpx.Response] = None,
+        error: Optional[Exception] = None
+    ) -> bool:
+        """Whether the outcome looks transient."""
+        if error is not None:
+            return isinstance(error, (httpx.TimeoutException, httpx.NetworkError, httpx.RemoteProtocolError))
+        return response is not None and response.status_code in self.retry_statuses
+
+    def should_retry(
+        self,
+        method: str,
+        attempt: int,
+        idempotent: bool = False,
+        response: Optional[httpx.Response] = None,
+        error: Optional[Exception] = None
+    ) -> bool:
+        """
+        Decide whether attempt number `attempt` (0-based) gets another try.
+
+        Consumes one unit of the retry budget when it returns True.
+        """
+        if attempt >= self.max_retries or self.budget_remaining == 0:
+            return False
+        if not idempotent and method.upper() not in self.retry_methods and not isinstance(error, NOT_SENT_ERRORS):
+            return False
+        if not self.is_retryable(response, error):
+            return False
+
+        self.retries_used += 1
+        return True
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before the next attempt (full jitter)."""
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
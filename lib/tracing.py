@@ -0,0 +1,238 @@
+"""
+Phase-level tracing for the scripts
+
+Nested spans for script phases (list fetch, detail fetch, file writes, ...)
+and for every request EpilotClient sends. Spans follow the OpenTelemetry
+data model and are written as OTLP/JSON, so a trace file can be loaded
+into any OpenTelemetry collector or viewer.
+
+Set EPILOT_TRACE=<file> to write OTLP/JSON lines ("{pid}" in the name is
+replaced by the process id), or EPILOT_TRACE=console for a breakdown of
+total and self time per span path on stderr when the script exits.
+Without EPILOT_TRACE spans cost next to nothing.
+"""
+
+import os
+import sys
+import time
+import atexit
+import secrets
+import contextvars
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from . import codec
+
+SERVICE_NAME = "epilot-scripts"
+FLUSH_EVERY = 512
+
+# OTLP enum values
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+class Span:
+    """One timed operation; children are the spans opened while it is current."""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent", "path", "start_ns", "end_ns",
+                 "child_ns", "attributes", "status", "status_message")
+
+    def __init__(self, name: str, kind: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.path = f"{parent.path} > {name}" if parent else name
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.child_ns = 0
+        self.attributes = attributes
+        self.status = 0
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    @property
+    def duration_ns(self) -> int:
+        return self.end_ns - self.start_ns
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": otlp_attributes(self.attributes),
+            "status": {"code": self.status, "message": self.status_message} if self.status_message else {"code": self.status},
+        }
+        if self.parent is not None:
+            span["parentSpanId"] = self.parent.span_id
+        return span
+
+class _NoopSpan:
+    """Stand-in yielded while tracing is off."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+def otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+class PathStats:
+    """Aggregated timings of all spans with the same path."""
+
+    __slots__ = ("count", "total_ns", "self_ns", "errors")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.self_ns = 0
+        self.errors = 0
+
+class Tracer:
+    """
+    Collects finished spans and exports them to an OTLP/JSON file or the console.
+
+    Usage:
+        from lib.tracing import span
+
+        with span("export_workflows.fetch_details", count=len(ids)):
+            details = await fetch_workflow_details_batch(client, ids)
+    """
+
+    def __init__(self, exporter: str):
+        """
+        Args:
+            exporter: "console" or the path of an OTLP/JSON lines file
+        """
+        self.console = exporter == "console"
+        self.path = None if self.console else Path(exporter.replace("{pid}", str(os.getpid())))
+        self.buffer: List[Span] = []
+        self.paths: Dict[str, PathStats] = {}
+        self.resource = {
+            "service.name": SERVICE_NAME,
+            "process.pid": os.getpid(),
+            "process.command": Path(sys.argv[0]).name if sys.argv and sys.argv[0] else None,
+        }
+        if self.path is not None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_bytes(b"")
+        atexit.register(self.shutdown)
+
+    def start(self, span: Span) -> None:
+        # Registered on start so the breakdown lists parents before their children
+        if self.console and span.path not in self.paths:
+            self.paths[span.path] = PathStats()
+
+    def finish(self, span: Span) -> None:
+        if self.console:
+            stats = self.paths[span.path]
+            stats.count += 1
+            stats.total_ns += span.duration_ns
+            # Concurrent children can add up to more than the parent's wall time
+            stats.self_ns += max(0, span.duration_ns - span.child_ns)
+            stats.errors += span.status == STATUS_ERROR
+            return
+        self.buffer.append(span)
+        if len(self.buffer) >= FLUSH_EVERY:
+            self.flush()
+
+    def flush(self) -> None:
+        """Append buffered spans to the trace file as one OTLP/JSON export request."""
+        if not self.buffer or self.path is None:
+            return
+        request = {
+            "resourceSpans": [{
+                "resource": {"attributes": otlp_attributes(self.resource)},
+                "scopeSpans": [{"scope": {"name": "lib.tracing"}, "spans": [span.to_otlp() for span in self.buffer]}],
+            }]
+        }
+        with open(self.path, 'ab') as f:
+            f.write(codec.dumps(request, compact=True) + b"\n")
+        self.buffer = []
+
+    def breakdown(self) -> str:
+        """Per span path: count, total and self time, in first-seen order."""
+        lines = [f"{'Span':<70} {'Count':>7} {'Total ms':>11} {'Self ms':>11}"]
+        for path, stats in self.paths.items():
+            depth = path.count(" > ")
+            label = "  " * depth + path.rsplit(" > ", 1)[-1]
+            errors = f"  ({stats.errors} errors)" if stats.errors else ""
+            lines.append(
+                f"{label[:70]:<70} {stats.count:>7} {stats.total_ns / 1e6:>11.1f} {stats.self_ns / 1e6:>11.1f}{errors}"
+            )
+        return "\n".join(lines)
+
+    def shutdown(self) -> None:
+        if self.console:
+            if self.paths:
+                print("\n🧭 Trace breakdown\n" + self.breakdown(), file=sys.stderr, flush=True)
+            return
+        self.flush()
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("epilot_span", default=None)
+_tracer: Union[Tracer, None, bool] = False  # False = not configured yet
+
+def get_tracer() -> Optional[Tracer]:
+    """The process-wide tracer configured by EPILOT_TRACE, or None if tracing is off."""
+    global _tracer
+    if _tracer is False:
+        exporter = os.getenv("EPILOT_TRACE", "").strip()
+        _tracer = Tracer(exporter) if exporter else None
+    return _tracer
+
+def configure(exporter: Optional[str]) -> Optional[Tracer]:
+    """Replace the tracer: "console", a file path, or None to turn tracing off."""
+    global _tracer
+    if isinstance(_tracer, Tracer):
+        _tracer.shutdown()
+        atexit.unregister(_tracer.shutdown)
+    _tracer = Tracer(exporter) if exporter else None
+    return _tracer
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Union[Span, _NoopSpan]]:
+    """
+    Time the enclosed block as a child of the current span.
+
+    Works across `await`: tasks started inside the block inherit it as parent.
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        yield NOOP_SPAN
+        return
+
+    parent = _current.get()
+    current = Span(name, kind, parent, attributes)
+    tracer.start(current)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = STATUS_ERROR
+        current.status_message = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _current.reset(token)
+        current.end_ns = time.time_ns()
+        if current.status == 0:
+            current.status = STATUS_ERROR if current.attributes.get("error.type") is not None else STATUS_OK
+        if parent is not None:
+            parent.child_ns += current.duration_ns
+        tracer.finish(current)
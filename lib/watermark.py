@@ -0,0 +1,79 @@
+"""
+High-water marks for incremental entity exports
+
+Stores, per export, the (_updated_at, _id) of the most recently changed
+entity that was written. The next run continues after it with a
+search_after cursor sorted by _updated_at, so only entities changed since
+then are fetched.
+"""
+
+import os
+from pathlib import Path
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Union
+
+from . import codec
+from .api_client import search_timestamp
+
+DEFAULT_WATERMARK_FILE = Path(__file__).parent.parent / "data" / "state" / "watermarks.json"
+
+# Re-read this much before the mark: entities become searchable shortly after
+# their _updated_at, so a change committed during the last run can sort
+# before the mark it set. Rows seen twice are replaced when merging.
+DEFAULT_OVERLAP = timedelta(minutes=5)
+
+def parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+class WatermarkStore:
+    """
+    Watermarks keyed by export name (e.g. "contact"), in one JSON file.
+
+    Usage:
+        store = WatermarkStore()
+        after = store.cursor("contact")          # None on the first run
+        ...
+        store.set("contact", updated_at, entity_id, rows=len(rows))
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.path = Path(path) if path else DEFAULT_WATERMARK_FILE
+        try:
+            self.marks: Dict[str, Dict[str, Any]] = codec.read_json(self.path)
+        except FileNotFoundError:
+            self.marks = {}
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.marks.get(name)
+
+    def cursor(self, name: str, overlap: timedelta = DEFAULT_OVERLAP) -> Optional[List[str]]:
+        """search_after cursor for an _updated_at walk, `overlap` before the mark."""
+        mark = self.get(name)
+        if not mark:
+            return None
+        if overlap:
+            start = parse_timestamp(mark["updated_at"]) - overlap
+            # The empty _id sorts before every entity with this timestamp
+            return [search_timestamp(start), ""]
+        return [mark["updated_at"], mark["id"]]
+
+    def set(self, name: str, updated_at: str, entity_id: str, **extra: Any) -> None:
+        """Store a new mark and write the file; written atomically, so a crash keeps the old one."""
+        self.marks[name] = {
+            "updated_at": updated_at,
+            "id": entity_id,
+            "saved_at": datetime.now().isoformat(),
+            **extra,
+        }
+        self._save()
+
+    def reset(self, name: str) -> None:
+        """Forget a mark so the next run is a full export."""
+        if self.marks.pop(name, None) is not None:
+            self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        codec.write_json(tmp_path, self.marks)
+        os.replace(tmp_path, self.path)
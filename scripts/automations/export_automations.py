@@ -12,7 +12,6 @@ Usage:
 import sys
 import asyncio
 import argparse
-import json
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -22,6 +21,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from lib.auth import load_env
 from lib.api_client import EpilotClient
+from lib.codec import read_json, write_json
+from lib.progress import Progress
+from lib.profiling import add_profile_arguments, run_profiled
 
 AUTOMATION_API_BASE = "https://automation.sls.epilot.io"
 
@@ -71,7 +73,7 @@ async def fetch_automation_details(client: EpilotClient, flow_id: str) -> Option
         print(f"❌ Error fetching automation {flow_id}: {e}")
         return None
 
-async def export_automations(client: EpilotClient, output_dir: Path):
+async def export_automations(client: EpilotClient, output_dir: Path, compact: bool = False):
     """
     Export all automation flows to JSON files.
     """
@@ -91,6 +93,7 @@ async def export_automations(client: EpilotClient, output_dir: Path):
     
     print(f"\n💾 Exporting {len(automations)} automation flow(s)...\n")
     
+    progress = Progress(len(automations), "Automations")
     for i, automation in enumerate(automations, 1):
         flow_id = automation.get('id', automation.get('_id', f'unknown_{i}'))
         flow_name = automation.get('name', automation.get('title', 'Untitled'))
@@ -105,10 +108,9 @@ async def export_automations(client: EpilotClient, output_dir: Path):
         filename = f"automation_{flow_id}.json"
         filepath = output_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(automation, f, indent=2, ensure_ascii=False)
+        write_json(filepath, automation, compact=compact)
         
-        print(f"   [{i}/{len(automations)}] {flow_name} → {filename}")
+        progress.advance()
         
         # Analyze automation structure
         triggers = automation.get('triggers', [])
@@ -128,10 +130,11 @@ async def export_automations(client: EpilotClient, output_dir: Path):
             "action_types": list(set([a.get('type') for a in actions if isinstance(a, dict) and a.get('type')]))
         })
     
+    progress.close()
+    
     # Save summary file
     summary_path = output_dir / "automations_summary.json"
-    with open(summary_path, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    write_json(summary_path, summary, compact=compact)
     
     print(f"\n✅ Automations exported to {output_dir}")
     print(f"📊 Summary saved to {summary_path}")
@@ -145,8 +148,7 @@ async def analyze_structure(output_dir: Path):
     automation_files = list(output_dir.glob("automation_*.json"))
     if automation_files:
         print(f"🤖 Automation Flow Structure ({len(automation_files)} files):")
-        with open(automation_files[0], 'r') as f:
-            sample = json.load(f)
+        sample = read_json(automation_files[0])
         print(f"   Top-level keys: {', '.join(list(sample.keys())[:10])}")
         
         # Analyze triggers
@@ -169,19 +171,19 @@ async def analyze_structure(output_dir: Path):
         if 'conditions' in sample:
             print(f"   Contains 'conditions' field")
 
-async def main(output_dir: str):
+async def main(output_dir: str, compact: bool = False):
     """
     Main function to export automation flows.
     """
     load_env()
-    client = EpilotClient()
+    client = EpilotClient(cache=True)
     
     print("🔄 Starting automation export...\n")
     
     output_path = Path(output_dir)
     
     try:
-        await export_automations(client, output_path)
+        await export_automations(client, output_path, compact)
         await analyze_structure(output_path)
         
         print(f"\n🎉 Export complete! Files saved to: {output_path}")
@@ -191,6 +193,8 @@ async def main(output_dir: str):
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        await client.aclose()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Export Epilot automation flows")
@@ -199,6 +203,13 @@ if __name__ == "__main__":
         default="data/output/automations",
         help="Output directory for JSON files"
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact JSON without indentation (for machine-consumed exports)"
+    )
+    
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
@@ -207,4 +218,4 @@ if __name__ == "__main__":
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         args.output = f"data/output/automations_{timestamp}"
     
-    asyncio.run(main(args.output))
+    run_profiled(args, lambda: asyncio.run(main(args.output, args.compact)), output=args.output)
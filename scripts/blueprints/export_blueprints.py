@@ -13,7 +13,6 @@ Usage:
 import sys
 import asyncio
 import argparse
-import json
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -23,6 +22,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from lib.auth import load_env
 from lib.api_client import EpilotClient
+from lib.codec import read_json, write_json
+from lib.progress import Progress
+from lib.profiling import add_profile_arguments, run_profiled
 
 BLUEPRINT_API_BASE = "https://blueprint-manifest.sls.epilot.io"
 
@@ -71,7 +73,7 @@ async def fetch_blueprint_details(client: EpilotClient, blueprint_id: str) -> Op
         print(f"❌ Error fetching blueprint {blueprint_id}: {e}")
         return None
 
-async def export_blueprints(client: EpilotClient, output_dir: Path):
+async def export_blueprints(client: EpilotClient, output_dir: Path, compact: bool = False):
     """
     Export all blueprints to JSON files.
     """
@@ -91,6 +93,7 @@ async def export_blueprints(client: EpilotClient, output_dir: Path):
     
     print(f"\n💾 Exporting {len(blueprints)} blueprint(s)...\n")
     
+    progress = Progress(len(blueprints), "Blueprints")
     for i, blueprint in enumerate(blueprints, 1):
         blueprint_id = blueprint.get('id', blueprint.get('_id', f'unknown_{i}'))
         blueprint_name = blueprint.get('name', blueprint.get('title', 'Untitled'))
@@ -105,10 +108,9 @@ async def export_blueprints(client: EpilotClient, output_dir: Path):
         filename = f"blueprint_{blueprint_id}.json"
         filepath = output_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(blueprint, f, indent=2, ensure_ascii=False)
+        write_json(filepath, blueprint, compact=compact)
         
-        print(f"   [{i}/{len(blueprints)}] {blueprint_name} → {filename}")
+        progress.advance()
         
         # Add to summary
         resources = blueprint.get('resources', [])
@@ -127,10 +129,11 @@ async def export_blueprints(client: EpilotClient, output_dir: Path):
             "resource_types": list(set(resource_types))
         })
     
+    progress.close()
+    
     # Save summary file
     summary_path = output_dir / "blueprints_summary.json"
-    with open(summary_path, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    write_json(summary_path, summary, compact=compact)
     
     print(f"\n✅ Blueprints exported to {output_dir}")
     print(f"📊 Summary saved to {summary_path}")
@@ -144,8 +147,7 @@ async def analyze_structure(output_dir: Path):
     blueprint_files = list(output_dir.glob("blueprint_*.json"))
     if blueprint_files:
         print(f"📘 Blueprint Structure ({len(blueprint_files)} files):")
-        with open(blueprint_files[0], 'r') as f:
-            sample = json.load(f)
+        sample = read_json(blueprint_files[0])
         print(f"   Top-level keys: {', '.join(list(sample.keys())[:10])}")
         
         # Check for resources
@@ -160,19 +162,19 @@ async def analyze_structure(output_dir: Path):
                 workflow_count = sum(1 for r in resources if isinstance(r, dict) and r.get('type') == 'workflow_definition')
                 print(f"   Workflows packaged: {workflow_count}")
 
-async def main(output_dir: str):
+async def main(output_dir: str, compact: bool = False):
     """
     Main function to export blueprints.
     """
     load_env()
-    client = EpilotClient()
+    client = EpilotClient(cache=True)
     
     print("🔄 Starting blueprint export...\n")
     
     output_path = Path(output_dir)
     
     try:
-        await export_blueprints(client, output_path)
+        await export_blueprints(client, output_path, compact)
         await analyze_structure(output_path)
         
         print(f"\n🎉 Export complete! Files saved to: {output_path}")
@@ -182,6 +184,8 @@ async def main(output_dir: str):
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        await client.aclose()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Export Epilot blueprints")
@@ -190,6 +194,13 @@ if __name__ == "__main__":
         default="data/output/blueprints",
         help="Output directory for JSON files"
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact JSON without indentation (for machine-consumed exports)"
+    )
+    
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
@@ -198,4 +209,4 @@ if __name__ == "__main__":
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         args.output = f"data/output/blueprints_{timestamp}"
     
-    asyncio.run(main(args.output))
+    run_profiled(args, lambda: asyncio.run(main(args.output, args.compact)), output=args.output)
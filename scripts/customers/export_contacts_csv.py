@@ -8,104 +8,116 @@ Usage:
     python scripts/customers/export_contacts_csv.py
     python scripts/customers/export_contacts_csv.py --output data/output/contacts.csv
     python scripts/customers/export_contacts_csv.py --limit 100
+    python scripts/customers/export_contacts_csv.py --pagination sharded --shards 64 --concurrency 8
+    python scripts/customers/export_contacts_csv.py --hydrate account
+    python scripts/customers/export_contacts_csv.py --incremental
+    python scripts/customers/export_contacts_csv.py --merge-into data/output/contacts.csv
+    python scripts/customers/export_contacts_csv.py --format parquet
+
+Offset paging is used while the result fits into the search result window
+(10,000); larger exports walk time-range shards with search_after cursors.
+
+Only the attributes written to the CSV are requested. Relations are not
+hydrated unless named with --hydrate; each one adds a column with the
+titles of the related entities.
+
+Every complete export stores a watermark (data/state/watermarks.json).
+--incremental then fetches only contacts changed since, into a delta file;
+--merge-into keeps one base file up to date. Deleted contacts are not
+detected by incremental runs; run a full export now and then.
+
+--format parquet writes the same columns to a zstd-compressed Parquet file
+in row groups, typed from the contact schema (needs pyarrow); --format jsonl
+writes one JSON object per contact. For other entity types use
+scripts/entities/export_entities.py.
 """
 
+import os
 import sys
 import asyncio
 import argparse
 import csv
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Sequence, Tuple
 
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from lib.auth import load_env
-from lib.api_client import EpilotClient
+from lib.api_client import EpilotClient, SEARCH_RESULT_WINDOW
+from lib.columnar import ROW_GROUP_SIZE, schema_column_kinds
+from lib.entity_export import (
+    META_FIELDS, OUTPUT_FORMATS, PAGE_CONCURRENCY, PAGINATION_MODES, SHARDS,
+    flatten_relation, open_row_writer, stream_entities
+)
+from lib.tracing import span
+from lib.watermark import WatermarkStore
+from lib.profiling import add_profile_arguments, run_profiled
+
+CONTACT_QUERY = "_schema:contact"
+WATERMARK_NAME = "contact"
 
-ENTITY_API_BASE = "https://entity.sls.epilot.io"
+CONTACT_FIELDS = [
+    'first_name', 'last_name', 'email', 'phone',
+    'salutation', 'company', 'street', 'city',
+    'postal_code', 'country', 'status'
+]
 
-async def fetch_all_contacts(client: EpilotClient, limit: int = None) -> List[Dict[str, Any]]:
+def search_fields(relations: Sequence[str] = ()) -> List[str]:
+    """Attributes to request: only what flatten_contact writes."""
+    return [*META_FIELDS.values(), *CONTACT_FIELDS, *relations]
+
+async def stream_flattened_contacts(
+    client: EpilotClient,
+    sink: Callable[[Dict[str, str]], None],
+    limit: int = None,
+    concurrency: int = PAGE_CONCURRENCY,
+    pagination: str = "auto",
+    shards: int = SHARDS,
+    relations: Optional[List[str]] = None,
+    after: Optional[List[str]] = None
+) -> Tuple[int, bool]:
     """
-    Fetch all contacts from Epilot with pagination.
+    Fetch all contacts page by page and pass each one, flattened, to `sink`.
     
-    Args:
-        client: EpilotClient instance
-        limit: Optional limit for total contacts to fetch
+    Only the exported attributes are requested; see
+    lib.entity_export.stream_entities for the pagination modes.
     
     Returns:
-        List of contact entities
+        Number of contacts passed to `sink`, and whether the export is complete
     """
-    all_contacts = []
-    from_offset = 0
-    page_size = 100
-    
+    relations = relations or []
     print("📥 Fetching contacts from Epilot...")
-    
-    while True:
-        payload = {
-            "q": "_schema:contact",
-            "from": from_offset,
-            "size": page_size,
-            "hydrate": True
-        }
-        
-        try:
-            url = f"{ENTITY_API_BASE}/v1/entity:search"
-            result = await client.post(url, data=payload)
-            
-            entities = result.get('results', [])
-            total = result.get('total', 0)
-            
-            if not entities:
-                break
-            
-            all_contacts.extend(entities)
-            print(f"   Fetched {len(all_contacts)}/{total} contacts...")
-            
-            # Check if we've reached the limit or end
-            if limit and len(all_contacts) >= limit:
-                all_contacts = all_contacts[:limit]
-                break
-            
-            if len(all_contacts) >= total:
-                break
-            
-            from_offset += page_size
-            
-        except Exception as e:
-            print(f"❌ Error fetching contacts: {e}")
-            break
-    
-    return all_contacts
-
-def flatten_contact(contact: Dict[str, Any]) -> Dict[str, str]:
+    return await stream_entities(
+        client,
+        CONTACT_QUERY,
+        lambda contact: sink(flatten_contact(contact, relations)),
+        fields=search_fields(relations),
+        # Hydration resolves every requested relation, so it is only on when one is asked for
+        hydrate=bool(relations),
+        limit=limit,
+        concurrency=concurrency,
+        pagination=pagination,
+        shards=shards,
+        after=after,
+        label="Contacts"
+    )
+
+def flatten_contact(contact: Dict[str, Any], relations: Sequence[str] = ()) -> Dict[str, str]:
     """
     Flatten contact entity into CSV-friendly format.
     
     Args:
         contact: Contact entity from API
+        relations: Relation attributes to add as columns
     
     Returns:
         Flattened dictionary with string values
     """
-    flattened = {
-        'id': contact.get('_id', ''),
-        'title': contact.get('_title', ''),
-        'schema': contact.get('_schema', ''),
-        'created_at': contact.get('_created_at', ''),
-        'updated_at': contact.get('_updated_at', ''),
-    }
-    
-    # Extract common contact fields
-    fields_to_extract = [
-        'first_name', 'last_name', 'email', 'phone',
-        'salutation', 'company', 'street', 'city',
-        'postal_code', 'country', 'status'
-    ]
-    
-    for field in fields_to_extract:
+    flattened = {column: contact.get(attribute, '') for column, attribute in META_FIELDS.items()}
+    
+    for field in CONTACT_FIELDS:
         value = contact.get(field)
         if value is not None:
             # Handle lists (like email arrays)
@@ -123,66 +135,206 @@ def flatten_contact(contact: Dict[str, Any]) -> Dict[str, str]:
         else:
             flattened[field] = ''
     
+    for relation in relations:
+        flattened[relation] = flatten_relation(contact.get(relation))
+    
     return flattened
 
-async def export_contacts_to_csv(output_path: str, limit: int = None):
+def column_order(rows: List[Dict[str, str]], existing: Sequence[str] = ()) -> List[str]:
+    """
+    CSV columns: the key fields first, the rest sorted; columns of an
+    existing file keep their position and new ones are appended.
+    """
+    all_fields = set()
+    for row in rows:
+        all_fields.update(row.keys())
+    
+    if existing:
+        return list(existing) + sorted(all_fields - set(existing))
+    
+    # Sort fields for consistent ordering
+    fieldnames = sorted(all_fields)
+    
+    # Ensure key fields come first
+    priority_fields = ['id', 'title', 'first_name', 'last_name', 'email', 'phone']
+    for field in reversed(priority_fields):
+        if field in fieldnames:
+            fieldnames.remove(field)
+            fieldnames.insert(0, field)
+    return fieldnames
+
+def contact_columns(relations: Sequence[str] = ()) -> List[str]:
+    """CSV columns of flatten_contact's rows, known before the first contact arrives."""
+    return column_order([dict.fromkeys([*META_FIELDS, *CONTACT_FIELDS, *relations])])
+
+def contact_column_kinds(schema: Optional[Dict[str, Any]], relations: Sequence[str] = ()) -> Dict[str, str]:
+    """
+    Parquet column types for flatten_contact's columns, from the contact schema.
+    
+    List attributes (email, phone) are flattened to their first value and
+    relations to titles, so those stay strings.
+    """
+    kinds = schema_column_kinds(schema)
+    columns = {}
+    for column in contact_columns(relations):
+        attribute = META_FIELDS.get(column, column)
+        if column in relations or attribute in ('email', 'phone'):
+            columns[column] = 'string'
+        else:
+            columns[column] = kinds.get(attribute, 'string')
+    return columns
+
+def merge_csv(base_file: Path, rows: List[Dict[str, str]]) -> Dict[str, int]:
     """
-    Export all contacts to CSV file.
+    Merge changed rows into a base CSV by id: changed rows replace their
+    old version in place, new ones are appended.
+    
+    The base file is streamed into a temporary file that then replaces it,
+    so only the changed rows (the delta) are held in memory and an
+    interrupted merge leaves the base file untouched.
+    """
+    changed = {row['id']: row for row in rows}
+    counts = {'updated': 0, 'added': 0, 'total': 0}
+    tmp_file = base_file.with_suffix(base_file.suffix + '.tmp')
+    
+    with open(base_file, newline='', encoding='utf-8') as source:
+        reader = csv.DictReader(source)
+        fieldnames = column_order(rows, reader.fieldnames or [])
+        with open(tmp_file, 'w', newline='', encoding='utf-8') as target:
+            writer = csv.DictWriter(target, fieldnames=fieldnames, restval='')
+            writer.writeheader()
+            for row in reader:
+                replacement = changed.pop(row.get('id'), None)
+                if replacement is not None:
+                    row = replacement
+                    counts['updated'] += 1
+                writer.writerow(row)
+                counts['total'] += 1
+            for row in changed.values():
+                writer.writerow(row)
+                counts['added'] += 1
+                counts['total'] += 1
+    
+    os.replace(tmp_file, base_file)
+    return counts
+
+async def export_contacts_to_csv(
+    output_path: str,
+    limit: int = None,
+    concurrency: int = PAGE_CONCURRENCY,
+    pagination: str = "auto",
+    shards: int = SHARDS,
+    relations: Optional[List[str]] = None,
+    incremental: bool = False,
+    merge_into: Optional[str] = None,
+    output_format: str = "csv",
+    row_group_size: int = ROW_GROUP_SIZE
+):
+    """
+    Export all contacts to a CSV (or Parquet) file.
+    
+    Complete exports (without --limit) store the newest (_updated_at, _id)
+    as watermark. Incremental runs only fetch contacts changed since the
+    watermark and write them to a delta file or merge them into a base file.
     
     Args:
-        output_path: Path to output CSV file
+        output_path: Path to output CSV file (the delta file when incremental)
         limit: Optional limit for number of contacts to export
+        concurrency: Search pages or shards fetched in parallel
+        pagination: Pagination mode (see stream_flattened_contacts)
+        shards: Number of time ranges for sharded pagination
+        relations: Relation attributes to hydrate and export
+        incremental: Only fetch contacts changed since the stored watermark
+        merge_into: Merge the exported rows into this CSV instead of
+            writing output_path (implies incremental once it exists)
+        output_format: "csv", "jsonl" or "parquet"
+        row_group_size: Rows per Parquet row group
     """
     load_env()
     client = EpilotClient()
+    watermarks = WatermarkStore()
+    base_file = Path(merge_into) if merge_into else None
+    
+    after = None
+    if incremental or (base_file and base_file.exists()):
+        after = watermarks.cursor(WATERMARK_NAME)
+        if after is None:
+            print("⚠️  No watermark stored yet - running a full export")
+        elif base_file and not base_file.exists():
+            print(f"⚠️  {base_file} does not exist yet - running a full export")
+            after = None
     
     print("🔄 Starting contact export...\n")
     
+    relations = relations or []
+    merging = base_file is not None and base_file.exists()
+    output_file = base_file or Path(output_path)
+    delta: List[Dict[str, str]] = []
+    mark = None
+    
+    def sink(row: Dict[str, str]) -> None:
+        nonlocal mark
+        # Rows are written as they arrive; only a merge keeps them, as the delta
+        if merging:
+            delta.append(row)
+        else:
+            writer(row)
+        if row['updated_at'] and (mark is None or (row['updated_at'], row['id']) > mark):
+            mark = (row['updated_at'], row['id'])
+    
     try:
-        # Fetch all contacts
-        contacts = await fetch_all_contacts(client, limit)
+        schema = None
+        if output_format == "parquet":
+            with span("fetch_schema"):
+                schema = await client.get_entity_schema("contact")
+            if schema is None:
+                print("⚠️  Contact schema not found - all Parquet columns are strings")
+        writer = open_row_writer(output_file, output_format, contact_column_kinds(schema, relations), row_group_size)
         
-        if not contacts:
-            print("⚠️  No contacts found.")
-            return
+        if not merging:
+            print(f"💾 Writing to {output_file} as contacts arrive")
         
-        print(f"\n✅ Retrieved {len(contacts)} contacts")
+        # Fetch, flatten and write all contacts
+        with span("export_contacts", incremental=after is not None):
+            try:
+                count, complete = await stream_flattened_contacts(
+                    client, sink, limit, concurrency, pagination, shards, relations, after
+                )
+            finally:
+                writer.close()
         
-        # Flatten contacts for CSV
-        flattened_contacts = [flatten_contact(contact) for contact in contacts]
+        if not complete:
+            print(f"\n❌ Export failed: only {count} contacts were fetched")
+            if count and not merging:
+                print(f"   Partial file left at {output_file}")
+            print("⚠️  Watermark not updated (export incomplete)")
+            sys.exit(1)
         
-        # Get all unique field names
-        all_fields = set()
-        for contact in flattened_contacts:
-            all_fields.update(contact.keys())
-        
-        # Sort fields for consistent ordering
-        fieldnames = sorted(all_fields)
-        
-        # Ensure key fields come first
-        priority_fields = ['id', 'title', 'first_name', 'last_name', 'email', 'phone']
-        for field in reversed(priority_fields):
-            if field in fieldnames:
-                fieldnames.remove(field)
-                fieldnames.insert(0, field)
-        
-        # Create output directory if it doesn't exist
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        if not count:
+            print("✅ No contacts changed since the last export." if after else "⚠️  No contacts found.")
+            return
         
-        # Write to CSV
-        print(f"\n💾 Writing to {output_path}...")
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(flattened_contacts)
+        if merging:
+            print(f"\n🔀 Merging {len(delta)} contacts into {base_file}...")
+            with span("merge_csv"):
+                counts = merge_csv(base_file, delta)
+            print(f"✅ {counts['updated']} updated, {counts['added']} added - {base_file} now has {counts['total']} contacts")
+        else:
+            print(f"\n✅ Successfully exported {count} contacts to {output_file}")
+            print(f"📊 Columns: {', '.join(writer.fieldnames[:5])}{'...' if len(writer.fieldnames) > 5 else ''}")
+            if getattr(writer, 'invalid', 0):
+                print(f"⚠️  {writer.invalid} values did not match their column type and were written as null")
         
-        print(f"✅ Successfully exported {len(contacts)} contacts to {output_path}")
-        print(f"📊 Columns: {', '.join(fieldnames[:5])}{'...' if len(fieldnames) > 5 else ''}")
+        # Only a complete export may move the watermark, or skipped contacts would never be fetched
+        if limit is None and mark:
+            watermarks.set(WATERMARK_NAME, mark[0], mark[1], rows=count)
+            print(f"🔖 Watermark: {mark[0]}")
         
     except Exception as e:
         print(f"❌ Error: {e}")
         sys.exit(1)
+    finally:
+        await client.aclose()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Export Epilot contacts to CSV")
@@ -196,12 +348,71 @@ if __name__ == "__main__":
         type=int,
         help="Limit number of contacts to export (for testing)"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=PAGE_CONCURRENCY,
+        help=f"Search pages or shards fetched in parallel (default: {PAGE_CONCURRENCY}, 1 = sequential)"
+    )
+    parser.add_argument(
+        "--pagination",
+        choices=PAGINATION_MODES,
+        default="auto",
+        help=f"offset, cursor (search_after), sharded (parallel time ranges) or auto "
+             f"(offset up to {SEARCH_RESULT_WINDOW:,} contacts, sharded beyond; default)"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=SHARDS,
+        help=f"Time ranges for sharded pagination (default: {SHARDS})"
+    )
+    parser.add_argument(
+        "--hydrate",
+        action="append",
+        default=[],
+        metavar="RELATION",
+        help="Hydrate this relation attribute and export the related titles as a column (repeatable)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only export contacts changed since the last complete export (writes a delta file)"
+    )
+    parser.add_argument(
+        "--merge-into",
+        metavar="BASE_CSV",
+        help="Keep this CSV up to date: the first run writes it, later runs merge changed contacts into it"
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        help="Output format (default: from the --output extension, csv otherwise)"
+    )
+    parser.add_argument(
+        "--row-group-size",
+        type=int,
+        default=ROW_GROUP_SIZE,
+        help=f"Rows per Parquet row group (default: {ROW_GROUP_SIZE:,})"
+    )
+    
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
+    output_format = args.format or next(
+        (name for name in OUTPUT_FORMATS if args.output.endswith(f".{name}")), "csv"
+    )
+    if output_format != "csv" and args.merge_into:
+        parser.error("--merge-into only supports CSV; use --incremental for delta files")
+    
     # Add timestamp to filename if using default
     if args.output == "data/output/contacts_export.csv":
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        args.output = f"data/output/contacts_export_{timestamp}.csv"
+        kind = "delta" if args.incremental else "export"
+        args.output = f"data/output/contacts_{kind}_{timestamp}.{output_format}"
     
-    asyncio.run(export_contacts_to_csv(args.output, args.limit))
+    run_profiled(args, lambda: asyncio.run(export_contacts_to_csv(
+        args.output, args.limit, args.concurrency, args.pagination, args.shards, args.hydrate,
+        args.incremental, args.merge_into, output_format, args.row_group_size
+    )), output=args.output)
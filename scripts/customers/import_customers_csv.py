@@ -24,8 +24,11 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from lib.auth import load_env
 from lib.api_client import EpilotClient
+from lib.batch import RequestSpec
+from lib.progress import Progress
 
 ENTITY_API_BASE = "https://entity.sls.epilot.io"
+IMPORT_CONCURRENCY = 10
 
 async def import_customers(csv_file: str):
     """
@@ -55,6 +58,7 @@ async def import_customers(csv_file: str):
     success_count = 0
     error_count = 0
     
+    specs = []
     for i, customer in enumerate(customers, 1):
         first_name = customer.get('first_name', '')
         last_name = customer.get('last_name', '')
@@ -63,8 +67,6 @@ async def import_customers(csv_file: str):
         
         title = f"{first_name} {last_name}".strip()
         
-        print(f"\n{i}. Creating: {title}")
-        
         # Build entity data
         entity_data = {
             "_schema": "contact",
@@ -75,16 +77,27 @@ async def import_customers(csv_file: str):
             "phone": [{"_phone": phone}] if phone else []
         }
         
-        try:
-            url = f"{ENTITY_API_BASE}/v1/entities"
-            result = await client.post(url, data=entity_data)
-            entity_id = result.get('_id', 'N/A')
-            print(f"   ✅ Created - ID: {entity_id}")
+        # Not idempotent: the entity API is not known to deduplicate creates, so a
+        # create is only retried when the connection failed before it was sent
+        specs.append(RequestSpec(
+            "POST",
+            f"{ENTITY_API_BASE}/v1/entities",
+            data=entity_data,
+            tag=title
+        ))
+    
+    # Create customers concurrently, counting each one as it completes
+    progress = Progress(len(specs), "Customers")
+    async for item in client.batch_iter(specs, concurrency=IMPORT_CONCURRENCY):
+        if item.ok:
             success_count += 1
-            
-        except Exception as e:
-            print(f"   ❌ Error: {e}")
+            progress.advance()
+        else:
             error_count += 1
+            progress.error(f"{item.index + 1}. Error creating {item.spec.tag}: {item.error}")
+    progress.close()
+    
+    await client.aclose()
     
     print("\n" + "=" * 80)
     print(f"\n📊 Import Summary:")
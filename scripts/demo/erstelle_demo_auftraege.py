@@ -19,6 +19,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from lib.auth import load_env
 from lib.api_client import EpilotClient
+from lib.progress import Progress
 
 ENTITY_API_BASE = "https://entity.sls.epilot.io"
 DATA_FILE = Path(__file__).parent.parent.parent / "data" / "input" / "demo" / "wuelfrath_auftraege.json"
@@ -51,6 +52,7 @@ async def create_orders_from_file(
     
     status_count = {}
     
+    progress = Progress(len(auftraege), "Aufträge")
     for i, auftrag in enumerate(auftraege, 1):
         titel = auftrag.get('titel', f'Auftrag {i}')
         kunde_name = auftrag.get('kunde_name')
@@ -59,7 +61,7 @@ async def create_orders_from_file(
         kunde_id = kunden_ids.get(kunde_name)
         
         if not kunde_id:
-            print(f"   [{i}/{len(auftraege)}] ⚠️  Kunde '{kunde_name}' nicht gefunden, überspringe")
+            progress.skip(f"[{i}/{len(auftraege)}] Kunde '{kunde_name}' nicht gefunden, überspringe")
             continue
         
         # Baue Order Entity
@@ -103,19 +105,13 @@ async def create_orders_from_file(
             order_map[titel] = order_id
             
             status = auftrag.get('status', 'offen')
-            betrag = auftrag.get('gesamtbetrag', 0.0)
             status_count[status] = status_count.get(status, 0) + 1
-            
-            print(f"   [{i}/{len(auftraege)}] ✅ {titel}")
-            print(f"             Status: {status}, Betrag: €{betrag:.2f}")
-            print(f"             Kunde: {kunde_name}")
-            
-            # Small delay to avoid rate limits
-            await asyncio.sleep(0.5)
+            progress.advance()
             
         except Exception as e:
-            print(f"   [{i}/{len(auftraege)}] ❌ Fehler bei {titel}: {e}")
+            progress.error(f"[{i}/{len(auftraege)}] Fehler bei {titel}: {e}")
     
+    progress.close()
     print()
     print(f"📊 Status-Verteilung:")
     for status, count in status_count.items():
@@ -19,6 +19,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from lib.auth import load_env
 from lib.api_client import EpilotClient
+from lib.progress import Progress
 
 ENTITY_API_BASE = "https://entity.sls.epilot.io"
 DATA_FILE = Path(__file__).parent.parent.parent / "data" / "input" / "demo" / "wuelfrath_chancen.json"
@@ -43,6 +44,7 @@ async def create_opportunities_from_file(client: EpilotClient, data_file: Path,
     
     status_count = {}
     
+    progress = Progress(len(chancen), "Chancen")
     for i, chance in enumerate(chancen, 1):
         titel = chance.get('titel', f'Chance {i}')
         kunde_name = chance.get('kunde_name')
@@ -51,7 +53,7 @@ async def create_opportunities_from_file(client: EpilotClient, data_file: Path,
         kunde_id = kunden_ids.get(kunde_name)
         
         if not kunde_id:
-            print(f"   [{i}/{len(chancen)}] ⚠️  Kunde '{kunde_name}' nicht gefunden, überspringe")
+            progress.skip(f"[{i}/{len(chancen)}] Kunde '{kunde_name}' nicht gefunden, überspringe")
             continue
         
         # Baue Opportunity Entity
@@ -78,19 +80,13 @@ async def create_opportunities_from_file(client: EpilotClient, data_file: Path,
             opportunity_map[titel] = opportunity_id
             
             status = chance.get('status', 'ausstehend')
-            typ = chance.get('typ', 'N/A')
             status_count[status] = status_count.get(status, 0) + 1
-            
-            print(f"   [{i}/{len(chancen)}] ✅ {titel}")
-            print(f"             Status: {status}, Typ: {typ}")
-            print(f"             Kunde: {kunde_name}")
-            
-            # Small delay to avoid rate limits
-            await asyncio.sleep(0.5)
+            progress.advance()
             
         except Exception as e:
-            print(f"   [{i}/{len(chancen)}] ❌ Fehler bei {titel}: {e}")
+            progress.error(f"[{i}/{len(chancen)}] Fehler bei {titel}: {e}")
     
+    progress.close()
     print()
     print(f"📊 Status-Verteilung:")
     for status, count in status_count.items():
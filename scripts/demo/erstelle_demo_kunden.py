@@ -19,6 +19,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from lib.auth import load_env
 from lib.api_client import EpilotClient
+from lib.progress import Progress
 
 ENTITY_API_BASE = "https://entity.sls.epilot.io"
 DATA_FILE = Path(__file__).parent.parent.parent / "data" / "input" / "demo" / "wuelfrath_kunden.json"
@@ -43,6 +44,7 @@ async def create_customers_from_file(client: EpilotClient, data_file: Path) -> d
     privatkunden = 0
     gewerbeckunden = 0
     
+    progress = Progress(len(kunden), "Kunden")
     for i, kunde in enumerate(kunden, 1):
         kunde_name = kunde.get('_title', f'Kunde {i}')
         schema = kunde.get('_schema', 'contact')
@@ -54,24 +56,16 @@ async def create_customers_from_file(client: EpilotClient, data_file: Path) -> d
             customer_map[kunde_name] = customer_id
             
             kundentyp = kunde.get('kundentyp', 'N/A')
-            adresse = kunde.get('address_line1', 'N/A')
-            sparten = ", ".join(kunde.get('sparte', []))
-            
             if kundentyp == "Privatkunde":
                 privatkunden += 1
             elif kundentyp == "Gewerbekunde":
                 gewerbeckunden += 1
-            
-            print(f"   [{i}/{len(kunden)}] ✅ {kunde_name}")
-            print(f"             {kundentyp} - {adresse}")
-            print(f"             Sparten: {sparten}")
-            
-            # Small delay to avoid rate limits
-            await asyncio.sleep(0.5)
+            progress.advance()
             
         except Exception as e:
-            print(f"   [{i}/{len(kunden)}] ❌ Fehler bei {kunde_name}: {e}")
+            progress.error(f"[{i}/{len(kunden)}] Fehler bei {kunde_name}: {e}")
     
+    progress.close()
     print()
     print(f"📊 Zusammenfassung:")
     print(f"   Privatkunden: {privatkunden}")
@@ -19,6 +19,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from lib.auth import load_env
 from lib.api_client import EpilotClient
+from lib.progress import Progress
 
 ENTITY_API_BASE = "https://entity.sls.epilot.io"
 DATA_FILE = Path(__file__).parent.parent.parent / "data" / "input" / "demo" / "wuelfrath_produkte.json"
@@ -40,6 +41,7 @@ async def create_products_from_file(client: EpilotClient, data_file: Path) -> di
     
     product_map = {}
     
+    progress = Progress(len(produkte), "Produkte")
     for i, produkt in enumerate(produkte, 1):
         produkt_name = produkt.get('_title', f'Produkt {i}')
         schema = produkt.get('_schema', 'product')
@@ -49,20 +51,12 @@ async def create_products_from_file(client: EpilotClient, data_file: Path) -> di
             result = await client.post(url, data=produkt)
             product_id = result.get('_id')
             product_map[produkt_name] = product_id
-            
-            kategorie = produkt.get('kategorie', 'N/A')
-            sparte = produkt.get('sparte', 'N/A')
-            preis = produkt.get('preis', produkt.get('arbeitspreis', 'N/A'))
-            
-            print(f"   [{i}/{len(produkte)}] ✅ {produkt_name}")
-            print(f"             Kategorie: {kategorie}, Sparte: {sparte}, Preis: {preis}")
-            
-            # Small delay to avoid rate limits
-            await asyncio.sleep(0.5)
+            progress.advance()
             
         except Exception as e:
-            print(f"   [{i}/{len(produkte)}] ❌ Fehler bei {produkt_name}: {e}")
+            progress.error(f"[{i}/{len(produkte)}] Fehler bei {produkt_name}: {e}")
     
+    progress.close()
     return product_map
 
 async def main():
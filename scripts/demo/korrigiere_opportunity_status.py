@@ -147,9 +147,6 @@ async def main():
             current_opp = await client.get(url)
             if current_opp.get('status') == correct_status:
                 update_count += 1
-        
-        # Small delay
-        await asyncio.sleep(0.3)
         print()
     
     print("=" * 70)
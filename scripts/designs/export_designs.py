@@ -14,7 +14,6 @@ Usage:
 import sys
 import asyncio
 import argparse
-import json
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -24,6 +23,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from lib.auth import load_env
 from lib.api_client import EpilotClient
+from lib.codec import read_json, write_json
+from lib.progress import Progress
+from lib.profiling import add_profile_arguments, run_profiled
 
 DESIGN_API_BASE = "https://design-builder-api.sls.epilot.io"
 
@@ -76,16 +78,17 @@ async def fetch_design_details(client: EpilotClient, design_id: str) -> Optional
         print(f"❌ Error fetching design {design_id}: {e}")
         return None
 
-async def export_designs_to_json(output_dir: str, design_id: Optional[str] = None):
+async def export_designs_to_json(output_dir: str, design_id: Optional[str] = None, compact: bool = False):
     """
     Export all designs or a specific design to JSON files.
     
     Args:
         output_dir: Directory to save JSON files
         design_id: Optional specific design ID to export
+        compact: Write compact JSON without indentation
     """
     load_env()
-    client = EpilotClient()
+    client = EpilotClient(cache=True)
     
     print("🔄 Starting design export...\n")
     
@@ -121,6 +124,7 @@ async def export_designs_to_json(output_dir: str, design_id: Optional[str] = Non
         
         print(f"\n💾 Exporting {len(designs)} design(s)...\n")
         
+        progress = Progress(len(designs), "Designs")
         for i, design in enumerate(designs, 1):
             design_id = design.get('_id', design.get('id', f'unknown_{i}'))
             design_name = design.get('name', design.get('title', 'Untitled'))
@@ -135,10 +139,9 @@ async def export_designs_to_json(output_dir: str, design_id: Optional[str] = Non
             filename = f"design_{design_id}.json"
             filepath = output_path / filename
             
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(design, f, indent=2, ensure_ascii=False)
+            write_json(filepath, design, compact=compact)
             
-            print(f"   [{i}/{len(designs)}] {design_name} → {filename}")
+            progress.advance()
             
             # Add to summary
             summary["designs"].append({
@@ -151,10 +154,11 @@ async def export_designs_to_json(output_dir: str, design_id: Optional[str] = Non
                 "application": design.get('application'),
             })
         
+        progress.close()
+        
         # Save summary file
         summary_path = output_path / "designs_summary.json"
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2, ensure_ascii=False)
+        write_json(summary_path, summary, compact=compact)
         
         print(f"\n✅ Successfully exported {len(designs)} design(s) to {output_dir}")
         print(f"📊 Summary saved to {summary_path}")
@@ -170,6 +174,8 @@ async def export_designs_to_json(output_dir: str, design_id: Optional[str] = Non
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        await client.aclose()
 
 async def analyze_design_structure(output_dir: str):
     """
@@ -196,8 +202,7 @@ async def analyze_design_structure(output_dir: str):
     nested_structures = {}
     
     for design_file in design_files:
-        with open(design_file, 'r', encoding='utf-8') as f:
-            design = json.load(f)
+        design = read_json(design_file)
         
         # Collect all top-level keys
         all_keys.update(design.keys())
@@ -240,6 +245,13 @@ if __name__ == "__main__":
         action="store_true",
         help="Analyze structure of already exported designs"
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact JSON without indentation (for machine-consumed exports)"
+    )
+    
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
@@ -249,6 +261,6 @@ if __name__ == "__main__":
         args.output = f"data/output/designs_{timestamp}"
     
     if args.analyze:
-        asyncio.run(analyze_design_structure(args.output))
+        run_profiled(args, lambda: asyncio.run(analyze_design_structure(args.output)), output=args.output)
     else:
-        asyncio.run(export_designs_to_json(args.output, args.design_id))
+        run_profiled(args, lambda: asyncio.run(export_designs_to_json(args.output, args.design_id, args.compact)), output=args.output)
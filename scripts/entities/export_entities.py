@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Export Epilot Entities of Any Schema
+
+Reads the entity schemas once, compiles a flatten plan per schema from its
+attribute definitions and streams every entity to CSV, JSONL or Parquet:
+
+- numbers, booleans and dates keep their type (JSONL / Parquet)
+- multi-value email, phone and address attributes are joined with "; "
+- relations are exported as entity IDs, or as titles with --hydrate
+- only the exported attributes are requested from the API
+
+Usage:
+    python scripts/entities/export_entities.py --schema opportunity
+    python scripts/entities/export_entities.py --schema order --schema product --format parquet
+    python scripts/entities/export_entities.py --all --format jsonl --output-dir data/output/entities
+    python scripts/entities/export_entities.py --schema opportunity --hydrate customer --incremental
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Add lib to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from lib.auth import load_env
+from lib.api_client import EpilotClient, ENTITY_SCHEMAS_URL
+from lib.columnar import ROW_GROUP_SIZE
+from lib.entity_export import (
+    OUTPUT_FORMATS, PAGE_CONCURRENCY, PAGINATION_MODES, SHARDS,
+    FlattenPlan, open_row_writer, stream_entities
+)
+from lib.tracing import span
+from lib.watermark import WatermarkStore
+from lib.profiling import add_profile_arguments, run_profiled
+
+def watermark_name(slug: str) -> str:
+    # Separate from export_contacts_csv's "contact" mark: each exporter tracks its own files
+    return f"export_entities:{slug}"
+
+async def export_schema(
+    client: EpilotClient,
+    plan: FlattenPlan,
+    output_file: Path,
+    output_format: str,
+    watermarks: WatermarkStore,
+    limit: Optional[int] = None,
+    concurrency: int = PAGE_CONCURRENCY,
+    pagination: str = "auto",
+    shards: int = SHARDS,
+    incremental: bool = False,
+    row_group_size: int = ROW_GROUP_SIZE
+) -> Dict[str, Any]:
+    """
+    Stream all entities of one schema into `output_file`.
+
+    Returns:
+        Summary with the number of rows, the file and whether the export is complete
+    """
+    after = watermarks.cursor(watermark_name(plan.slug)) if incremental else None
+    if incremental and after is None:
+        print("   ⚠️  No watermark stored yet - running a full export")
+
+    writer = open_row_writer(output_file, output_format, plan.kinds, row_group_size)
+    mark = None
+
+    def sink(entity: Dict[str, Any]) -> None:
+        nonlocal mark
+        row = plan.flatten(entity)
+        writer(row)
+        if row['updated_at'] and (mark is None or (row['updated_at'], row['id']) > mark):
+            mark = (row['updated_at'], row['id'])
+
+    started = time.perf_counter()
+    with span("export_schema", schema=plan.slug, format=output_format):
+        try:
+            count, complete = await stream_entities(
+                client,
+                f"_schema:{plan.slug}",
+                sink,
+                fields=plan.fields,
+                hydrate=bool(plan.hydrate),
+                limit=limit,
+                concurrency=concurrency,
+                pagination=pagination,
+                shards=shards,
+                after=after,
+                label=plan.slug
+            )
+        finally:
+            writer.close()
+
+    # Only a complete export may move the watermark, or skipped entities would never be fetched
+    if complete and limit is None and mark:
+        watermarks.set(watermark_name(plan.slug), mark[0], mark[1], rows=count)
+
+    return {
+        "schema": plan.slug,
+        "rows": count,
+        "file": str(output_file) if count else None,
+        "complete": complete,
+        "invalid": getattr(writer, 'invalid', 0),
+        "seconds": time.perf_counter() - started,
+    }
+
+async def export_entities(
+    slugs: List[str],
+    output_dir: str,
+    output_format: str = "csv",
+    export_all: bool = False,
+    attributes: Optional[List[str]] = None,
+    hydrate: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    concurrency: int = PAGE_CONCURRENCY,
+    pagination: str = "auto",
+    shards: int = SHARDS,
+    incremental: bool = False,
+    row_group_size: int = ROW_GROUP_SIZE
+):
+    """
+    Export the entities of one or more schemas, one file per schema.
+
+    Args:
+        slugs: Schema slugs to export (e.g. ["opportunity", "order"])
+        output_dir: Directory for the <schema>.<format> files
+        output_format: "csv", "jsonl" or "parquet"
+        export_all: Export every schema of the organization
+        attributes: Only export these attributes (single schema only)
+        hydrate: Relation attributes to hydrate (titles instead of IDs)
+        limit: Optional limit of entities per schema
+        concurrency: Search pages or shards fetched in parallel
+        pagination: Pagination mode (see lib.entity_export.stream_entities)
+        shards: Number of time ranges for sharded pagination
+        incremental: Only fetch entities changed since the last complete export
+        row_group_size: Rows per Parquet row group
+    """
+    load_env()
+    client = EpilotClient()
+    watermarks = WatermarkStore()
+    hydrate = hydrate or []
+
+    print("🔄 Starting entity export...\n")
+
+    try:
+        # Read all schemas once and compile the flatten plans up front, so a typo fails before any export
+        with span("fetch_schemas"):
+            result = await client.get(ENTITY_SCHEMAS_URL)
+        schemas = {schema.get('slug'): schema for schema in result.get('schemas', []) if schema.get('slug')}
+        print(f"📋 {len(schemas)} entity schemas available")
+
+        if export_all:
+            slugs = sorted(schemas)
+        unknown = [slug for slug in slugs if slug not in schemas]
+        if unknown:
+            print(f"❌ Unknown schema(s): {', '.join(unknown)}")
+            print(f"   Available: {', '.join(sorted(schemas))}")
+            sys.exit(1)
+
+        # --hydrate applies to every exported schema that has the relation
+        relations = {
+            slug: {a.get('name') for a in schemas[slug].get('attributes', []) if a.get('type') == 'relation'}
+            for slug in slugs
+        }
+        unmatched = [name for name in hydrate if not any(name in names for names in relations.values())]
+        if unmatched:
+            raise ValueError(f"Not a relation of any exported schema: {', '.join(unmatched)}")
+
+        plans = [
+            FlattenPlan(
+                schemas[slug],
+                attributes=attributes,
+                hydrate=[name for name in hydrate if name in relations[slug]]
+            )
+            for slug in slugs
+        ]
+
+        output_path = Path(output_dir)
+        summaries = []
+        for plan in plans:
+            output_file = output_path / f"{plan.slug}.{output_format}"
+            print(f"\n📥 {plan.slug}: {len(plan.columns)} columns -> {output_file}")
+            summaries.append(await export_schema(
+                client, plan, output_file, output_format, watermarks, limit, concurrency,
+                pagination, shards, incremental, row_group_size
+            ))
+
+        print("\n" + "=" * 70)
+        print("📊 EXPORT SUMMARY")
+        print("=" * 70)
+        for summary in summaries:
+            status = "✅" if summary["complete"] else "⚠️ "
+            target = summary["file"] or "(nothing to export)"
+            print(f"{status} {summary['schema']:<25} {summary['rows']:>9} rows  {summary['seconds']:>6.1f}s  {target}")
+            if summary["invalid"]:
+                print(f"   ⚠️  {summary['invalid']} values did not match their column type and were written as null")
+
+        if not all(summary["complete"] for summary in summaries):
+            sys.exit(1)
+
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    finally:
+        await client.aclose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export Epilot entities of any schema to CSV, JSONL or Parquet")
+    parser.add_argument(
+        "--schema",
+        action="append",
+        default=[],
+        metavar="SLUG",
+        help="Schema to export, e.g. opportunity (repeatable)"
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Export every entity schema of the organization"
+    )
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="csv",
+        help="Output format (default: csv; parquet needs pyarrow)"
+    )
+    parser.add_argument(
+        "--output-dir",
+        default="data/output/entities",
+        help="Directory for the <schema>.<format> files (default: data/output/entities_<timestamp>)"
+    )
+    parser.add_argument(
+        "--attributes",
+        help="Comma-separated attributes to export (single schema only; default: all)"
+    )
+    parser.add_argument(
+        "--hydrate",
+        action="append",
+        default=[],
+        metavar="RELATION",
+        help="Export this relation as titles instead of IDs (repeatable); "
+             "hydration then applies to all relations of that schema"
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        help="Limit number of entities per schema (for testing)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=PAGE_CONCURRENCY,
+        help=f"Search pages or shards fetched in parallel (default: {PAGE_CONCURRENCY})"
+    )
+    parser.add_argument(
+        "--pagination",
+        choices=PAGINATION_MODES,
+        default="auto",
+        help="offset, cursor (search_after), sharded (parallel time ranges) or auto (default)"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=SHARDS,
+        help=f"Time ranges for sharded pagination (default: {SHARDS})"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only export entities changed since the last complete export of each schema"
+    )
+    parser.add_argument(
+        "--row-group-size",
+        type=int,
+        default=ROW_GROUP_SIZE,
+        help=f"Rows per Parquet row group (default: {ROW_GROUP_SIZE:,})"
+    )
+
+    add_profile_arguments(parser)
+
+    args = parser.parse_args()
+
+    if not args.schema and not args.all:
+        parser.error("name at least one --schema or use --all")
+    attributes = [name.strip() for name in args.attributes.split(",") if name.strip()] if args.attributes else None
+    if attributes and (args.all or len(args.schema) != 1):
+        parser.error("--attributes needs exactly one --schema")
+
+    # Add timestamp to the directory if using default
+    if args.output_dir == "data/output/entities":
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        args.output_dir = f"data/output/entities_{timestamp}"
+
+    run_profiled(args, lambda: asyncio.run(export_entities(
+        args.schema, args.output_dir, args.format, args.all, attributes, args.hydrate, args.limit,
+        args.concurrency, args.pagination, args.shards, args.incremental, args.row_group_size
+    )), output=args.output_dir)
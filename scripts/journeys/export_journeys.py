@@ -13,7 +13,6 @@ Usage:
 import sys
 import asyncio
 import argparse
-import json
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -23,6 +22,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from lib.auth import load_env
 from lib.api_client import EpilotClient
+from lib.codec import read_json, write_json
+from lib.progress import Progress
+from lib.profiling import add_profile_arguments, run_profiled
 
 JOURNEY_API_BASE = "https://journey-config.sls.epilot.io"
 
@@ -36,9 +38,9 @@ async def fetch_all_journeys(client: EpilotClient) -> List[Dict[str, Any]]:
     print("🗺️  Fetching journey configurations...")
     
     try:
-        # Use v1 search endpoint
+        # Use v1 search endpoint (read-only, so transient failures may be retried)
         url = f"{JOURNEY_API_BASE}/v1/journey/configuration/search"
-        result = await client.post(url, data={"query": "*"})
+        result = await client.post(url, data={"query": "*"}, idempotent=True)
         
         # Handle different response formats
         if isinstance(result, list):
@@ -72,7 +74,7 @@ async def fetch_journey_details(client: EpilotClient, journey_id: str) -> Option
         print(f"❌ Error fetching journey {journey_id}: {e}")
         return None
 
-async def export_journeys(client: EpilotClient, output_dir: Path):
+async def export_journeys(client: EpilotClient, output_dir: Path, compact: bool = False):
     """
     Export all journeys to JSON files.
     """
@@ -92,6 +94,7 @@ async def export_journeys(client: EpilotClient, output_dir: Path):
     
     print(f"\n💾 Exporting {len(journeys)} journey(s)...\n")
     
+    progress = Progress(len(journeys), "Journeys")
     for i, journey in enumerate(journeys, 1):
         # Note: search results have both _id (entity ID) and journey_id (config ID)
         # Use journey_id for fetching the actual journey configuration
@@ -109,10 +112,9 @@ async def export_journeys(client: EpilotClient, output_dir: Path):
         filename = f"journey_{entity_id}.json"
         filepath = output_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(journey, f, indent=2, ensure_ascii=False)
+        write_json(filepath, journey, compact=compact)
         
-        print(f"   [{i}/{len(journeys)}] {journey_name} → {filename}")
+        progress.advance()
         
         # Analyze journey structure
         steps = journey.get('steps', [])
@@ -136,10 +138,11 @@ async def export_journeys(client: EpilotClient, output_dir: Path):
             "logics": len(journey.get('logics', [])) if isinstance(journey.get('logics'), list) else 0
         })
     
+    progress.close()
+    
     # Save summary file
     summary_path = output_dir / "journeys_summary.json"
-    with open(summary_path, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    write_json(summary_path, summary, compact=compact)
     
     print(f"\n✅ Journeys exported to {output_dir}")
     print(f"📊 Summary saved to {summary_path}")
@@ -153,8 +156,7 @@ async def analyze_structure(output_dir: Path):
     journey_files = list(output_dir.glob("journey_*.json"))
     if journey_files:
         print(f"🗺️  Journey Structure ({len(journey_files)} files):")
-        with open(journey_files[0], 'r') as f:
-            sample = json.load(f)
+        sample = read_json(journey_files[0])
         print(f"   Top-level keys: {', '.join(list(sample.keys())[:10])}")
         
         # Analyze steps
@@ -182,19 +184,19 @@ async def analyze_structure(output_dir: Path):
         if 'design_id' in sample:
             print(f"   Linked to design: {sample.get('design_id')}")
 
-async def main(output_dir: str):
+async def main(output_dir: str, compact: bool = False):
     """
     Main function to export journeys.
     """
     load_env()
-    client = EpilotClient()
+    client = EpilotClient(cache=True)
     
     print("🔄 Starting journey export...\n")
     
     output_path = Path(output_dir)
     
     try:
-        await export_journeys(client, output_path)
+        await export_journeys(client, output_path, compact)
         await analyze_structure(output_path)
         
         print(f"\n🎉 Export complete! Files saved to: {output_path}")
@@ -204,6 +206,8 @@ async def main(output_dir: str):
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        await client.aclose()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Export Epilot journeys")
@@ -212,6 +216,13 @@ if __name__ == "__main__":
         default="data/output/journeys",
         help="Output directory for JSON files"
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact JSON without indentation (for machine-consumed exports)"
+    )
+    
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
@@ -220,4 +231,4 @@ if __name__ == "__main__":
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         args.output = f"data/output/journeys_{timestamp}"
     
-    asyncio.run(main(args.output))
+    run_profiled(args, lambda: asyncio.run(main(args.output, args.compact)), output=args.output)
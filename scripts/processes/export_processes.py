@@ -14,7 +14,6 @@ Usage:
 import sys
 import asyncio
 import argparse
-import json
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Any, Optional
@@ -24,6 +23,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from lib.auth import load_env
 from lib.api_client import EpilotClient
+from lib.codec import read_json, write_json
+from lib.progress import Progress
+from lib.tracing import span
+from lib.profiling import add_profile_arguments, run_profiled
 
 WORKFLOW_API_BASE = "https://workflows-definition.sls.epilot.io"
 BLUEPRINT_API_BASE = "https://blueprint-manifest.sls.epilot.io"
@@ -118,11 +121,12 @@ async def fetch_blueprint_details(client: EpilotClient, blueprint_id: str) -> Op
         print(f"❌ Error fetching blueprint {blueprint_id}: {e}")
         return None
 
-async def export_workflows(client: EpilotClient, output_dir: Path):
+async def export_workflows(client: EpilotClient, output_dir: Path, compact: bool = False):
     """
     Export all workflows to JSON files.
     """
-    workflows = await fetch_all_workflows(client)
+    with span("fetch_list"):
+        workflows = await fetch_all_workflows(client)
     
     if not workflows:
         print("⚠️  No workflows found.")
@@ -139,13 +143,15 @@ async def export_workflows(client: EpilotClient, output_dir: Path):
     
     print(f"\n💾 Exporting {len(workflows)} workflow(s)...\n")
     
+    progress = Progress(len(workflows), "Workflows")
     for i, workflow in enumerate(workflows, 1):
         workflow_id = workflow.get('id', workflow.get('_id', f'unknown_{i}'))
         workflow_name = workflow.get('name', workflow.get('title', 'Untitled'))
         
         # Fetch full details
         if not workflow_id.startswith('unknown'):
-            full_workflow = await fetch_workflow_details(client, workflow_id)
+            with span("fetch_details"):
+                full_workflow = await fetch_workflow_details(client, workflow_id)
             if full_workflow:
                 workflow = full_workflow
         
@@ -153,10 +159,10 @@ async def export_workflows(client: EpilotClient, output_dir: Path):
         filename = f"workflow_{workflow_id}.json"
         filepath = workflow_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(workflow, f, indent=2, ensure_ascii=False)
+        with span("write_file"):
+            write_json(filepath, workflow, compact=compact)
         
-        print(f"   [{i}/{len(workflows)}] {workflow_name} → {filename}")
+        progress.advance()
         
         # Add to summary
         summary["workflows"].append({
@@ -169,19 +175,22 @@ async def export_workflows(client: EpilotClient, output_dir: Path):
             "description": workflow.get('description', '')[:100] if workflow.get('description') else None
         })
     
+    progress.close()
+    
     # Save summary file
     summary_path = workflow_dir / "workflows_summary.json"
-    with open(summary_path, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    with span("write_summary"):
+        write_json(summary_path, summary, compact=compact)
     
     print(f"\n✅ Workflows exported to {workflow_dir}")
     print(f"📊 Summary saved to {summary_path}")
 
-async def export_blueprints(client: EpilotClient, output_dir: Path):
+async def export_blueprints(client: EpilotClient, output_dir: Path, compact: bool = False):
     """
     Export all blueprints to JSON files.
     """
-    blueprints = await fetch_all_blueprints(client)
+    with span("fetch_list"):
+        blueprints = await fetch_all_blueprints(client)
     
     if not blueprints:
         print("⚠️  No blueprints found.")
@@ -198,13 +207,15 @@ async def export_blueprints(client: EpilotClient, output_dir: Path):
     
     print(f"\n💾 Exporting {len(blueprints)} blueprint(s)...\n")
     
+    progress = Progress(len(blueprints), "Blueprints")
     for i, blueprint in enumerate(blueprints, 1):
         blueprint_id = blueprint.get('id', blueprint.get('_id', f'unknown_{i}'))
         blueprint_name = blueprint.get('name', blueprint.get('title', 'Untitled'))
         
         # Fetch full details including resources
         if not blueprint_id.startswith('unknown'):
-            full_blueprint = await fetch_blueprint_details(client, blueprint_id)
+            with span("fetch_details"):
+                full_blueprint = await fetch_blueprint_details(client, blueprint_id)
             if full_blueprint:
                 blueprint = full_blueprint
         
@@ -212,10 +223,10 @@ async def export_blueprints(client: EpilotClient, output_dir: Path):
         filename = f"blueprint_{blueprint_id}.json"
         filepath = blueprint_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(blueprint, f, indent=2, ensure_ascii=False)
+        with span("write_file"):
+            write_json(filepath, blueprint, compact=compact)
         
-        print(f"   [{i}/{len(blueprints)}] {blueprint_name} → {filename}")
+        progress.advance()
         
         # Add to summary
         resources = blueprint.get('resources', [])
@@ -230,10 +241,12 @@ async def export_blueprints(client: EpilotClient, output_dir: Path):
             "resource_types": list(set([r.get('type') for r in resources if isinstance(r, dict) and r.get('type')]))
         })
     
+    progress.close()
+    
     # Save summary file
     summary_path = blueprint_dir / "blueprints_summary.json"
-    with open(summary_path, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    with span("write_summary"):
+        write_json(summary_path, summary, compact=compact)
     
     print(f"\n✅ Blueprints exported to {blueprint_dir}")
     print(f"📊 Summary saved to {summary_path}")
@@ -250,8 +263,7 @@ async def analyze_structure(output_dir: Path):
         workflow_files = list(workflow_dir.glob("workflow_*.json"))
         if workflow_files:
             print(f"📋 Workflow Structure ({len(workflow_files)} files):")
-            with open(workflow_files[0], 'r') as f:
-                sample = json.load(f)
+            sample = read_json(workflow_files[0])
             print(f"   Top-level keys: {', '.join(list(sample.keys())[:10])}")
             
             # Check for steps/stages
@@ -268,8 +280,7 @@ async def analyze_structure(output_dir: Path):
         blueprint_files = list(blueprint_dir.glob("blueprint_*.json"))
         if blueprint_files:
             print(f"\n📘 Blueprint Structure ({len(blueprint_files)} files):")
-            with open(blueprint_files[0], 'r') as f:
-                sample = json.load(f)
+            sample = read_json(blueprint_files[0])
             print(f"   Top-level keys: {', '.join(list(sample.keys())[:10])}")
             
             # Check for resources
@@ -280,25 +291,29 @@ async def analyze_structure(output_dir: Path):
                     resource_types = set([r.get('type') for r in resources if isinstance(r, dict) and r.get('type')])
                     print(f"   Resource types: {', '.join(sorted(resource_types))}")
 
-async def main(workflows_only: bool, blueprints_only: bool, output_dir: str):
+async def main(workflows_only: bool, blueprints_only: bool, output_dir: str, compact: bool = False):
     """
     Main function to export workflows and blueprints.
     """
     load_env()
-    client = EpilotClient()
+    client = EpilotClient(cache=True)
     
     print("🔄 Starting process export...\n")
     
     output_path = Path(output_dir)
     
     try:
-        if not blueprints_only:
-            await export_workflows(client, output_path)
-        
-        if not workflows_only:
-            await export_blueprints(client, output_path)
-        
-        await analyze_structure(output_path)
+        with span("export_processes"):
+            if not blueprints_only:
+                with span("export_workflows"):
+                    await export_workflows(client, output_path, compact)
+            
+            if not workflows_only:
+                with span("export_blueprints"):
+                    await export_blueprints(client, output_path, compact)
+            
+            with span("analyze_structure"):
+                await analyze_structure(output_path)
         
         print(f"\n🎉 Export complete! Files saved to: {output_path}")
         
@@ -307,6 +322,8 @@ async def main(workflows_only: bool, blueprints_only: bool, output_dir: str):
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        await client.aclose()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Export Epilot workflows and blueprints")
@@ -325,6 +342,13 @@ if __name__ == "__main__":
         action="store_true",
         help="Export only blueprints"
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact JSON without indentation (for machine-consumed exports)"
+    )
+    
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
@@ -333,4 +357,4 @@ if __name__ == "__main__":
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         args.output = f"data/output/processes_{timestamp}"
     
-    asyncio.run(main(args.workflows_only, args.blueprints_only, args.output))
+    run_profiled(args, lambda: asyncio.run(main(args.workflows_only, args.blueprints_only, args.output, args.compact)), output=args.output)
@@ -12,18 +12,23 @@ Usage:
 import sys
 import asyncio
 import argparse
-import json
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any
 
 # Add lib to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from lib.auth import load_env
 from lib.api_client import EpilotClient
+from lib.codec import read_json, write_json
+from lib.progress import Progress
+from lib.batch import RequestSpec
+from lib.tracing import span
+from lib.profiling import add_profile_arguments, run_profiled
 
 WORKFLOW_API_BASE = "https://workflows-definition.sls.epilot.io"
+DETAIL_CONCURRENCY = 10
 
 async def fetch_all_workflows(client: EpilotClient) -> List[Dict[str, Any]]:
     """
@@ -51,30 +56,35 @@ async def fetch_all_workflows(client: EpilotClient) -> List[Dict[str, Any]]:
         print(f"❌ Error fetching workflows: {e}")
         return []
 
-async def fetch_workflow_details(client: EpilotClient, workflow_id: str) -> Optional[Dict[str, Any]]:
+async def fetch_workflow_details_batch(client: EpilotClient, workflow_ids: List[str]) -> Dict[str, Dict[str, Any]]:
     """
-    Fetch detailed information for a specific workflow.
+    Fetch details for many workflows concurrently.
     
     Args:
-        workflow_id: The ID of the workflow to fetch
+        workflow_ids: IDs of the workflows to fetch
     
     Returns:
-        Workflow object with full details
+        Mapping of workflow ID to full workflow object (failed fetches are left out)
     """
-    try:
-        url = f"{WORKFLOW_API_BASE}/v1/workflows/definitions/{workflow_id}"
-        workflow = await client.get(url)
-        return workflow
-        
-    except Exception as e:
-        print(f"❌ Error fetching workflow {workflow_id}: {e}")
-        return None
+    specs = [
+        RequestSpec("GET", f"{WORKFLOW_API_BASE}/v1/workflows/definitions/{workflow_id}", tag=workflow_id)
+        for workflow_id in workflow_ids
+    ]
+    
+    details = {}
+    for item in await client.batch(specs, concurrency=DETAIL_CONCURRENCY):
+        if item.ok:
+            details[item.spec.tag] = item.result
+        else:
+            print(f"❌ Error fetching workflow {item.spec.tag}: {item.error}")
+    return details
 
-async def export_workflows(client: EpilotClient, output_dir: Path):
+async def export_workflows(client: EpilotClient, output_dir: Path, compact: bool = False):
     """
     Export all workflows to JSON files.
     """
-    workflows = await fetch_all_workflows(client)
+    with span("fetch_list"):
+        workflows = await fetch_all_workflows(client)
     
     if not workflows:
         print("⚠️  No workflows found.")
@@ -90,24 +100,28 @@ async def export_workflows(client: EpilotClient, output_dir: Path):
     
     print(f"\n💾 Exporting {len(workflows)} workflow(s)...\n")
     
+    # Fetch full details concurrently
+    known_ids = [w.get('id', w.get('_id')) for w in workflows if w.get('id', w.get('_id'))]
+    with span("fetch_details", count=len(known_ids)):
+        details = await fetch_workflow_details_batch(client, known_ids)
+    
+    progress = Progress(len(workflows), "Workflows")
     for i, workflow in enumerate(workflows, 1):
         workflow_id = workflow.get('id', workflow.get('_id', f'unknown_{i}'))
         workflow_name = workflow.get('name', workflow.get('title', 'Untitled'))
         
-        # Fetch full details
-        if not workflow_id.startswith('unknown'):
-            full_workflow = await fetch_workflow_details(client, workflow_id)
-            if full_workflow:
-                workflow = full_workflow
+        # Use full details where available
+        if workflow_id in details:
+            workflow = details[workflow_id]
         
         # Save individual workflow file
         filename = f"workflow_{workflow_id}.json"
         filepath = output_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(workflow, f, indent=2, ensure_ascii=False)
+        with span("write_file"):
+            write_json(filepath, workflow, compact=compact)
         
-        print(f"   [{i}/{len(workflows)}] {workflow_name} → {filename}")
+        progress.advance()
         
         # Add to summary
         summary["workflows"].append({
@@ -120,10 +134,12 @@ async def export_workflows(client: EpilotClient, output_dir: Path):
             "description": workflow.get('description', '')[:100] if workflow.get('description') else None
         })
     
+    progress.close()
+    
     # Save summary file
     summary_path = output_dir / "workflows_summary.json"
-    with open(summary_path, 'w', encoding='utf-8') as f:
-        json.dump(summary, f, indent=2, ensure_ascii=False)
+    with span("write_summary"):
+        write_json(summary_path, summary, compact=compact)
     
     print(f"\n✅ Workflows exported to {output_dir}")
     print(f"📊 Summary saved to {summary_path}")
@@ -137,8 +153,7 @@ async def analyze_structure(output_dir: Path):
     workflow_files = list(output_dir.glob("workflow_*.json"))
     if workflow_files:
         print(f"📋 Workflow Structure ({len(workflow_files)} files):")
-        with open(workflow_files[0], 'r') as f:
-            sample = json.load(f)
+        sample = read_json(workflow_files[0])
         print(f"   Top-level keys: {', '.join(list(sample.keys())[:10])}")
         
         # Check for steps/stages
@@ -156,20 +171,22 @@ async def analyze_structure(output_dir: Path):
                 total_steps = sum(len(section.get('steps', [])) for section in sections)
                 print(f"   Total steps: {total_steps}")
 
-async def main(output_dir: str):
+async def main(output_dir: str, compact: bool = False):
     """
     Main function to export workflows.
     """
     load_env()
-    client = EpilotClient()
+    client = EpilotClient(cache=True)
     
     print("🔄 Starting workflow export...\n")
     
     output_path = Path(output_dir)
     
     try:
-        await export_workflows(client, output_path)
-        await analyze_structure(output_path)
+        with span("export_workflows"):
+            await export_workflows(client, output_path, compact)
+            with span("analyze_structure"):
+                await analyze_structure(output_path)
         
         print(f"\n🎉 Export complete! Files saved to: {output_path}")
         
@@ -178,6 +195,8 @@ async def main(output_dir: str):
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        await client.aclose()
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Export Epilot workflows")
@@ -186,6 +205,13 @@ if __name__ == "__main__":
         default="data/output/workflows",
         help="Output directory for JSON files"
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write compact JSON without indentation (for machine-consumed exports)"
+    )
+    
+    add_profile_arguments(parser)
     
     args = parser.parse_args()
     
@@ -194,4 +220,4 @@ if __name__ == "__main__":
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         args.output = f"data/output/workflows_{timestamp}"
     
-    asyncio.run(main(args.output))
+    run_profiled(args, lambda: asyncio.run(main(args.output, args.compact)), output=args.output)
@@ -0,0 +1,46 @@
+"""
+Chunk-boundary tests for lib/json_stream.py
+
+Run with:
+    python -m pytest tests
+"""
+
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from lib.json_stream import iter_json_array
+
+DOCUMENTS = [
+    ('[1.5, 2]', None),
+    ('[-4.5e-3, 7]', None),
+    ('[1E+10,2e5,-0.0,3]', None),
+    ('{"results": [10.25, 3]}', "results"),
+    ('{"total": 12.5e1, "results": [{"amount": 1.25e-2, "ok": true}, null, "Straße", 42]}', "results"),
+    ('{"manifest": {"id": 7.0, "resources": [1.0, [2.5, 3e2], {"x": -1}]}}', "manifest.resources"),
+]
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+def _decode(document: str, path, size: int):
+    async def collect():
+        return [item async for item in iter_json_array(_chunks(document.encode("utf-8"), size), path)]
+    return asyncio.run(collect())
+
+def _expected(document: str, path):
+    value = json.loads(document)
+    for key in (path.split(".") if path else []):
+        value = value[key]
+    return value
+
+@pytest.mark.parametrize("document, path", DOCUMENTS)
+@pytest.mark.parametrize("size", list(range(1, 17)) + [64])
+def test_numbers_split_across_chunks(document, path, size):
+    assert _decode(document, path, size) == _expected(document, path)